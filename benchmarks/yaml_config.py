@@ -0,0 +1,79 @@
+"""
+Micro benchmark of loading and dumping a large pepsin.yaml with the
+libyaml (C) and pure python PyYAML implementations
+Usage:
+    `python benchmarks/yaml_config.py [--libraries 500] [--repeat 20]`
+"""
+import argparse
+import io
+import timeit
+
+import yaml
+
+
+def make_config(libraries: int) -> dict:
+    """
+    Returns: Dict | Config with the given number of libraries and scripts
+    """
+    return {
+        "name": "benchmark",
+        "venv": "venv",
+        "author": "pepsin",
+        "license": "MIT",
+        "libraries": [
+            f"library-{i}=={i % 10}.{i % 7}.0" for i in range(libraries)
+        ],
+        "scripts": {
+            f"script-{i}": f"module_{i}.py --flag {i}"
+            for i in range(libraries)
+        },
+    }
+
+
+def measure(
+    text: str, data: dict, loader, dumper, repeat: int
+) -> (float, float):
+    """
+    Returns: tuple | Seconds per load and per dump
+    """
+    load = timeit.timeit(lambda: yaml.load(text, Loader=loader), number=repeat)
+    dump = timeit.timeit(
+        lambda: yaml.dump(data, io.StringIO(), Dumper=dumper, sort_keys=False),
+        number=repeat,
+    )
+    return load / repeat, dump / repeat
+
+
+def main():
+    """
+    Prints load and dump time per implementation
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--libraries", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    options = parser.parse_args()
+    data = make_config(options.libraries)
+    text = yaml.dump(data, sort_keys=False)
+    implementations = [("python", yaml.SafeLoader, yaml.SafeDumper)]
+    if getattr(yaml, "__with_libyaml__", False):
+        implementations.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+    else:
+        print("PyYAML is built without libyaml, only the fallback is measured")
+    print(f"{options.libraries} libraries and scripts, {len(text)} bytes")
+    results = {}
+    for name, loader, dumper in implementations:
+        results[name] = measure(text, data, loader, dumper, options.repeat)
+        load, dump = results[name]
+        print(
+            f"{name:>8}: load {load * 1000:8.2f} ms | dump {dump * 1000:8.2f} ms"
+        )
+    if "libyaml" in results:
+        python, libyaml = results["python"], results["libyaml"]
+        print(
+            f" speedup: load {python[0] / libyaml[0]:.1f}x"
+            f" | dump {python[1] / libyaml[1]:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
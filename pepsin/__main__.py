@@ -0,0 +1,7 @@
+"""
+Allows running pepsin with `python -m pepsin`
+"""
+from pepsin.main import main
+
+if __name__ == "__main__":
+    main()
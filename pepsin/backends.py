@@ -0,0 +1,244 @@
+"""
+Installer backends of PyHandler
+
+A backend performs pip's work, installing, upgrading and uninstalling
+packages and running pip commands. Every operation takes the whole
+package set so backends can batch it. The backend is chosen per project
+with `installer: <name>` in pepsin.yaml
+
+1. ``pip`` runs pip in a subprocess, the default
+2. ``pip-worker`` runs pip in one long-lived worker process in the venv
+3. ``wheel`` resolves with pip and installs wheels natively in parallel
+4. ``simulated`` only records operations, for benchmarks and tests
+"""
+import json
+import os
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type
+
+from pepsin.const import PEPSIN_ROOT
+from pepsin.error import InvalidCommandError
+
+DEFAULT_BACKEND = "pip"
+
+
+class InstallerBackend(ABC):
+    """
+    Base class of installer backends, a backend gets the PyHandler
+    instance to access the venv, environment variables and executables
+    """
+
+    name = ""
+
+    def __init__(self, py_handler):
+        self.py_handler = py_handler
+
+    def execute(self, *commands):
+        """
+        Executes a pip command, raises CalledProcessError on failure
+        """
+        subprocess.check_call(
+            [self.py_handler.pip_exec, *commands], env=self.py_handler.env
+        )
+
+    @abstractmethod
+    def install(self, packages: List[str], upgrade: bool = False):
+        """
+        Installs or upgrades packages in a single batch,
+        raises CalledProcessError on failure
+        Args:
+            packages: List of requirement specifiers
+            upgrade: Upgrade already installed packages
+        """
+
+    @abstractmethod
+    def uninstall(self, packages: List[str]):
+        """
+        Uninstalls packages in a single batch,
+        raises CalledProcessError on failure
+        Args:
+            packages: List of package names
+        """
+
+    def close(self):
+        """
+        Releases resources held by the backend
+        """
+
+
+class PipBackend(InstallerBackend):
+    """
+    Runs pip in a subprocess for every operation
+    """
+
+    name = "pip"
+
+    def install(self, packages: List[str], upgrade: bool = False):
+        args = ["install", "--upgrade"] if upgrade else ["install"]
+        self.execute(*args, *packages)
+
+    def uninstall(self, packages: List[str]):
+        self.execute("uninstall", *packages, "-y")
+
+
+class PipWorkerBackend(PipBackend):
+    """
+    Starts `pepsin/pip_worker.py` with the venv interpreter once and sends
+    every pip command to it over a pipe, pip's startup and import cost is
+    paid once per session instead of once per command. Commands that
+    upgrade pip itself run in a subprocess
+    """
+
+    name = "pip-worker"
+    worker_script = os.path.join(PEPSIN_ROOT, "pip_worker.py")
+
+    def __init__(self, py_handler):
+        super().__init__(py_handler)
+        self.process = None
+
+    def start(self):
+        """
+        Starts the worker process if it is not running
+        Returns: subprocess.Popen
+        """
+        if self.process is None or self.process.poll() is not None:
+            self.process = subprocess.Popen(
+                [self.py_handler.executable, self.worker_script],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=self.py_handler.env,
+                universal_newlines=True,
+            )
+        return self.process
+
+    def request(self, action: str, **kwargs) -> Dict:
+        """
+        Sends a request to the worker and waits for the response
+        Args:
+            action: Option["pip", "inspect", "ping"]
+            **kwargs: Request data
+
+        Returns: Dict | Response of the worker
+        """
+        process = self.start()
+        process.stdin.write(json.dumps({"action": action, **kwargs}) + "\n")
+        process.stdin.flush()
+        line = process.stdout.readline()
+        if not line:
+            self.process = None
+            raise subprocess.CalledProcessError(
+                process.wait(), [self.worker_script, action]
+            )
+        return json.loads(line)
+
+    def execute(self, *commands):
+        if "pip" in commands or "pip3" in commands:
+            # Replacing pip inside the running worker is not safe
+            super().execute(*commands)
+            return
+        response = self.request("pip", args=list(commands))
+        if response["code"] != 0:
+            raise subprocess.CalledProcessError(response["code"], commands)
+
+    def inspect(self) -> Dict[str, str]:
+        """
+        Returns: Dict | Name and version of installed distributions
+        """
+        return self.request("inspect")["packages"]
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.stdin.write(json.dumps({"action": "exit"}) + "\n")
+                self.process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.wait()
+        self.process = None
+
+
+class WheelBackend(PipBackend):
+    """
+    Resolves packages with pip's dry run report, downloads the wheels
+    concurrently into the wheelhouse and installs them with the native
+    wheel installer, pip commands still run in a subprocess
+    """
+
+    name = "wheel"
+
+    def install(self, packages: List[str], upgrade: bool = False):
+        # pylint: disable=import-outside-toplevel
+        from pepsin.wheelhouse import Wheelhouse
+
+        config = self.py_handler.pepsin_config
+        wheelhouse_path = config.wheelhouse
+        if not isinstance(wheelhouse_path, str):
+            wheelhouse_path = ""
+        wheelhouse = Wheelhouse(wheelhouse_path, config.jobs)
+        resolved = self.py_handler.resolve_libraries(
+            packages, keep_installed=True, upgrade=upgrade
+        )[0]
+        try:
+            self.py_handler.install_from_wheelhouse(
+                resolved, wheelhouse, native=True
+            )
+        except InvalidCommandError as error:
+            raise subprocess.CalledProcessError(1, packages) from error
+
+    def uninstall(self, packages: List[str]):
+        self.py_handler.get_installer().uninstall(packages)
+
+
+class SimulatedBackend(InstallerBackend):
+    """
+    Records operations without touching the venv, every package costs
+    `delay` seconds, measures pepsin's own overhead in benchmarks
+    """
+
+    name = "simulated"
+    delay = 0.0
+
+    def __init__(self, py_handler):
+        super().__init__(py_handler)
+        self.operations: List[tuple] = []
+
+    def execute(self, *commands):
+        self.operations.append(("execute", list(commands)))
+
+    def install(self, packages: List[str], upgrade: bool = False):
+        action = "upgrade" if upgrade else "install"
+        self.operations.append((action, list(packages)))
+        time.sleep(self.delay * len(packages))
+
+    def uninstall(self, packages: List[str]):
+        self.operations.append(("uninstall", list(packages)))
+        time.sleep(self.delay * len(packages))
+
+
+BACKENDS: Dict[str, Type[InstallerBackend]] = {
+    backend.name: backend
+    for backend in [
+        PipBackend,
+        PipWorkerBackend,
+        WheelBackend,
+        SimulatedBackend,
+    ]
+}
+
+
+def get_backend(name: str = "") -> Type[InstallerBackend]:
+    """
+    Returns installer backend class
+    Args:
+        name: Name of the backend, defaults to pip
+
+    Returns: InstallerBackend subclass
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise InvalidCommandError(
+            f"Unknown installer `{name}`, available: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[name]
@@ -3,15 +3,14 @@ Base class for writing commands, commands which will be executed
 through the cli
 """
 import functools
-import inspect
-import pkgutil
 import sys
 from abc import ABC, abstractmethod
 from argparse import ArgumentParser
 from importlib import import_module
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
 from pepsin.base_io import IOBase, PromptHandler
+from pepsin.commands import COMMANDS
 from pepsin.const import COMMAND_DIR
 from pepsin.error import InvalidCommandError
 from pepsin.template import TemplateList
@@ -241,6 +240,8 @@ def load_command_class(name) -> dict[str, Type[BaseCommand]]:
     Every Command module has a Command class, which will be imported
     :return Command Class
     """
+    import inspect  # pylint: disable=import-outside-toplevel
+
     module = import_module(f"pepsin.commands.{name}")
     command_classes = {}
     for cls in inspect.getmembers(module, inspect.isclass):
@@ -255,6 +256,8 @@ def find_command_modules():
     """
     Finds commands located in the commands directory
     """
+    import pkgutil  # pylint: disable=import-outside-toplevel
+
     modules = [
         name
         for _, name, is_pkg in pkgutil.iter_modules([COMMAND_DIR])
@@ -281,17 +284,47 @@ def get_commands():
     return commands
 
 
+def build_manifest() -> Dict[str, str]:
+    """
+    Builds the command manifest by importing every command module,
+    `pepsin.commands.COMMANDS` is generated from it
+    Returns: Dict | Command names and aliases mapped to `module:Class`
+    """
+    manifest = {}
+    for name in find_command_modules():
+        for command, klass in load_command_class(name).items():
+            for key in [command, *klass.alias]:
+                manifest[key] = f"{name}:{klass.__name__}"
+    return dict(sorted(manifest.items()))
+
+
+def load_manifest_command(command: str) -> Optional[Type[BaseCommand]]:
+    """
+    Imports only the module of a command listed in the manifest
+    Args:
+        command: name or alias of the command
+
+    Returns: Command class or None if it is not in the manifest
+    """
+    entry = COMMANDS.get(command)
+    if not entry:
+        return None
+    module_name, class_name = entry.split(":")
+    module = import_module(f"pepsin.commands.{module_name}")
+    return getattr(module, class_name)
+
+
 @functools.lru_cache(maxsize=None)
 def get_command(command: str) -> BaseCommand:
     """
-    Returns command class instance
+    Returns command class instance, commands missing from the manifest
+    are looked up by importing every command module
     Args:
         command: name of the command
 
     Returns:
     """
-    commands = get_commands()
-    klass = commands.get(command, None)
+    klass = load_manifest_command(command) or get_commands().get(command)
     if not klass:
         raise ModuleNotFoundError
     return klass()
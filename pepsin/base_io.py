@@ -6,97 +6,9 @@ import abc
 import dataclasses
 import sys
 from collections import namedtuple
-from io import TextIOBase
 from typing import List, Union
 
-from colorama import Fore, init
-
-
-class OutputWrapper(TextIOBase):
-    """
-    Output wrapper that uses std.out and enforces color
-    """
-
-    color_map = {
-        "success": Fore.GREEN,
-        "error": Fore.RED,
-        "warning": Fore.YELLOW,
-        "primary": Fore.CYAN,
-    }
-
-    def __init__(self, out, ending: str = "\n"):
-        super().__init__()
-        init(autoreset=True)
-        self._out = out
-        self.ending = ending
-
-    def flush(self):
-        """
-        Flush out text
-        Returns:
-
-        """
-        if hasattr(self._out, "flush"):
-            self._out.flush()
-
-    def write(
-        self,
-        msg: str = "",
-        ending: str = None,
-        msg_type: str = "text",
-        enforce_color: str = "",
-    ):
-        """
-        Outputs text
-        Args:
-            msg: str | Msg that will be in the output
-            ending: str | Ending of the msg
-            msg_type: str | Options - success, error, warning, primary
-            enforce_color: str | Color of the text
-
-        Returns:
-
-        """
-        ending = self.ending if ending is None else ending
-        if ending and not msg.endswith(ending):
-            msg += ending
-        color = self.color_map.get(msg_type, "")
-        color = enforce_color if enforce_color else color
-        self._out.write(color + msg)
-
-
-class IOBase:
-    """
-    IOBase is a superclass for CLI Output and Error Handling
-    """
-
-    def __init__(self):
-        self.stdout = OutputWrapper(sys.stdout)
-        self.stderr = OutputWrapper(sys.stderr)
-
-    def output(self, text):
-        """
-        Text output on cli
-        """
-        self.stdout.write(text)
-
-    def output_flush(self):
-        """
-        Output cli flush
-        """
-        self.stdout.flush()
-
-    def error(self, text):
-        """
-        CLI Output for errors
-        """
-        self.stderr.write(text)
-
-    def error_flush(self):
-        """
-        CLI Error flush
-        """
-        self.stderr.flush()
+from pepsin.output import IOBase, OutputWrapper
 
 
 @dataclasses.dataclass
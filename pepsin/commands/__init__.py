@@ -0,0 +1,23 @@
+"""
+Command manifest, maps command names and aliases to `module:Class` in this
+package so the cli imports only the module of the invoked command.
+Keep it in sync with the command classes, `pepsin.base.build_manifest`
+generates it and the test suite checks it
+"""
+
+COMMANDS = {
+    "add": "install:Install",
+    "append": "install:Install",
+    "bench": "benchmark:Benchmark",
+    "benchmark": "benchmark:Benchmark",
+    "i": "install:Install",
+    "init": "init:Init",
+    "install": "install:Install",
+    "lock": "lock:Lock",
+    "pip": "pip:Pip",
+    "run": "run:Run",
+    "sync": "sync:Sync",
+    "uninstall": "uninstall:Uninstall",
+    "upgrade": "upgrade:Upgrade",
+    "venv": "venv:Venv",
+}
@@ -0,0 +1,119 @@
+"""
+Benchmark Command
+Usage:
+    `pepsin benchmark`
+
+Installs the libraries of the config file into a throwaway virtual
+environment with every installer backend and reports the time taken,
+so the fastest backend can be chosen with `installer:` in pepsin.yaml
+
+Optional Parameters:
+`--installers pip wheel`
+Backends to compare, every backend but simulated by default
+
+`--repeat=3`
+Number of runs per backend, the fastest run is reported
+
+`-r=requirement.txt`
+Benchmark a requirement file instead of the configured libraries
+"""
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser
+
+from pepsin.backends import BACKENDS
+from pepsin.base import BaseCommand
+from pepsin.config import PepsinConfig
+from pepsin.pyhandler import PyHandler
+
+
+class Benchmark(BaseCommand):
+    """
+    Benchmark command class
+    """
+
+    short_description = "Compare installer backends"
+    help = """Installs libraries into a fresh virtual environment with each
+    installer backend and reports the time taken
+    `$pepsin benchmark --installers pip wheel`
+    """
+    alias = ["bench"]
+
+    def add_argument(self, parser: ArgumentParser):
+        parser.add_argument(
+            "--installers",
+            nargs="+",
+            choices=list(BACKENDS),
+            default=[name for name in BACKENDS if name != "simulated"],
+            help="Installer backends to compare, simulated only on request",
+        )
+
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=1,
+            help="Number of runs per backend",
+        )
+
+        parser.add_argument(
+            "-r",
+            type=str,
+            metavar="requirement.txt",
+            help="Benchmark a requirement file",
+        )
+
+    def run_backend(self, config: PepsinConfig, installer: str, libs):
+        """
+        Installs libraries into a throwaway venv with one backend
+        Args:
+            config: PepsinConfig instance
+            installer: Name of the backend
+            libs: List of libraries
+
+        Returns: tuple | Elapsed seconds, number of passed and failed libs
+        """
+        py_handler = PyHandler(
+            config,
+            self.stdout,
+            self.stderr,
+            skip_venv=True,
+            installer=installer,
+        )
+        temp_dir = tempfile.mkdtemp(prefix="pepsin-benchmark-")
+        try:
+            py_handler.use_venv(f"{temp_dir}/venv")
+            start = time.perf_counter()
+            passed, failed = py_handler.install_libraries(libs)
+            elapsed = time.perf_counter() - start
+            return elapsed, len(passed), len(failed)
+        finally:
+            py_handler.backend.close()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def execute(self):
+        config = PepsinConfig()
+        # Benchmarks never touch the project venv, not saved to the config
+        config.venv = ""
+        libs = config.libraries
+        if self.command_data.get("r"):
+            libs = PyHandler(config, skip_venv=True).collect_libraries(
+                [], self.command_data.get("r")
+            )
+        results = []
+        for installer in self.command_data.get("installers"):
+            runs = [
+                self.run_backend(config, installer, list(libs))
+                for _ in range(max(1, self.command_data.get("repeat")))
+            ]
+            results.append((installer, min(runs)))
+
+        self.output(
+            f"{'installer':<12}{'seconds':>10}{'passed':>8}{'failed':>8}"
+        )
+        for installer, (elapsed, passed, failed) in sorted(
+            results, key=lambda result: result[1][0]
+        ):
+            self.output(
+                f"{installer:<12}{elapsed:>10.3f}{passed:>8}{failed:>8}"
+            )
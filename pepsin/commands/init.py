@@ -30,11 +30,10 @@ Will ignore the prompt part
 """
 from argparse import ArgumentParser
 
-from colorama import Fore
-
 from pepsin.base import BaseCommand
 from pepsin.base_io import Input, Output
 from pepsin.config import PepsinConfig, get_project_name
+from pepsin.output import CYAN
 from pepsin.pyhandler import PyHandler
 from pepsin.template import (
     Template,
@@ -78,7 +77,7 @@ class Init(BaseCommand):
             Output(
                 name="Welcome",
                 title=f"Pepsin Setup Project\n{'-' * 10}",
-                color=Fore.CYAN,
+                color=CYAN,
             ),
             Input(
                 name="name",
@@ -158,10 +157,11 @@ class Init(BaseCommand):
         Inherited execute method
         """
         conf = PepsinConfig()
-        conf.update(
-            self.command_data,
-            scripts={"main": f"{self.command_data.get('name')}/main.py"},
-        )
-        PyHandler(conf, self.stdout, self.stderr)
-        # Installs virtualenv library
+        with conf.transaction():
+            conf.update(
+                self.command_data,
+                scripts={"main": f"{self.command_data.get('name')}/main.py"},
+            )
+            # Installs virtualenv library
+            PyHandler(conf, self.stdout, self.stderr)
         self.output("\nProject initialization complete")
@@ -13,13 +13,40 @@ Optional Parameters:
 `-r=requirement.txt`
 Requirement file containing library names
 
+`--no-batch`
+Runs pip once per library instead of a single resolver run
+
+`--force`
+Reinstalls the configured libraries even if the venv is up to date
+
+`--wheelhouse=dir`
+Downloads artifacts concurrently into a wheelhouse and installs from it
+without accessing the index, the user level wheelhouse is used without `dir`
+
+`--store=dir`
+Unpacks wheels once into a global content addressed store and links
+them into the venv, the user level store is used without `dir`
+
+`--native`
+Installs wheels from the wheelhouse in parallel without pip
+
+`-j=8`
+Number of concurrent downloads and installs
+
+Without libraries, a fresh `pepsin.lock` is installed as is, without
+resolving dependencies
+
 """
 from argparse import ArgumentParser
+from typing import Optional
 
 from pepsin.base import BaseCommand
 from pepsin.config import PepsinConfig
+from pepsin.lock import LockFile
 from pepsin.pyhandler import PyHandler
+from pepsin.store import PackageStore
 from pepsin.utils import get_default
+from pepsin.wheelhouse import Wheelhouse
 
 
 class Install(BaseCommand):
@@ -54,20 +81,154 @@ Example: `$pepsin install django`
             ),
         )
 
+        parser.add_argument(
+            "--no-batch",
+            action="store_true",
+            help="Run pip once per library instead of a single batch",
+        )
+
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Install even if the environment is up to date",
+        )
+
+        parser.add_argument(
+            "--wheelhouse",
+            nargs="?",
+            const="",
+            default=None,
+            metavar="dir",
+            help=(
+                "Download artifacts concurrently into a wheelhouse and"
+                " install from it, defaults to the user level wheelhouse"
+            ),
+        )
+
+        parser.add_argument(
+            "--store",
+            nargs="?",
+            const="",
+            default=None,
+            metavar="dir",
+            help=(
+                "Link wheels from a global content addressed package store"
+                " into the venv, defaults to the user level store"
+            ),
+        )
+
+        parser.add_argument(
+            "--native",
+            action="store_true",
+            help=(
+                "Install wheels from the wheelhouse with the native parallel"
+                " installer instead of pip"
+            ),
+        )
+
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of concurrent downloads and installs",
+        )
+
+    def get_store(self, config: PepsinConfig) -> Optional[PackageStore]:
+        """
+        Returns package store from cli options or the config file
+        Args:
+            config: PepsinConfig instance
+
+        Returns: PackageStore instance or None
+        """
+        path = self.command_data.get("store")
+        if path is None and config.store:
+            path = config.store if isinstance(config.store, str) else ""
+        return None if path is None else PackageStore(path)
+
+    def get_wheelhouse(self, config: PepsinConfig) -> Optional[Wheelhouse]:
+        """
+        Returns wheelhouse from cli options or the config file
+        Args:
+            config: PepsinConfig instance
+
+        Returns: Wheelhouse instance or None
+        """
+        path = self.command_data.get("wheelhouse")
+        if path is None and config.wheelhouse:
+            path = (
+                config.wheelhouse if isinstance(config.wheelhouse, str) else ""
+            )
+        if path is None and (
+            self.get_store(config) or self.command_data.get("native")
+        ):
+            # Wheels are downloaded to the user wheelhouse
+            path = ""
+        if path is None:
+            return None
+        return Wheelhouse(path, self.command_data.get("jobs") or config.jobs)
+
     def execute(self):
         """
         Installs library
         """
         # pepsin Config instance
         config = PepsinConfig()
-        # If venv and no config is initialized then create venv and config
-        config.initialize_config()
-        py_handler = PyHandler(config)
-        libs = get_default(self.command_data.get("libraries_to_install"), [])
-        requirement = self.command_data.get("r")
-        if not libs and not requirement:
-            libs = config.libraries
-        installed = py_handler.install_libraries(
-            libs, requirements=requirement
-        )[0]
-        config.update(libraries=installed)
+        with config.transaction():
+            # If venv and no config is initialized then create venv and config
+            config.initialize_config()
+            py_handler = PyHandler(config)
+            libs = get_default(
+                self.command_data.get("libraries_to_install"), []
+            )
+            requirement = self.command_data.get("r")
+            wheelhouse = self.get_wheelhouse(config)
+            store = self.get_store(config)
+            install_config_libs = not libs and not requirement
+            if install_config_libs:
+                libs = config.libraries
+                lock = LockFile()
+                lock_hash = lock.content_hash() if lock.is_fresh(libs) else ""
+                force = self.command_data.get("force")
+                if not force and py_handler.is_up_to_date(libs, lock_hash):
+                    self.output("Libraries are up to date")
+                    return
+                if lock_hash:
+                    # Lock contains the resolved closure, no resolution needed
+                    if wheelhouse:
+                        py_handler.install_from_wheelhouse(
+                            lock.packages,
+                            wheelhouse,
+                            store,
+                            native=self.command_data.get("native"),
+                        )
+                    else:
+                        py_handler.install_locked(lock)
+                    py_handler.save_fingerprint(libs, lock_hash)
+                    return
+                if lock.exists():
+                    self.error(
+                        f"{lock.filename} is out of date, run `pepsin lock`"
+                    )
+            if wheelhouse:
+                installed = py_handler.collect_libraries(libs, requirement)
+                packages = py_handler.resolve_libraries(
+                    installed, keep_installed=True
+                )[0]
+                py_handler.install_from_wheelhouse(
+                    packages,
+                    wheelhouse,
+                    store,
+                    native=self.command_data.get("native"),
+                )
+                failed = []
+            else:
+                installed, failed = py_handler.install_libraries(
+                    libs,
+                    requirements=requirement,
+                    batch=not self.command_data.get("no_batch"),
+                )
+            config.update(libraries=installed)
+            if install_config_libs and not failed:
+                py_handler.save_fingerprint(config.libraries)
@@ -0,0 +1,40 @@
+"""
+Lock Command
+Usage:
+    `pepsin lock`
+
+Resolves the libraries in the config file and writes the full
+dependency closure with exact versions and hashes to `pepsin.lock`,
+`install` and `upgrade` install straight from the lock afterwards
+"""
+from pepsin.base import BaseCommand
+from pepsin.config import PepsinConfig
+from pepsin.lock import LockFile
+from pepsin.pyhandler import PyHandler
+
+
+class Lock(BaseCommand):
+    """
+    Lock command class
+    """
+
+    short_description = "Generate lock file"
+    help = """Resolves libraries and writes pinned versions and hashes
+    to pepsin.lock
+    `$pepsin lock`
+    """
+
+    def execute(self):
+        """
+        Resolves libraries and writes the lock file
+        """
+        config = PepsinConfig()
+        with config.transaction():
+            config.initialize_config()
+            py_handler = PyHandler(config)
+            libs = list(config.libraries)
+            packages, environment = (
+                py_handler.resolve_libraries(libs) if libs else ([], {})
+            )
+            LockFile().update(libs, packages, environment)
+            self.output(f"Locked {len(packages)} packages in pepsin.lock")
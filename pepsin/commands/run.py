@@ -1,13 +1,36 @@
 """
 Runs a script
+
+Usage:
+    `$pepsin run <script>`
+    `$pepsin run -p <script> <script> ...`
+
+Optional Parameters:
+    --exec: Replaces pepsin with the python interpreter of the venv
+    --no-fork: Does not use the fork server of the `preload` modules
+    -p, --parallel: Runs every given script concurrently, with the
+        scripts they depend on
+    -j, --jobs: Number of scripts to run at once, default: number of cpus
+    --fail-fast: Stops the other scripts after the first failure
+    --no-cache: Runs scripts with `inputs` instead of restoring their
+        cached outputs and log
 """
 from argparse import ArgumentParser
 from subprocess import CalledProcessError
-from typing import List
+from typing import Dict, List, Optional
 
 from pepsin.base import BaseCommand
 from pepsin.config import PepsinConfig
+from pepsin.error import InvalidCommandError
+from pepsin.parallel import format_summary
 from pepsin.pyhandler import PyHandler
+from pepsin.tasks import (
+    Task,
+    TaskRunner,
+    get_script_args,
+    get_task_order,
+    parse_tasks,
+)
 
 
 class Run(BaseCommand):
@@ -19,6 +42,16 @@ class Run(BaseCommand):
     help = """Runs a particular or multiple scripts from the config file
     `$pepsin run <script>`
     Example: `$pepsin run start`
+    `--exec` replaces pepsin with the venv interpreter, so pepsin does not
+    stay in memory and signals reach the script directly
+    With `preload` modules in the config scripts are forked from a warm
+    interpreter that has the modules imported, `--no-fork` disables it
+    `$pepsin run -p lint typecheck test` runs the scripts concurrently
+    with prefixed output and a summary of their exit status
+    Scripts with `depends_on` run after their dependencies, independent
+    scripts run concurrently, scripts whose `outputs` are newer than their
+    `inputs` are up to date and do not run, results of scripts with
+    `inputs` are cached by the content of the inputs
     """
 
     def add_argument(self, parser: ArgumentParser):
@@ -32,27 +65,144 @@ class Run(BaseCommand):
         )
 
         parser.add_argument(
-            "command",
-            metavar="<command>",
+            "scripts",
+            metavar="script",
             nargs="*",
-            help="Pip command, IE: freeze",
+            help="Further scripts to run concurrently with --parallel",
+        )
+        parser.add_argument(
+            "--exec",
+            action="store_true",
+            help="Replace pepsin with the python interpreter of the venv",
+        )
+        parser.add_argument(
+            "--no-fork",
+            action="store_true",
+            help="Do not use the fork server of the preloaded modules",
+        )
+        parser.add_argument(
+            "-p",
+            "--parallel",
+            action="store_true",
+            help="Run every given script concurrently",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=None,
+            help="Number of scripts to run at once, default: number of cpus",
+        )
+        parser.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="Stop the other scripts after the first failure",
         )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Run scripts with inputs instead of restoring cached results",
+        )
+
+    def graph_execute(
+        self, handler: PyHandler, tasks: Dict[str, Task], order: List[str]
+    ):
+        """
+        Runs scripts after their dependencies, independent scripts run
+        concurrently, and outputs a summary
+        Args:
+            handler: PyHandler instance
+            tasks: Dict | Scripts of the config
+            order: List[str] | Scripts to run in a topological order
+
+        Returns: None
+        """
+        cache = None
+        if not self.command_data.get("no_cache") and any(
+            tasks[name].inputs for name in order
+        ):
+            from pepsin.task_cache import (  # pylint: disable=import-outside-toplevel
+                TaskCache,
+            )
+
+            cache = TaskCache()
+        results = TaskRunner(
+            tasks,
+            order,
+            handler.executable,
+            self.stdout,
+            cache=cache,
+            environment=handler.get_snapshot_key() if cache else "",
+            jobs=self.command_data.get("jobs"),
+            fail_fast=self.command_data.get("fail_fast"),
+            env=handler.env,
+        ).run()
+        for result, line in zip(results, format_summary(results)):
+            self.stdout.write(
+                line, msg_type="success" if result.succeeded else "error"
+            )
+        failed = [result for result in results if not result.succeeded]
+        if failed:
+            raise InvalidCommandError(
+                f"{len(failed)} of {len(results)} scripts did not succeed"
+            )
+
+    def fork_execute(
+        self, handler: PyHandler, preload: List[str], script_args: List[str]
+    ) -> Optional[int]:
+        """
+        Runs the script in a child of the fork server
+        Returns: int | Exit code, None if the fork server is unavailable
+        """
+        from pepsin.fork_client import (  # pylint: disable=import-outside-toplevel
+            ForkClient,
+            is_supported,
+        )
+
+        venv_dir = handler.get_venv_dir()
+        if not venv_dir or not is_supported():
+            return None
+        client = ForkClient(handler.executable, venv_dir, preload, handler.env)
+        return client.run(script_args)
 
     def execute(self):
         config = PepsinConfig()
         handler = PyHandler(pepsin_config=config)
         script_name = self.command_data.get("script")[0]
-        if script_name in config.scripts:
-            try:
-                script_env: List[str] = config.scripts[script_name].split(" ")
-                is_package = True
-                for value in script_env:
-                    if ".py" in value:
-                        is_package = False
-                if is_package:
-                    script_env.insert(0, "-m")
-                handler.python_execute(*script_env)
-            except CalledProcessError:
-                self.error(f"Error in script : {script_name}")
-        else:
+        tasks = parse_tasks(config.scripts)
+        targets = [script_name]
+        if self.command_data.get("parallel"):
+            targets = list(
+                dict.fromkeys(targets + self.command_data["scripts"])
+            )
+        elif script_name not in tasks:
             self.error(f"No script named {script_name}")
+            return
+        order = get_task_order(tasks, targets)
+        task = tasks[script_name]
+        if (
+            self.command_data.get("parallel")
+            or len(order) > 1
+            or task.inputs
+            or task.outputs
+            or not task.command
+        ):
+            self.graph_execute(handler, tasks, order)
+            return
+        script_args = get_script_args(task.command)
+        preload = config.preload or []
+        if preload and not (
+            self.command_data.get("exec") or self.command_data.get("no_fork")
+        ):
+            code = self.fork_execute(handler, preload, script_args)
+            if code is not None:
+                if code:
+                    self.error(f"Error in script : {script_name}")
+                return
+        try:
+            if self.command_data.get("exec"):
+                handler.python_exec(*script_args)
+            else:
+                handler.python_execute(*script_args)
+        except (CalledProcessError, OSError):
+            self.error(f"Error in script : {script_name}")
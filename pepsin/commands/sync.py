@@ -0,0 +1,98 @@
+"""
+Sync Command
+Usage:
+    `pepsin sync`
+
+Scans the installed distributions of the venv once and installs or
+removes only the packages that differ from `pepsin.lock`, or from the
+libraries in the config file if there is no lock
+
+Optional Parameters:
+`--dry-run`
+Shows the changes without applying them
+"""
+import subprocess
+from argparse import ArgumentParser
+
+from pepsin.base import BaseCommand
+from pepsin.config import PepsinConfig
+from pepsin.error import InvalidCommandError
+from pepsin.lock import LockFile
+from pepsin.pyhandler import PyHandler
+from pepsin.sync import (
+    get_venv_environment,
+    plan_from_libraries,
+    plan_from_lock,
+)
+
+
+class Sync(BaseCommand):
+    """
+    Sync command class
+    """
+
+    short_description = "Sync environment with config"
+    help = """Installs and removes only the libraries that differ between
+    the virtual environment and pepsin.lock / pepsin.yaml
+    `$pepsin sync`
+    """
+
+    def add_argument(self, parser: ArgumentParser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show the changes without applying them",
+        )
+
+    def execute(self):
+        """
+        Reconciles the venv with the lock or config
+        """
+        config = PepsinConfig()
+        with config.transaction():
+            config.initialize_config()
+            py_handler = PyHandler(config)
+            libs = list(config.libraries)
+            lock = LockFile()
+            lock_hash = lock.content_hash() if lock.is_fresh(libs) else ""
+            if lock.exists() and not lock_hash:
+                self.error(
+                    f"{lock.filename} is out of date, run `pepsin lock`"
+                )
+            installed = py_handler.installed_packages()
+            if lock_hash:
+                plan = plan_from_lock(lock, installed)
+            else:
+                plan = plan_from_libraries(
+                    libs,
+                    installed,
+                    get_venv_environment(py_handler.get_venv_dir()),
+                )
+
+            if plan.is_empty():
+                self.output("Environment is in sync")
+                py_handler.save_fingerprint(libs, lock_hash)
+                return
+            for title, values in [
+                ("Add", plan.add),
+                ("Change", plan.change),
+                ("Remove", plan.remove),
+            ]:
+                for value in values:
+                    self.output(f"{title}: {value.split(' --hash')[0]}")
+            if self.command_data.get("dry_run"):
+                return
+            try:
+                if plan.remove:
+                    py_handler.pip_execute("uninstall", "-y", *plan.remove)
+                if plan.to_install():
+                    py_handler.install_requirements(
+                        plan.to_install(),
+                        no_deps=plan.no_deps,
+                        require_hashes=plan.require_hashes,
+                    )
+            except subprocess.CalledProcessError as error:
+                raise InvalidCommandError(
+                    "Unable to sync environment"
+                ) from error
+            py_handler.save_fingerprint(libs, lock_hash)
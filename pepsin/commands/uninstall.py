@@ -35,6 +35,7 @@ class Uninstall(BaseCommand):
         libs = get_default(libs, [])
         if libs:
             config = PepsinConfig()
-            py_handler = PyHandler(pepsin_config=config)
-            passed = py_handler.uninstall_libraries(libs)[0]
-            config.remove_libraries(passed)
+            with config.transaction():
+                py_handler = PyHandler(pepsin_config=config)
+                passed = py_handler.uninstall_libraries(libs)[0]
+                config.remove_libraries(passed)
@@ -5,6 +5,7 @@ from argparse import ArgumentParser
 
 from pepsin.base import BaseCommand
 from pepsin.config import PepsinConfig
+from pepsin.lock import LockFile
 from pepsin.pyhandler import PyHandler
 from pepsin.utils import get_default
 
@@ -37,20 +38,35 @@ class Upgrade(BaseCommand):
             default="",
         )
 
+        parser.add_argument(
+            "--no-batch",
+            action="store_true",
+            help="Run pip once per library instead of a single batch",
+        )
+
     def execute(self):
         """
         Installs library
         """
         # pepsin Config instance
         config = PepsinConfig()
-        # If venv and no config is initialized then create venv and config
-        config.initialize_config()
-        py_handler = PyHandler(config)
-        libs = get_default(self.command_data.get("libs"), [])
-        requirement = self.command_data.get("r")
-        if not libs and not requirement:
-            libs = config.libraries
-        installed = py_handler.upgrade_libraries(
-            libs, requirements=requirement
-        )[0]
-        config.update(libraries=installed)
+        with config.transaction():
+            # If venv and no config is initialized then create venv and config
+            config.initialize_config()
+            py_handler = PyHandler(config)
+            libs = get_default(self.command_data.get("libs"), [])
+            requirement = self.command_data.get("r")
+            if not libs and not requirement:
+                libs = config.libraries
+                lock = LockFile()
+                if lock.is_fresh(libs):
+                    # Upgrade to the versions pinned by `pepsin lock`
+                    py_handler.install_locked(lock)
+                    py_handler.save_fingerprint(libs, lock.content_hash())
+                    return
+            installed = py_handler.upgrade_libraries(
+                libs,
+                requirements=requirement,
+                batch=not self.command_data.get("no_batch"),
+            )[0]
+            config.update(libraries=installed)
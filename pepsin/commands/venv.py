@@ -0,0 +1,173 @@
+"""
+Venv Command
+Usage:
+    `pepsin venv pool --size <n>`
+    `pepsin venv snapshot`
+    `pepsin venv restore`
+    `pepsin venv clone <src> <dst>`
+
+Manages virtual environments
+
+Actions:
+`pool`
+Creates a pool of empty venvs for the current interpreter in the user
+cache directory, `pepsin init` and every command that creates a venv
+claims a venv from the pool instead of creating one
+
+`snapshot`
+Archives the project venv, the snapshot is named by the interpreter and
+the hash of `pepsin.lock`, or of the libraries if there is no fresh lock
+
+`restore`
+Restores the project venv from the matching snapshot, a missing venv is
+restored automatically only if `pepsin.lock` is fresh and its snapshot
+exists, the libraries of the config do not pin what a snapshot contains
+
+`clone`
+Copies a venv with hardlinks or reflinks and rewrites the files that
+contain its location, `clone_from` in the config file clones a missing
+project venv from another venv
+
+Optional Parameters:
+`--size`
+Number of venvs kept in the pool, 0 removes the pool
+
+`--dir`
+Snapshot directory, defaults to the user cache directory
+
+`--force`
+Replace an existing venv on restore
+
+`--link-mode`
+How clone shares files, hardlink, reflink or copy
+"""
+import shutil
+from argparse import ArgumentParser
+
+from pepsin.base import BaseCommand
+from pepsin.config import PepsinConfig
+from pepsin.error import InvalidCommandError
+from pepsin.pyhandler import PyHandler
+from pepsin.snapshot import SnapshotStore
+from pepsin.utils import check_dir_exists, get_default, get_python_executable
+from pepsin.venv_clone import clone_venv
+from pepsin.venv_pool import DEFAULT_POOL_SIZE, VenvPool
+
+
+class Venv(BaseCommand):
+    """
+    Venv command class
+    """
+
+    short_description = "Manage virtual environments"
+    help = """Manages virtual environments
+    `$pepsin venv pool --size 2`
+    `$pepsin venv snapshot`
+    `$pepsin venv restore`
+    `$pepsin venv clone venv test_venv`
+    """
+
+    def add_argument(self, parser: ArgumentParser):
+        parser.add_argument(
+            "action",
+            choices=["pool", "snapshot", "restore", "clone"],
+            help="Action to perform",
+        )
+        parser.add_argument(
+            "args",
+            nargs="*",
+            metavar="path",
+            help="Source and destination venv of clone",
+        )
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=DEFAULT_POOL_SIZE,
+            help="Number of venvs kept in the pool, 0 removes the pool",
+        )
+        parser.add_argument(
+            "--dir",
+            default="",
+            help="Snapshot directory",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Replace an existing venv on restore",
+        )
+        parser.add_argument(
+            "--link-mode",
+            choices=["hardlink", "reflink", "copy"],
+            default="hardlink",
+            help="How clone shares files with the source venv",
+        )
+
+    def pool(self):
+        """
+        Creates, refills or removes the venv pool
+        """
+        size = self.command_data.get("size")
+        pool = VenvPool(get_python_executable())
+        if size <= 0:
+            pool.clear()
+            self.output("Venv pool removed")
+            return
+        created = pool.fill(size)
+        self.output(
+            f"Venv pool ready with {len(pool.entries())} venvs,"
+            f" created {created}"
+        )
+
+    def snapshot(self):
+        """
+        Archives the project venv
+        """
+        config = PepsinConfig()
+        if not config.venv or not check_dir_exists(config.venv):
+            raise InvalidCommandError("No virtual environment to snapshot")
+        py_handler = PyHandler(config)
+        store = SnapshotStore(self.command_data.get("dir"))
+        self.output(f"Snapshot saved to {py_handler.save_snapshot(store)}")
+
+    def restore(self):
+        """
+        Restores the project venv from the matching snapshot
+        """
+        config = PepsinConfig()
+        with config.transaction():
+            config.initialize_config()
+            venv = get_default(config.venv, "venv")
+            # Keep PyHandler from creating the venv
+            config.venv = ""
+            py_handler = PyHandler(config, skip_venv=True)
+            py_handler.venv = venv
+            store = SnapshotStore(self.command_data.get("dir"))
+            key = py_handler.get_snapshot_key()
+            if not store.exists(key):
+                raise InvalidCommandError(f"No snapshot {key} in {store.path}")
+            if check_dir_exists(venv):
+                if not self.command_data.get("force"):
+                    raise InvalidCommandError(
+                        f"{venv} already exists, use --force to replace it"
+                    )
+                shutil.rmtree(venv)
+            py_handler.restore_snapshot(store)
+            config.update(venv=venv)
+            self.output(f"Restored {venv} from snapshot")
+
+    def clone(self):
+        """
+        Clones a venv
+        """
+        if len(self.command_args) != 2:
+            raise InvalidCommandError("clone requires <src> and <dst>")
+        src, dst = self.command_args
+        try:
+            modes = clone_venv(src, dst, self.command_data.get("link_mode"))
+        except (FileNotFoundError, FileExistsError) as error:
+            raise InvalidCommandError(str(error)) from error
+        summary = ", ".join(f"{count} {mode}" for mode, count in modes.items())
+        self.output(f"Cloned {src} to {dst} ({summary})")
+
+    def execute(self):
+        getattr(self, self.command_data.get("action"))()
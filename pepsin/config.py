@@ -1,12 +1,24 @@
 """
 Pepsin configuration handler
 """
+import contextlib
 from datetime import datetime
 from typing import Any, Dict, List, Union
 
+from pepsin.libraries import LibrarySet
 from pepsin.utils import check_file_exists, update_file
 from pepsin.yml import YAMLConfig
 
+# Settings that are only written to the config file when they are set
+OPTIONAL_SETTINGS = [
+    "wheelhouse",
+    "jobs",
+    "store",
+    "installer",
+    "clone_from",
+    "preload",
+]
+
 
 def get_project_name(**options) -> str:
     """
@@ -54,12 +66,23 @@ class PepsinConfig:
         "license",
         "libraries",
         "scripts",
+        "wheelhouse",
+        "jobs",
+        "store",
+        "installer",
+        "clone_from",
+        "preload",
         "__conf",
+        "__depth",
+        "__pending",
     ]
 
     def __init__(self):
-        self.libraries = []
+        self.libraries = LibrarySet()
         self.__conf = YAMLConfig("pepsin.yaml")
+        # Open transactions and whether they hold unsaved changes
+        self.__depth = 0
+        self.__pending = False
         self.venv = "venv"
         self.set_config()
 
@@ -80,9 +103,10 @@ class PepsinConfig:
         """
         conf = self.read_config()
         for slot in self.get_slots():
+            # The read config is frozen and shared without a copy
             setattr(self, slot, conf.get(slot))
-        if not self.libraries:
-            self.libraries = []
+        # Libraries are the only edited setting, LibrarySet copies them
+        self.libraries = LibrarySet(self.libraries or [])
 
     def reload(self):
         """
@@ -94,9 +118,9 @@ class PepsinConfig:
 
     def get_slots(self):
         """
-        Returns: List of slot excluding conf
+        Returns: List of slot excluding private slots
         """
-        return [slot for slot in self.__slots__ if slot != "__conf"]
+        return [slot for slot in self.__slots__ if not slot.startswith("__")]
 
     @staticmethod
     def config_exists() -> bool:
@@ -124,16 +148,15 @@ class PepsinConfig:
         for key in data:
             if key != "libraries" and key in self.get_slots():
                 setattr(self, key, data.get(key))
-        # Update configuration and save to yaml
-        self.__conf.append(self.format_config())
-        self.__conf.save()
+        self.save()
 
     def update_libraries(self, libs: List[str]):
         """
         Appends / modified libraries in the config
         If one library already exists in the config, it will pass
         but if the library with different version exists it will be
-        replaced with the new one
+        replaced with the new one, libraries are matched by their
+        canonical name, so `django` does not replace `django-filter`
         Args:
             libs: List[str] | List of libraries
 
@@ -142,18 +165,7 @@ class PepsinConfig:
         """
         if not libs:
             return
-        for lib in libs:
-            # Find similar libraries and remove them
-            # 'lib==2.3.4' replace with 'lib=2.3.5'
-            # Remove 'lib==2.3.4'
-            # Add 'lib==2.3.5'
-            # Split using '==' and match first 2 strings
-            for conf_lib in self.libraries:
-                if lib.split("==")[0] in conf_lib.split("==")[0]:
-                    index = self.libraries.index(conf_lib)
-                    del self.libraries[index]
-
-            self.libraries.append(lib)
+        self.libraries.update(libs)
 
     def remove_libraries(self, libs: List[str]):
         """
@@ -165,21 +177,58 @@ class PepsinConfig:
 
         """
         for lib in libs:
-            if lib in self.libraries:
-                self.libraries.remove(lib)
+            self.libraries.remove(lib)
+        self.save()
+
+    def save(self):
+        """
+        Saves configuration to the yaml config, inside a transaction
+        the write is postponed until the transaction ends
+        Returns: None
+        """
+        if self.__depth:
+            self.__pending = True
+            return
+        self.__pending = False
         # Update configuration and save to yaml
-        self.__conf.append(**self.format_config())
+        self.__conf.append(self.format_config())
         self.__conf.save()
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Collects every change made inside the block and writes the
+        config once when the outermost block exits, changes are also
+        written if the block raises as they describe changes already
+        made to the project, like a created venv
+        Examples
+            ```
+            with config.transaction():
+                config.update(venv="venv")
+                config.update(libraries=["django"])
+            ```
+        """
+        self.__depth += 1
+        try:
+            yield self
+        finally:
+            self.__depth -= 1
+            if not self.__depth and self.__pending:
+                self.save()
+
     def format_config(self) -> Dict:
         """
         Formats configuration to dump into yaml file
         Returns: Dict | Dictionary of configurations
         """
-        return {
-            key: get_or_empty_str(getattr(self, key))
-            for key in self.get_slots()
-        }
+        config = {}
+        for key in self.get_slots():
+            value = getattr(self, key)
+            if isinstance(value, LibrarySet):
+                value = value.to_list()
+            if key not in OPTIONAL_SETTINGS or value:
+                config[key] = get_or_empty_str(value)
+        return config
 
     def initialize_config(self, **kwargs):
         """
@@ -0,0 +1,92 @@
+"""
+Fingerprint of an installed library set
+
+A fingerprint is stored inside the virtual environment after a successful
+install, it covers the library set, the interpreter and the state of the
+site-packages directories, if none of them changed since the last install
+there is nothing for pip to do
+"""
+import hashlib
+import os
+from typing import List, Optional
+
+from pepsin.utils import find_site_packages, read_file, write_file
+
+FINGERPRINT_FILE = ".pepsin-fingerprint"
+
+
+def get_fingerprint_file(venv_dir: str) -> str:
+    """
+    Returns: str | Path of the fingerprint file inside the venv
+    """
+    return os.path.join(venv_dir, FINGERPRINT_FILE)
+
+
+def compute_fingerprint(
+    venv_dir: str, libs: List[str], lock_hash: str = ""
+) -> str:
+    """
+    Computes fingerprint of the library set and the venv state
+    Args:
+        venv_dir: Virtual environment directory
+        libs: List of libraries
+        lock_hash: Content hash of the lock the libraries were installed from
+
+    Returns: str | Hex digest of the fingerprint
+    """
+    digest = hashlib.sha256()
+    for lib in sorted(set(libs)):
+        digest.update(f"lib:{lib}\n".encode("utf-8"))
+    digest.update(f"lock:{lock_hash}\n".encode("utf-8"))
+    # Interpreter, virtualenv writes the base python home and version
+    # in pyvenv.cfg
+    digest.update(read_file(os.path.join(venv_dir, "pyvenv.cfg")).encode())
+    # Installing, upgrading or removing a distribution adds or removes
+    # a directory in site-packages which changes its mtime
+    for site_packages in find_site_packages(venv_dir):
+        stat = os.stat(site_packages)
+        digest.update(f"site:{site_packages}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def read_fingerprint(venv_dir: str) -> Optional[str]:
+    """
+    Returns: str | Stored fingerprint or None
+    """
+    fingerprint = read_file(get_fingerprint_file(venv_dir)).strip()
+    return fingerprint if fingerprint else None
+
+
+def write_fingerprint(venv_dir: str, libs: List[str], lock_hash: str = ""):
+    """
+    Stores the fingerprint of the library set in the venv
+    Args:
+        venv_dir: Virtual environment directory
+        libs: List of libraries
+        lock_hash: Content hash of the lock the libraries were installed from
+
+    Returns: None
+    """
+    if os.path.isdir(venv_dir):
+        write_file(
+            get_fingerprint_file(venv_dir),
+            compute_fingerprint(venv_dir, libs, lock_hash),
+        )
+
+
+def check_fingerprint(
+    venv_dir: str, libs: List[str], lock_hash: str = ""
+) -> bool:
+    """
+    Checks if the stored fingerprint matches the current state
+    Args:
+        venv_dir: Virtual environment directory
+        libs: List of libraries
+        lock_hash: Content hash of the lock the libraries were installed from
+
+    Returns: bool
+    """
+    stored = read_fingerprint(venv_dir)
+    return stored is not None and stored == compute_fingerprint(
+        venv_dir, libs, lock_hash
+    )
@@ -0,0 +1,216 @@
+"""
+Client of the fork server
+
+`pepsin run` hands the script to a warm fork server of the project that
+has the `preload` modules of the config already imported, the server is
+started on first use and replaced when it is outdated, IE: a library was
+installed or a preloaded source file changed
+"""
+import hashlib
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from pepsin.const import PEPSIN_ROOT
+from pepsin.fingerprint import get_fingerprint_file
+from pepsin.fork_server import Channel
+from pepsin.utils import find_site_packages
+
+START_TIMEOUT = 120
+FORWARDED_SIGNALS = ["SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT"]
+
+
+def is_supported() -> bool:
+    """
+    Returns: bool | True if the platform can fork and pass file descriptors
+    """
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX")
+
+
+def get_socket_path(project_dir: str) -> str:
+    """
+    Returns: str | Socket of the fork server of a project, in a directory
+    only the current user can access
+    """
+    runtime_dir = os.path.join(tempfile.gettempdir(), f"pepsin-{os.getuid()}")
+    os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+    stat = os.stat(runtime_dir)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise PermissionError(f"{runtime_dir} is accessible by other users")
+    digest = hashlib.sha256(
+        os.path.realpath(project_dir).encode("utf-8")
+    ).hexdigest()
+    return os.path.join(runtime_dir, f"{digest[:16]}.sock")
+
+
+def get_server_key(executable: str, venv_dir: str, modules: List[str]) -> str:
+    """
+    Key of a fork server, changes when the interpreter, the preloaded
+    modules or the installed distributions change
+    Args:
+        executable: Python interpreter of the venv
+        venv_dir: Virtual environment directory
+        modules: Preloaded modules
+
+    Returns: str | Hex digest
+    """
+    stamps = []
+    for path in [
+        *find_site_packages(venv_dir),
+        get_fingerprint_file(venv_dir),
+    ]:
+        try:
+            stamps.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            stamps.append([path, None])
+    text = json.dumps([os.path.realpath(executable), list(modules), stamps])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ForkClient:
+    """
+    Runs scripts through the fork server of a project
+    1. Connects to the running server or starts one
+    2. Passes stdin, stdout and stderr to the forked child
+    3. Forwards signals to the child and returns its exit code
+    """
+
+    server_script = os.path.join(PEPSIN_ROOT, "fork_server.py")
+
+    def __init__(
+        self,
+        executable: str,
+        venv_dir: str,
+        modules: List[str],
+        env: Optional[Dict[str, str]] = None,
+        project_dir: str = "",
+    ):
+        self.executable = executable
+        self.modules = list(modules)
+        self.env = env if env is not None else os.environ.copy()
+        self.project_dir = project_dir or os.getcwd()
+        self.socket_path = get_socket_path(self.project_dir)
+        self.key = get_server_key(executable, venv_dir, self.modules)
+
+    def connect(self) -> Optional[Channel]:
+        """
+        Returns: Channel | Connection to the server, None if no server
+        is listening
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            return None
+        return Channel(sock)
+
+    def start(self) -> Optional[Channel]:
+        """
+        Starts a server in its own session and waits until it listens,
+        the output of the server is written to `<socket>.log`
+        Returns: Channel | Connection to the server, None if it failed
+        """
+        with open(f"{self.socket_path}.log", "w", encoding="utf-8") as log:
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                [
+                    self.executable,
+                    self.server_script,
+                    self.socket_path,
+                    self.key,
+                    *self.modules,
+                ],
+                cwd=self.project_dir,
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=log,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline and process.poll() is None:
+            channel = self.connect()
+            if channel:
+                return channel
+            time.sleep(0.01)
+        return None
+
+    def stop(self) -> bool:
+        """
+        Asks the running server to exit
+        Returns: bool | False if no server is running
+        """
+        channel = self.connect()
+        if not channel:
+            return False
+        with channel.sock:
+            channel.send({"action": "exit"})
+        return True
+
+    def run(self, args: List[str]) -> Optional[int]:
+        """
+        Runs python arguments in a child of the server
+        Args:
+            args: List[str] | Arguments of the python interpreter,
+                  IE: `["-m", "pytest"]`
+
+        Returns: int | Exit code of the script, None if the server is
+                 unavailable and the script has not been started
+        """
+        message = {
+            "action": "run",
+            "key": self.key,
+            "argv": list(args),
+            "cwd": os.getcwd(),
+            "env": self.env,
+        }
+        for _ in range(2):
+            channel = self.connect() or self.start()
+            if not channel:
+                return None
+            with channel.sock:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                try:
+                    channel.send(message, [0, 1, 2])
+                    response, _ = channel.receive()
+                except (OSError, EOFError):
+                    return None
+                if not response.get("stale"):
+                    return self.wait(channel, response["pid"])
+        return None
+
+    @staticmethod
+    def wait(channel: Channel, pid: int) -> int:
+        """
+        Forwards signals to the child until the server reports its exit
+        Returns: int | Exit code of the child
+        """
+
+        def forward(signum, _):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+
+        handlers = {}
+        for name in FORWARDED_SIGNALS:
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                handlers[signum] = signal.signal(signum, forward)
+        try:
+            response, _ = channel.receive()
+        except (OSError, EOFError):
+            # The server died, the script has been started, it is not
+            # started again
+            response = {"code": 1}
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+        return response["code"]
@@ -0,0 +1,341 @@
+"""
+Fork server
+
+Runs inside the virtual environment's interpreter, imports the modules
+listed in `preload` once and forks a child for every `pepsin run`, so
+scripts start with their heavy imports already loaded.
+The module is executed as a script by the venv python and must not
+import pepsin.
+
+Protocol, length prefixed json objects over a unix socket:
+    request:  {"action": "run", "key": "...", "argv": [...], "cwd": "...",
+               "env": {...}} with stdin, stdout and stderr attached
+              {"action": "ping"}
+              {"action": "exit"}
+    response: {"pid": 1234} followed by {"code": 0} once the child exits
+              {"stale": true} if the server is outdated, the server exits
+
+The server is outdated when the key of the client differs, IE: the venv
+changed, or when a file imported by the server has been modified
+"""
+import array
+import json
+import os
+import runpy
+import select
+import signal
+import socket
+import struct
+import sys
+import traceback
+
+IDLE_TIMEOUT = 900
+MAX_FDS = 3
+HEADER = struct.Struct("!I")
+
+
+class Channel:
+    """
+    Sends and receives length prefixed json messages with attached file
+    descriptors over a unix socket
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+
+    def send(self, data, fds=()):
+        """
+        Sends a message, the file descriptors are duplicated into the
+        receiving process
+        """
+        payload = json.dumps(data).encode("utf-8")
+        frame = HEADER.pack(len(payload)) + payload
+        if not fds:
+            self.sock.sendall(frame)
+            return
+        sent = self.sock.sendmsg(
+            [frame],
+            [
+                (
+                    socket.SOL_SOCKET,
+                    socket.SCM_RIGHTS,
+                    array.array("i", fds).tobytes(),
+                )
+            ],
+        )
+        self.sock.sendall(frame[sent:])
+
+    def receive(self):
+        """
+        Returns: Tuple | Message and received file descriptors
+        Raises: EOFError if the other side closed the connection
+        """
+        fds = array.array("i")
+        while (
+            len(self.buffer) < HEADER.size
+            or len(self.buffer)
+            < HEADER.size + HEADER.unpack_from(self.buffer)[0]
+        ):
+            data, ancdata, _, _ = self.sock.recvmsg(
+                65536, socket.CMSG_SPACE(MAX_FDS * fds.itemsize)
+            )
+            for level, kind, cdata in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    fds.frombytes(
+                        cdata[: len(cdata) - len(cdata) % fds.itemsize]
+                    )
+            if not data:
+                raise EOFError("Connection closed")
+            self.buffer += data
+        size = HEADER.unpack_from(self.buffer)[0]
+        payload = self.buffer[HEADER.size : HEADER.size + size]
+        self.buffer = self.buffer[HEADER.size + size :]
+        return json.loads(payload.decode("utf-8")), list(fds)
+
+
+def get_loaded_files():
+    """
+    Returns: Dict | Source files of the imported modules and their mtime
+    """
+    files = {}
+    for module in list(sys.modules.values()):
+        filename = getattr(module, "__file__", None)
+        if not filename or filename in files:
+            continue
+        try:
+            files[filename] = os.stat(filename).st_mtime_ns
+        except OSError:
+            pass
+    return files
+
+
+def is_modified(files):
+    """
+    Returns: bool | True if an imported file has been modified or removed
+    """
+    for filename, mtime in files.items():
+        try:
+            if os.stat(filename).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+def get_exit_code(status):
+    """
+    Returns: int | Exit code of a wait status, like a shell reports it
+    """
+    if os.WIFSIGNALED(status):
+        return 128 + os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def run_child(message, fds):
+    """
+    Runs the script of a request in the forked child, never returns
+    """
+    for target, fd in zip(range(MAX_FDS), fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = os.fdopen(0, "r", closefd=False)
+    sys.stdout = os.fdopen(1, "w", buffering=1, closefd=False)
+    sys.stderr = os.fdopen(2, "w", buffering=1, closefd=False)
+    os.chdir(message["cwd"])
+    os.environ.clear()
+    os.environ.update(message["env"])
+    argv = message["argv"]
+    code = 0
+    try:
+        if argv[0] == "-m":
+            sys.argv = argv[1:]
+            sys.path[0] = os.getcwd()
+            runpy.run_module(argv[1], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = argv
+            sys.path[0] = os.path.dirname(os.path.abspath(argv[0]))
+            runpy.run_path(argv[0], run_name="__main__")
+    except SystemExit as error:
+        if error.code is None:
+            code = 0
+        elif isinstance(error.code, int):
+            code = error.code
+        else:
+            print(error.code, file=sys.stderr)
+            code = 1
+    except KeyboardInterrupt:
+        code = 128 + signal.SIGINT
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+    os._exit(code)  # pylint: disable=protected-access
+
+
+class ForkServer:
+    """
+    Accepts requests on the unix socket and forks a child per script
+    """
+
+    def __init__(self, socket_path, key, modules):
+        self.socket_path = socket_path
+        self.key = key
+        self.modules = modules
+        self.files = {}
+        self.children = {}
+        self.server = None
+        self.inode = None
+
+    def preload(self):
+        """
+        Imports the preloaded modules, modules that fail to import are
+        reported and skipped
+        """
+        for module in self.modules:
+            try:
+                __import__(module)
+            except Exception:  # pylint: disable=broad-except
+                print(f"Unable to preload {module}", file=sys.stderr)
+                traceback.print_exc()
+        self.files = get_loaded_files()
+
+    def bind(self):
+        """
+        Listens on the unix socket, only the owner can connect
+        """
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(16)
+        self.inode = os.stat(self.socket_path).st_ino
+
+    def unbind(self):
+        """
+        Removes the socket, unless another server already replaced it
+        """
+        if self.inode is None:
+            return
+        try:
+            if os.stat(self.socket_path).st_ino == self.inode:
+                os.remove(self.socket_path)
+        except OSError:
+            pass
+        # The inode can be reused by the socket of the next server
+        self.inode = None
+        self.server.close()
+
+    def reap(self, block=False):
+        """
+        Reports the exit code of finished children to their clients
+        Args:
+            block: bool | Waits until every child has finished
+        """
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            channel = self.children.pop(pid, None)
+            if channel is None:
+                continue
+            try:
+                channel.send({"code": get_exit_code(status)})
+            except OSError:
+                pass
+            channel.sock.close()
+
+    def handle(self, channel):
+        """
+        Handles one request
+        Returns: bool | False if the server has to exit
+        """
+        message, fds = channel.receive()
+        action = message.get("action")
+        if action == "ping":
+            channel.send({"key": self.key, "pid": os.getpid()})
+        elif action == "run" and (
+            message.get("key") != self.key or is_modified(self.files)
+        ):
+            for fd in fds:
+                os.close(fd)
+            # The socket is released before the client starts a new server
+            self.unbind()
+            channel.send({"stale": True})
+            return False
+        elif action == "run":
+            pid = os.fork()
+            if not pid:
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.set_wakeup_fd(-1)
+                self.server.close()
+                for other in [channel, *self.children.values()]:
+                    other.sock.close()
+                run_child(message, fds)
+            for fd in fds:
+                os.close(fd)
+            channel.send({"pid": pid})
+            self.children[pid] = channel
+            return True
+        channel.sock.close()
+        return action != "exit"
+
+    def serve(self):
+        """
+        Serves requests until `exit`, until the server is outdated or
+        until it has been idle for `PEPSIN_FORK_TIMEOUT` seconds
+        """
+        timeout = float(os.environ.get("PEPSIN_FORK_TIMEOUT", IDLE_TIMEOUT))
+        wakeup, notify = os.pipe()
+        os.set_blocking(notify, False)
+        signal.set_wakeup_fd(notify)
+        signal.signal(signal.SIGCHLD, lambda *args: None)
+        running = True
+        while running:
+            ready, _, _ = select.select(
+                [self.server, wakeup],
+                [],
+                [],
+                None if self.children else timeout,
+            )
+            if not ready:
+                break
+            if wakeup in ready:
+                os.read(wakeup, 512)
+                self.reap()
+            if self.server not in ready:
+                continue
+            sock, _ = self.server.accept()
+            sock.settimeout(5)
+            try:
+                running = self.handle(Channel(sock))
+            except (OSError, EOFError, ValueError):
+                sock.close()
+        self.unbind()
+        # Running scripts still report their exit code
+        self.reap(block=True)
+
+
+def main():
+    """
+    Starts the server, `fork_server.py <socket> <key> [module ...]`
+    """
+    socket_path, key, modules = sys.argv[1], sys.argv[2], sys.argv[3:]
+    # Imports resolve like `python -m`, not from the pepsin directory
+    sys.path[0] = os.getcwd()
+    server = ForkServer(socket_path, key, modules)
+    server.preload()
+    server.bind()
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Native wheel installer
+
+Installs already resolved wheels, from a lock or a wheelhouse, without
+pip. Wheels are unpacked straight into the venv (or linked from the
+package store), `INSTALLER`, `RECORD` and console scripts are written
+the same way pip does, so pip can still manage the packages afterwards.
+Wheels are installed in parallel on a thread pool, decompression and
+file writes release the GIL
+"""
+import os
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from pepsin.site_packages import get_distributions
+from pepsin.store import PackageStore
+from pepsin.utils import canonicalize_name
+from pepsin.wheel import (
+    check_safe_path,
+    finalize_install,
+    get_destination,
+    get_dist_info,
+    get_scheme,
+    get_venv_python,
+    read_record,
+    unlink_existing,
+    write_script,
+)
+
+DEFAULT_JOBS = 8
+
+
+class WheelInstaller:
+    """
+    Installs and uninstalls wheels in a venv
+    1. Unpacks wheels into the venv scheme or links them from a store
+    2. Generates console scripts from `entry_points.txt`
+    3. Removes distributions using their `RECORD`
+    """
+
+    def __init__(
+        self,
+        venv_dir: str,
+        jobs: int = DEFAULT_JOBS,
+        store: Optional[PackageStore] = None,
+    ):
+        self.venv_dir = os.path.abspath(venv_dir)
+        self.jobs = max(1, int(jobs or DEFAULT_JOBS))
+        self.store = store
+
+    def unpack(self, wheel: str) -> List[str]:
+        """
+        Unpacks a wheel straight into the venv
+        Args:
+            wheel: Path of the wheel file
+
+        Returns: List[str] | Absolute paths of the installed files
+        """
+        scheme = get_scheme(self.venv_dir)
+        python = get_venv_python(self.venv_dir)
+        with zipfile.ZipFile(wheel) as archive:
+            names = [
+                name for name in archive.namelist() if not name.endswith("/")
+            ]
+            for name in names:
+                check_safe_path(name)
+            dist_info = get_dist_info(names)
+            scheme["headers"] = os.path.join(
+                scheme["headers"], dist_info.split("-")[0]
+            )
+            record_name = f"{dist_info}/RECORD"
+            record = {}
+            installed = {}
+            for name in names:
+                destination = get_destination(name, scheme)
+                if destination is None or name == record_name:
+                    continue
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                if os.path.dirname(destination) == scheme["scripts"]:
+                    write_script(archive.read(name), destination, python)
+                    installed[destination] = None
+                    continue
+                unlink_existing(destination)
+                with archive.open(name) as source, open(
+                    destination, "wb"
+                ) as target:
+                    shutil.copyfileobj(source, target)
+                mode = (archive.getinfo(name).external_attr >> 16) & 0o777
+                if mode & 0o111:
+                    os.chmod(destination, mode)
+                installed[destination] = name
+            if record_name in names:
+                with archive.open(record_name) as file:
+                    content = file.read().decode("utf-8")
+                record_file = os.path.join(scheme["purelib"], record_name)
+                unlink_existing(record_file)
+                with open(record_file, "w", encoding="utf-8") as file:
+                    file.write(content)
+                record = read_record(record_file)
+        installed = {
+            destination: record.get(name) if name else None
+            for destination, name in installed.items()
+        }
+        return finalize_install(dist_info, scheme, installed, python)
+
+    def install_wheel(self, wheel: str) -> List[str]:
+        """
+        Installs one wheel
+        Args:
+            wheel: Path of the wheel file
+
+        Returns: List[str] | Absolute paths of the installed files
+        """
+        if self.store:
+            return self.store.install(wheel, self.venv_dir)
+        return self.unpack(wheel)
+
+    def install(self, wheels: List[str]) -> List[List[str]]:
+        """
+        Installs wheels in parallel
+        Args:
+            wheels: List of wheel files
+
+        Returns: List | Installed files of every wheel
+        """
+        if not wheels:
+            return []
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(self.install_wheel, wheels))
+
+    def uninstall(self, names: List[str]) -> List[str]:
+        """
+        Removes installed distributions using the files listed in
+        their `RECORD`
+        Args:
+            names: List of distribution names
+
+        Returns: List[str] | Names of the removed distributions
+        """
+        distributions = get_distributions(self.venv_dir)
+        scheme = get_scheme(self.venv_dir)
+        root = os.path.normpath(scheme["purelib"])
+        removed = []
+        for name in names:
+            distribution = distributions.get(canonicalize_name(name))
+            if not distribution:
+                continue
+            directories = set()
+            for file_name in distribution.files:
+                path = os.path.normpath(
+                    os.path.join(scheme["purelib"], file_name)
+                )
+                if os.path.lexists(path):
+                    os.remove(path)
+                    directories.add(os.path.dirname(path))
+                cache = os.path.join(os.path.dirname(path), "__pycache__")
+                if os.path.isdir(cache) and os.path.dirname(path) != root:
+                    directories.add(cache)
+            shutil.rmtree(distribution.path, ignore_errors=True)
+            for directory in sorted(directories, key=len, reverse=True):
+                self.__remove_empty(directory, scheme["purelib"])
+            removed.append(name)
+        return removed
+
+    @staticmethod
+    def __remove_empty(directory: str, site_packages: str):
+        """
+        Removes a directory of an uninstalled distribution and its empty
+        parents inside site-packages, `__pycache__` is always removed
+        """
+        if os.path.basename(directory) == "__pycache__":
+            shutil.rmtree(directory, ignore_errors=True)
+            directory = os.path.dirname(directory)
+        root = os.path.abspath(site_packages)
+        while directory.startswith(root) and directory != root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return
+            directory = os.path.dirname(directory)
@@ -0,0 +1,107 @@
+"""
+Library specifiers of the config file
+
+Libraries are kept in an ordered mapping keyed by the PEP 503 canonical
+name, adding, replacing and removing a library is O(1) and the order of
+the yaml list is preserved. Urls and paths without a name are keyed by
+the whole specifier
+"""
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pepsin.requirements import Requirement, parse_requirement
+
+
+def get_library_key(lib: str) -> str:
+    """
+    Returns: str | Canonical name of the library, the key of the library
+    in a LibrarySet
+    """
+    return parse_requirement(lib).key
+
+
+class LibrarySet:
+    """
+    Ordered set of library specifiers, one specifier per distribution
+    1. Iterates, compares and serializes like the yaml list
+    2. Adding a library replaces the specifier of the same distribution
+       in place, `django` never replaces `django-filter`
+    3. Membership and removal use the canonical name
+    """
+
+    __slots__ = ["__libraries"]
+
+    def __init__(self, libs: Optional[Iterable[str]] = None):
+        self.__libraries: Dict[str, str] = {}
+        self.update(libs or [])
+
+    def add(self, lib: str):
+        """
+        Adds a library or replaces the specifier of the same distribution
+        Args:
+            lib: str | Library specifier
+
+        Returns: None
+        """
+        lib = lib.strip()
+        if lib:
+            self.__libraries[get_library_key(lib)] = lib
+
+    def update(self, libs: Iterable[str]):
+        """
+        Adds multiple libraries
+        Args:
+            libs: Iterable[str] | Library specifiers
+
+        Returns: None
+        """
+        for lib in libs:
+            self.add(lib)
+
+    def remove(self, lib: str) -> Optional[str]:
+        """
+        Removes the library of the same distribution
+        Args:
+            lib: str | Library name or specifier
+
+        Returns: str | Removed specifier or None if it is not in the set
+        """
+        return self.__libraries.pop(get_library_key(lib), None)
+
+    def get(self, lib: str) -> Optional[str]:
+        """
+        Returns: str | Specifier of the same distribution or None
+        """
+        return self.__libraries.get(get_library_key(lib))
+
+    def requirements(self) -> List[Requirement]:
+        """
+        Returns: List[Requirement] | Parsed specifiers in order
+        """
+        return [parse_requirement(lib) for lib in self.__libraries.values()]
+
+    def to_list(self) -> List[str]:
+        """
+        Returns: List[str] | Specifiers in order, as written to the yaml
+        """
+        return list(self.__libraries.values())
+
+    def __contains__(self, lib) -> bool:
+        return (
+            isinstance(lib, str) and get_library_key(lib) in self.__libraries
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__libraries.values())
+
+    def __len__(self) -> int:
+        return len(self.__libraries)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LibrarySet):
+            return self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LibrarySet({self.to_list()!r})"
@@ -0,0 +1,162 @@
+"""
+Pepsin lock file handler
+
+`pepsin.lock` stores the fully resolved closure of the libraries in
+`pepsin.yaml` with exact versions and artifact hashes, installing from the
+lock skips dependency resolution and gives the same tree on every machine
+"""
+import hashlib
+import json
+from typing import Dict, List
+
+from pepsin.utils import check_file_exists
+from pepsin.yml import YAMLConfig, thaw
+
+LOCK_FILE = "pepsin.lock"
+LOCK_VERSION = 1
+
+
+def hash_libraries(libs: List[str]) -> str:
+    """
+    Hashes the library set the lock was generated from
+    Args:
+        libs: List[str] | List of libraries
+
+    Returns: str | Hex digest of the library set
+    """
+    text = "\n".join(sorted({lib.strip() for lib in libs if lib.strip()}))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_pip_report(report: Dict) -> List[Dict]:
+    """
+    Converts the `pip install --report` json into lock packages
+    Args:
+        report: Dict | pip installation report
+
+    Returns: List[Dict] | List of locked packages
+    """
+    packages = []
+    for item in report.get("install", []):
+        metadata = item.get("metadata", {})
+        download_info = item.get("download_info", {})
+        archive_info = download_info.get("archive_info", {})
+        hashes = archive_info.get("hashes", {})
+        if not hashes and archive_info.get("hash"):
+            algorithm, _, value = archive_info["hash"].partition("=")
+            hashes = {algorithm: value}
+        package = {
+            "name": metadata.get("name"),
+            "version": metadata.get("version"),
+            "url": download_info.get("url", ""),
+            "hashes": [
+                f"{algorithm}:{value}"
+                for algorithm, value in sorted(hashes.items())
+            ],
+        }
+        # Urls and paths of the libraries, not found on the index
+        if item.get("is_direct"):
+            package["direct"] = True
+        packages.append(package)
+    return sorted(packages, key=lambda package: package["name"].lower())
+
+
+class LockFile:
+    """
+    Pepsin Lock Blueprint and handler
+    1. Reads lock / `pepsin.lock` file
+    2. Checks if the lock matches the configured libraries
+    3. Converts locked packages into pip requirement lines
+    """
+
+    def __init__(self, filename: str = LOCK_FILE):
+        self.filename = filename
+        self.__conf = YAMLConfig(filename)
+        self.libraries_hash = self.__conf.get("libraries_hash")
+        self.environment = thaw(self.__conf.get("environment")) or {}
+        self.packages: List[Dict] = thaw(self.__conf.get("packages")) or []
+
+    def exists(self) -> bool:
+        """
+        Returns: bool | True if the lock file exists
+        """
+        return check_file_exists(self.filename)
+
+    def is_fresh(self, libs: List[str]) -> bool:
+        """
+        Checks if the lock has been generated from the given libraries
+        Args:
+            libs: List[str] | List of libraries
+
+        Returns: bool
+        """
+        return self.exists() and self.libraries_hash == hash_libraries(libs)
+
+    def content_hash(self) -> str:
+        """
+        Returns: str | Hex digest of the locked packages
+        """
+        text = json.dumps(self.packages, sort_keys=True)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def requires_hashes(self) -> bool:
+        """
+        Returns: bool | True if every locked package has a hash
+        """
+        return bool(self.packages) and all(
+            package.get("hashes") for package in self.packages
+        )
+
+    @staticmethod
+    def requirement(package: Dict, with_hashes: bool = True) -> str:
+        """
+        Converts one locked package into a pip requirement line
+        Args:
+            package: Dict | Locked package
+            with_hashes: bool | Appends the hashes of the package, a
+                         single hash turns on hash checking for every
+                         line of a requirement file
+
+        Returns: str | Requirement line with pinned version and hash,
+                 direct references keep their url
+        """
+        hashes = package.get("hashes") or []
+        if package.get("url") and (package.get("direct") or not hashes):
+            line = f"{package['name']} @ {package['url']}"
+        else:
+            line = f"{package['name']}=={package['version']}"
+        if not with_hashes:
+            return line
+        return line + "".join(f" --hash={value}" for value in hashes)
+
+    def to_requirements(self) -> List[str]:
+        """
+        Converts locked packages into pip requirement lines, hashes are
+        only written if every package has one
+        Returns: List[str] | Requirement lines with pinned version and hash
+        """
+        with_hashes = self.requires_hashes()
+        return [
+            self.requirement(package, with_hashes) for package in self.packages
+        ]
+
+    def update(self, libs: List[str], packages: List[Dict], environment=None):
+        """
+        Updates the lock and saves it
+        Args:
+            libs: List[str] | Libraries the lock was resolved from
+            packages: List[Dict] | Resolved packages
+            environment: Dict | Environment the lock was resolved in
+
+        Returns: None
+        """
+        self.libraries_hash = hash_libraries(libs)
+        self.environment = environment or {}
+        self.packages = list(packages)
+        self.__conf.append(
+            version=LOCK_VERSION,
+            libraries_hash=self.libraries_hash,
+            environment=self.environment,
+            packages=self.packages,
+        )
+        self.__conf.save()
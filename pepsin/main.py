@@ -5,11 +5,12 @@ import os
 import sys
 from typing import List, Optional
 
-from pepsin.base import get_command, get_commands
-from pepsin.base_io import IOBase
-from pepsin.const import COMMAND_NOT_FOUND_ERROR
+from pepsin.output import IOBase
 from pepsin.version import get_version
 
+# Commands are imported on demand, `--version` and the startup of a command
+# must not import the other commands and their dependencies
+
 
 class CLI(IOBase):
     """
@@ -52,6 +53,9 @@ class CLI(IOBase):
         Returns: str | List of commands with short description
 
         """
+        # pylint: disable=import-outside-toplevel
+        from pepsin.base import get_command, get_commands
+
         version = get_version()
         if self.command in ["--help", "-h", "help", "--h"]:
             string = [
@@ -84,6 +88,10 @@ class CLI(IOBase):
             self.output(version + "\n")
 
         else:
+            # pylint: disable=import-outside-toplevel
+            from pepsin.base import get_command
+            from pepsin.const import COMMAND_NOT_FOUND_ERROR
+
             try:
                 command_class = get_command(self.command)
                 command_class.run(self.argv)
@@ -0,0 +1,120 @@
+"""
+Colored cli output, kept free of heavy imports as every command
+and `pepsin --version` load it at startup
+"""
+import sys
+from io import TextIOBase
+
+# ANSI foreground colors, the values of `colorama.Fore`
+GREEN = "\033[32m"
+RED = "\033[31m"
+YELLOW = "\033[33m"
+CYAN = "\033[36m"
+
+
+def get_color_stream(out):
+    """
+    Wraps a stream like `colorama.init(autoreset=True)` wraps sys.stdout,
+    colorama is imported only when colored text is written
+    Args:
+        out: Stream to wrap
+
+    Returns: Stream that strips colors when `out` is not a terminal,
+             converts them on windows and resets them after every write
+    """
+    # pylint: disable=import-outside-toplevel
+    from colorama import AnsiToWin32
+
+    return AnsiToWin32(out, autoreset=True).stream
+
+
+class OutputWrapper(TextIOBase):
+    """
+    Output wrapper that uses std.out and enforces color
+    """
+
+    color_map = {
+        "success": GREEN,
+        "error": RED,
+        "warning": YELLOW,
+        "primary": CYAN,
+    }
+
+    def __init__(self, out, ending: str = "\n"):
+        super().__init__()
+        self._out = out
+        self._color_out = None
+        self.ending = ending
+
+    def flush(self):
+        """
+        Flush out text
+        Returns:
+
+        """
+        if hasattr(self._out, "flush"):
+            self._out.flush()
+
+    def write(
+        self,
+        msg: str = "",
+        ending: str = None,
+        msg_type: str = "text",
+        enforce_color: str = "",
+    ):
+        """
+        Outputs text
+        Args:
+            msg: str | Msg that will be in the output
+            ending: str | Ending of the msg
+            msg_type: str | Options - success, error, warning, primary
+            enforce_color: str | Color of the text
+
+        Returns:
+
+        """
+        ending = self.ending if ending is None else ending
+        if ending and not msg.endswith(ending):
+            msg += ending
+        color = self.color_map.get(msg_type, "")
+        color = enforce_color if enforce_color else color
+        if not color:
+            self._out.write(msg)
+            return
+        if self._color_out is None:
+            self._color_out = get_color_stream(self._out)
+        self._color_out.write(color + msg)
+
+
+class IOBase:
+    """
+    IOBase is a superclass for CLI Output and Error Handling
+    """
+
+    def __init__(self):
+        self.stdout = OutputWrapper(sys.stdout)
+        self.stderr = OutputWrapper(sys.stderr)
+
+    def output(self, text):
+        """
+        Text output on cli
+        """
+        self.stdout.write(text)
+
+    def output_flush(self):
+        """
+        Output cli flush
+        """
+        self.stdout.flush()
+
+    def error(self, text):
+        """
+        CLI Output for errors
+        """
+        self.stderr.write(text)
+
+    def error_flush(self):
+        """
+        CLI Error flush
+        """
+        self.stderr.flush()
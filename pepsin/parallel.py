@@ -0,0 +1,253 @@
+"""
+Runs several scripts concurrently
+
+Output of every script is read line by line and written with the name of
+the script as prefix, whole lines are written by a single thread so lines
+of different scripts never interleave
+"""
+import dataclasses
+import os
+import queue
+import signal
+import subprocess
+import threading
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+
+@dataclasses.dataclass
+class ScriptResult:
+    """
+    Outcome of one script
+    params:
+        name: str | Name of the script
+        code: int | Exit code, None if the script has not been started
+        duration: float | Run time in seconds
+        reason: str | Status of a script that did not have to run,
+                      IE: `up to date`
+    """
+
+    name: str
+    code: Optional[int] = None
+    duration: float = 0.0
+    reason: str = ""
+
+    @property
+    def status(self) -> str:
+        """
+        Returns: str | ok, failed, skipped or the reason the script did
+        not have to run
+        """
+        if self.reason:
+            return self.reason
+        if self.code is None:
+            return "skipped"
+        return "ok" if self.code == 0 else "failed"
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Returns: bool | True if the script ran or did not have to run
+        """
+        return self.code == 0
+
+
+def get_jobs(jobs: Optional[int] = None) -> int:
+    """
+    Returns: int | Number of scripts to run at once, defaults to the
+    number of cpus
+    """
+    return max(1, jobs or os.cpu_count() or 1)
+
+
+class ParallelRunner:
+    """
+    Runs commands concurrently
+    1. At most `jobs` commands run at once, in the given order
+    2. A command with `dependencies` starts once they all succeeded, it is
+       skipped if one of them did not
+    3. Output lines are prefixed with the name of the command
+    4. With `fail_fast` the first failure terminates the running commands
+       and skips the pending ones, otherwise every command runs
+    5. Every command runs in its own process group, stopping a command
+       stops the processes it started as well
+    """
+
+    def __init__(
+        self,
+        commands: Dict[str, List[str]],
+        out: TextIO,
+        jobs: Optional[int] = None,
+        fail_fast: bool = False,
+        env: Optional[Dict[str, str]] = None,
+        dependencies: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.commands = commands
+        self.dependencies = dependencies or {}
+        self.out = out
+        self.jobs = get_jobs(jobs)
+        self.fail_fast = fail_fast
+        self.env = dict(os.environ if env is None else env)
+        # Output is flushed line by line by the scripts
+        self.env.setdefault("PYTHONUNBUFFERED", "1")
+        self.width = max((len(name) for name in commands), default=0)
+        self.lines: "queue.Queue[Tuple[str, Optional[str]]]" = queue.Queue()
+
+    def write(self, name: str, line: str):
+        """
+        Writes one output line of a command
+        """
+        self.out.write(f"{name.ljust(self.width)} | {line}\n")
+        self.out.flush()
+
+    def read(self, name: str, process: subprocess.Popen):
+        """
+        Forwards the output lines of a process to the queue, `None` marks
+        the end of the output
+        """
+        for line in iter(process.stdout.readline, b""):
+            self.lines.put(
+                (name, line.decode("utf-8", "replace").rstrip("\r\n"))
+            )
+        process.stdout.close()
+        self.lines.put((name, None))
+
+    def start(self, name: str) -> subprocess.Popen:
+        """
+        Starts a command with its output piped to a reader thread
+        """
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = getattr(
+                subprocess, "CREATE_NEW_PROCESS_GROUP", 0
+            )
+        else:
+            kwargs["start_new_session"] = True
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            self.commands[name],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=self.env,
+            **kwargs,
+        )
+        threading.Thread(
+            target=self.read, args=(name, process), daemon=True
+        ).start()
+        return process
+
+    @staticmethod
+    def stop(process: subprocess.Popen):
+        """
+        Terminates a command and the processes in its group, on Windows
+        only the command itself is terminated
+        """
+        if process.poll() is not None:
+            return
+        if os.name == "nt":
+            process.terminate()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    def reuse(self, name: str) -> str:  # pylint: disable=unused-argument
+        """
+        Subclass hook, called before a command starts
+        Returns: str | Reason the command does not have to run, empty if
+                 it has to run
+        """
+        return ""
+
+    def finish(self, name: str, result: ScriptResult):
+        """
+        Subclass hook, called when a command has finished
+        """
+
+    def schedule(
+        self,
+        pending: List[str],
+        running: Dict[str, Tuple[subprocess.Popen, float]],
+        results: Dict[str, ScriptResult],
+        failed: bool,
+    ):
+        """
+        Starts pending commands whose dependencies have finished, until
+        `jobs` commands are running
+        """
+        progress = True
+        while progress:
+            progress = False
+            for name in list(pending):
+                if len(running) >= self.jobs:
+                    return
+                dependencies = [
+                    results[dependency]
+                    for dependency in self.dependencies.get(name, [])
+                ]
+                if any(
+                    result.name in pending or result.name in running
+                    for result in dependencies
+                ):
+                    continue
+                pending.remove(name)
+                progress = True
+                if failed or not all(
+                    result.succeeded for result in dependencies
+                ):
+                    continue
+                reason = self.reuse(name)
+                if reason:
+                    results[name].code = 0
+                    results[name].reason = reason
+                    continue
+                running[name] = (self.start(name), time.monotonic())
+
+    def run(self) -> List[ScriptResult]:
+        """
+        Runs every command
+        Returns: List[ScriptResult] | Results in the order of the commands
+        """
+        results = {name: ScriptResult(name) for name in self.commands}
+        pending = list(self.commands)
+        running: Dict[str, Tuple[subprocess.Popen, float]] = {}
+        failed = False
+        try:
+            while pending or running:
+                self.schedule(pending, running, results, failed)
+                if not running:
+                    break
+                name, line = self.lines.get()
+                if line is not None:
+                    self.write(name, line)
+                    continue
+                process, started = running.pop(name)
+                results[name].code = process.wait()
+                results[name].duration = time.monotonic() - started
+                self.finish(name, results[name])
+                if results[name].code and self.fail_fast and not failed:
+                    failed = True
+                    for other, _ in running.values():
+                        self.stop(other)
+        except KeyboardInterrupt:
+            # The groups do not get the signal of the terminal
+            for process, _ in running.values():
+                self.stop(process)
+            raise
+        return list(results.values())
+
+
+def format_summary(results: List[ScriptResult]) -> List[str]:
+    """
+    Returns: List[str] | One line per script with its status, exit code
+    and run time
+    """
+    width = max((len(result.name) for result in results), default=0)
+    lines = []
+    for result in results:
+        line = f"{result.name.ljust(width)}  {result.status}"
+        if result.code is not None and not result.reason:
+            line += f" (exit {result.code}, {result.duration:.2f}s)"
+        lines.append(line)
+    return lines
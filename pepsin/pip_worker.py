@@ -0,0 +1,116 @@
+"""
+Persistent pip worker
+
+Runs inside the virtual environment's interpreter and executes pip
+in-process, so a session that runs pip many times imports pip only once.
+The module is executed as a script by the venv python and must not
+import pepsin.
+
+Protocol, one json object per line:
+    request:  {"action": "pip", "args": ["install", "django"]}
+              {"action": "inspect"}
+              {"action": "exit"}
+    response: {"code": 0, ...}
+
+pip's own output is redirected to stderr, stdout is reserved for the
+protocol
+"""
+import importlib
+import json
+import os
+import sys
+
+
+def reset_caches():
+    """
+    Forgets the installed distributions pip has seen, the next command
+    reads them again. The pkg_resources metadata backend, used by pip
+    below python 3.11, snapshots `working_set` when it is imported
+    """
+    importlib.invalidate_caches()
+    pkg_resources = sys.modules.get("pip._vendor.pkg_resources")
+    if pkg_resources is not None:
+        # pylint: disable=protected-access
+        pkg_resources.working_set = pkg_resources.WorkingSet._build_master()
+    metadata = sys.modules.get("pip._internal.metadata.base")
+    cached = getattr(
+        getattr(metadata, "BaseDistribution", None), "_metadata_cached", None
+    )
+    if hasattr(cached, "cache_clear"):
+        cached.cache_clear()
+
+
+def run_pip(args):
+    """
+    Runs pip's command line entry point in-process
+    Returns: int | Exit code of pip
+    """
+    # pylint: disable=import-outside-toplevel
+    from pip._internal.cli.main import main as pip_main
+
+    try:
+        code = pip_main(list(args))
+    except SystemExit as error:
+        code = error.code
+    finally:
+        # Every command may have installed or removed distributions
+        reset_caches()
+    if code is None:
+        return 0
+    return code if isinstance(code, int) else 1
+
+
+def inspect():
+    """
+    Returns: Dict | Name and version of installed distributions
+    """
+    # pylint: disable=import-outside-toplevel
+    from importlib import metadata
+
+    return {
+        dist.metadata["Name"]: dist.version
+        for dist in metadata.distributions()
+        if dist.metadata["Name"]
+    }
+
+
+def handle(request):
+    """
+    Handles one request
+    Returns: Dict | Response
+    """
+    action = request.get("action")
+    if action == "pip":
+        return {"code": run_pip(request.get("args", []))}
+    if action == "inspect":
+        return {"code": 0, "packages": inspect()}
+    if action == "ping":
+        return {"code": 0}
+    return {"code": 1, "error": f"Unknown action {action}"}
+
+
+def main():
+    """
+    Reads requests from stdin until `exit` or end of input
+    """
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    # Everything else printed to stdout ends up on stderr
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if request.get("action") == "exit":
+            break
+        try:
+            response = handle(request)
+        except Exception as error:  # pylint: disable=broad-except
+            response = {"code": 1, "error": f"{type(error).__name__}: {error}"}
+        sys.stdout.flush()
+        sys.stderr.flush()
+        protocol.write(json.dumps(response) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    main()
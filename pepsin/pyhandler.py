@@ -1,26 +1,40 @@
 """
 This module handles python and pip execution
 """
+import json
 import os
 import subprocess
 import sys
-from typing import List, Optional
-from urllib import request
-from urllib.error import HTTPError, URLError
+from typing import TYPE_CHECKING, Dict, List, Optional
 
+from pepsin.backends import InstallerBackend, get_backend
 from pepsin.base_io import OutputWrapper
 from pepsin.config import PepsinConfig, handle_failed_libs
 from pepsin.const import PIP_DL_LINK
+from pepsin.error import InvalidCommandError
+from pepsin.fingerprint import check_fingerprint, write_fingerprint
+from pepsin.requirements import is_same_version, parse_requirement
 from pepsin.utils import (
     OSEnum,
+    canonicalize_name,
     check_dir_exists,
     check_file_exists,
     get_default,
     get_os,
+    get_python_executable,
     read_file,
     write_file,
 )
 
+# Installers, archives and network access are imported where they are used,
+# running a script must not pay for them
+if TYPE_CHECKING:  # pragma: no cover
+    from pepsin.installer import WheelInstaller
+    from pepsin.lock import LockFile
+    from pepsin.snapshot import SnapshotStore
+    from pepsin.store import PackageStore
+    from pepsin.wheelhouse import Wheelhouse
+
 
 class PyHandler:
     """
@@ -33,6 +47,7 @@ class PyHandler:
         stdout: OutputWrapper = None,
         stderr: OutputWrapper = None,
         skip_venv: bool = False,
+        installer: str = "",
     ):
         """
         Save env variable and set env variable to run code
@@ -42,14 +57,20 @@ class PyHandler:
             stdout: OutputWrapper(sys.stdout) Instance
             stderr: OutputWrapper(sys.stderr) Instance
             skip_venv: Skip initializing venv on init
+            installer: Name of the installer backend, overrides the config
         """
         # Read pepsin config to get venv
         self.output = stdout if stdout else OutputWrapper(sys.stdout)
         self.error = stderr if stderr else OutputWrapper(sys.stderr)
-        self.executable = "python" if get_os() == OSEnum.WIN else "python3"
+        self.executable = get_python_executable()
+        # Interpreter that creates virtual environments
+        self.base_executable = self.executable
         self.pip_exec = "pip" if get_os() == OSEnum.WIN else "pip3"
         self.pepsin_config = pepsin_config if pepsin_config else PepsinConfig()
         self.env = os.environ.copy()
+        self.backend: InstallerBackend = get_backend(
+            installer or self.pepsin_config.installer
+        )(self)
 
         self.venv = self.pepsin_config.venv
         # Create virtualenv if not exist
@@ -58,7 +79,10 @@ class PyHandler:
         ):
             self.venv = get_default(self.venv, "venv")
             self.pepsin_config.update(venv=self.venv)
-            self.init_venv(self.venv)
+            if not self.clone_venv() and not self.restore_snapshot(
+                locked_only=True
+            ):
+                self.init_venv(self.venv)
 
         self.set_env()
 
@@ -86,13 +110,156 @@ class PyHandler:
             script_loc = "bin"
             if sys_os == OSEnum.WIN:
                 script_loc = "scripts"
-            venv_dir = os.path.join(os.getcwd(), self.venv)
+            venv_dir = self.get_venv_dir()
             script_dir = os.path.join(os.getcwd(), self.venv, script_loc)
             self.env["VIRTUAL_ENV"] = venv_dir
             self.env["PATH"] = self.__join_env_path(script_dir)
             self.executable = f"{script_dir}/python"
             self.pip_exec = f"{script_dir}/pip"
 
+    def use_venv(self, venv: str):
+        """
+        Switches to another virtual environment, creates it if it
+        does not exist
+        Args:
+            venv: Virtual environment directory
+
+        Returns: None
+        """
+        self.venv = venv
+        # A running pip worker belongs to the previous venv
+        self.backend.close()
+        if not check_dir_exists(venv):
+            self.init_venv(venv)
+        self.set_env()
+
+    def get_installer(self, store: Optional["PackageStore"] = None):
+        """
+        Returns: WheelInstaller | Native wheel installer of the venv
+        """
+        from pepsin.installer import (  # pylint: disable=import-outside-toplevel
+            WheelInstaller,
+        )
+
+        return WheelInstaller(
+            self.get_venv_dir(), jobs=self.pepsin_config.jobs, store=store
+        )
+
+    def get_venv_dir(self) -> Optional[str]:
+        """
+        Returns: str | Absolute path of the venv directory or None
+        """
+        if not self.venv:
+            return None
+        return os.path.join(os.getcwd(), self.venv)
+
+    def is_up_to_date(self, libs: List[str], lock_hash: str = "") -> bool:
+        """
+        Checks the stored fingerprint of the venv, if the library set,
+        interpreter and installed packages did not change since the last
+        successful install, nothing needs to be installed
+        Args:
+            libs: List of libraries
+            lock_hash: Content hash of the lock used for installation
+
+        Returns: bool
+        """
+        venv_dir = self.get_venv_dir()
+        return bool(venv_dir) and check_fingerprint(venv_dir, libs, lock_hash)
+
+    def save_fingerprint(self, libs: List[str], lock_hash: str = ""):
+        """
+        Stores fingerprint of the installed library set in the venv
+        Args:
+            libs: List of libraries
+            lock_hash: Content hash of the lock used for installation
+
+        Returns: None
+        """
+        venv_dir = self.get_venv_dir()
+        if venv_dir:
+            write_fingerprint(venv_dir, libs, lock_hash)
+
+    def clone_venv(self, src: str = "", mode: str = "hardlink") -> bool:
+        """
+        Creates the venv as a clone of another venv, `clone_from` of the
+        config is used if no source is given
+        Args:
+            src: Source venv directory
+            mode: Option["hardlink", "reflink", "copy"]
+
+        Returns: bool | False if there is no source venv
+        """
+        src = src or self.pepsin_config.clone_from
+        if not src or not check_file_exists(os.path.join(src, "pyvenv.cfg")):
+            return False
+        from pepsin.venv_clone import (  # pylint: disable=import-outside-toplevel
+            clone_venv,
+        )
+
+        clone_venv(src, self.get_venv_dir(), mode, self.pepsin_config.jobs)
+        return True
+
+    def get_snapshot_key(self) -> str:
+        """
+        Returns: str | Snapshot name of the venv for the current
+        interpreter and resolved library set
+        """
+        # pylint: disable=import-outside-toplevel
+        from pepsin.lock import LockFile
+        from pepsin.snapshot import get_library_hash, get_snapshot_key
+
+        libs = list(self.pepsin_config.libraries)
+        return get_snapshot_key(
+            self.base_executable, get_library_hash(libs, LockFile())
+        )
+
+    def save_snapshot(self, store: Optional["SnapshotStore"] = None) -> str:
+        """
+        Archives the venv into the snapshot store
+        Args:
+            store: Snapshot store, defaults to the user cache directory
+
+        Returns: str | Path of the snapshot archive
+        """
+        from pepsin.snapshot import (  # pylint: disable=import-outside-toplevel
+            SnapshotStore,
+        )
+
+        store = store if store else SnapshotStore()
+        return store.save(self.get_venv_dir(), self.get_snapshot_key())
+
+    def restore_snapshot(
+        self,
+        store: Optional["SnapshotStore"] = None,
+        locked_only: bool = False,
+    ) -> bool:
+        """
+        Restores the venv from a matching snapshot, the venv must not exist
+        Args:
+            store: Snapshot store, defaults to the user cache directory
+            locked_only: Restores only the snapshot of a fresh lock, the
+                         libraries of the config do not pin what the
+                         snapshot contains
+
+        Returns: bool | False if there is no matching snapshot
+        """
+        # pylint: disable=import-outside-toplevel
+        from pepsin.lock import LockFile
+        from pepsin.snapshot import SnapshotStore
+
+        libs = list(self.pepsin_config.libraries)
+        lock = LockFile()
+        lock_hash = lock.content_hash() if lock.is_fresh(libs) else ""
+        if locked_only and not lock_hash:
+            return False
+        store = store if store else SnapshotStore()
+        venv_dir = self.get_venv_dir()
+        if not store.restore(self.get_snapshot_key(), venv_dir):
+            return False
+        write_fingerprint(venv_dir, libs, lock_hash)
+        return True
+
     def python_execute(self, *commands):
         """
         Executes python command
@@ -100,12 +267,39 @@ class PyHandler:
         """
         subprocess.check_call([self.executable, *commands], env=self.env)
 
+    def python_exec(self, *commands):
+        """
+        Replaces the current process with the python interpreter of the
+        venv, signals and the exit status go straight to the script.
+        Windows has no exec, the script runs in a subprocess and its
+        exit status is returned by this process
+        Returns: Never returns
+        """
+        self.backend.close()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        argv = [self.executable, *commands]
+        if get_os() == OSEnum.WIN:
+            sys.exit(subprocess.call(argv, env=self.env))
+        os.execve(self.executable, argv, self.env)
+
     def init_venv(self, venv_dir: str):
         """
-        Initializes virtualenv directory
+        Initializes virtualenv directory, an empty venv is claimed from
+        the venv pool if the pool is enabled
         Returns:
         """
-        self.python_execute("-m", "virtualenv", venv_dir)
+        from pepsin.venv_pool import (  # pylint: disable=import-outside-toplevel
+            VenvPool,
+        )
+
+        pool = VenvPool(self.base_executable)
+        if pool.is_enabled() and pool.claim(venv_dir):
+            pool.refill_in_background()
+            return
+        subprocess.check_call(
+            [self.base_executable, "-m", "virtualenv", venv_dir], env=self.env
+        )
 
     def pip_execute(self, *commands):
         """
@@ -113,7 +307,7 @@ class PyHandler:
         Returns:
 
         """
-        subprocess.check_call([self.pip_exec, *commands], env=self.env)
+        self.backend.execute(*commands)
 
     def pip_install(self, *packages):
         """
@@ -124,9 +318,7 @@ class PyHandler:
         Returns:
 
         """
-        subprocess.check_call(
-            [self.pip_exec, "install", *packages], env=self.env
-        )
+        self.backend.install(list(packages))
 
     def pip_upgrade(self, *packages):
         """
@@ -146,20 +338,94 @@ class PyHandler:
             to_remove = "pip3" if "pip3" in package_list else "pip"
             package_list.remove(to_remove)
         if has_pip:
+            # pylint: disable=import-outside-toplevel
+            from urllib import request
+            from urllib.error import HTTPError, URLError
+
             try:
                 with request.urlopen(PIP_DL_LINK) as file:
                     write_file("get_pip.py", file.read().decode("utf-8"))
                     self.python_execute("get_pip")
             except (URLError, HTTPError):
                 self.error.write("Unable to upgrade pip")
-        subprocess.check_call(
-            [self.pip_exec, "install", "--upgrade", *package_list],
-            shell=True,
-            env=self.env,
+        if package_list:
+            self.backend.install(package_list, upgrade=True)
+
+    def __execute_action(self, action: str, libs: List[str]):
+        """
+        Runs one pip invocation for the given action and libraries
+        Args:
+            action: Option["install" , "upgrade"]
+            libs: List of libraries
+
+        Returns:
+
+        """
+        if action == "upgrade":
+            self.pip_upgrade(*libs)
+        else:
+            self.pip_install(*libs)
+
+    def __bisect_library(
+        self, action: str, libs: List[str]
+    ) -> (List[str], List[str]):
+        """
+        Hands the whole set of libraries to a single pip resolver run,
+        if that fails the set is split in half and each half is retried
+        until the failing libraries are isolated
+        Args:
+            action: Option["install" , "upgrade"]
+            libs: List of libraries
+
+        Returns:
+            Tuple: List of passed and failed libraries
+        """
+        if not libs:
+            return [], []
+        try:
+            self.__execute_action(action, libs)
+            return libs, []
+        except subprocess.CalledProcessError:
+            if len(libs) == 1:
+                self.error.write(f"Unable to install {libs[0]}")
+                return [], libs
+        middle = len(libs) // 2
+        left_passed, left_failed = self.__bisect_library(action, libs[:middle])
+        right_passed, right_failed = self.__bisect_library(
+            action, libs[middle:]
         )
+        return left_passed + right_passed, left_failed + right_failed
+
+    def collect_libraries(
+        self, libs: Optional[List[str]] = None, requirements=""
+    ) -> List[str]:
+        """
+        Combines libraries with the libraries of a requirement file
+        Args:
+            libs: List of libraries
+            requirements: Requirement.txt or text requirement file
+
+        Returns: List of libraries
+        """
+        to_install: List[str] = list(get_default(libs, []))
+        if requirements:
+            if not check_file_exists(requirements):
+                self.error.write(f"{requirements} does not exist")
+            else:
+                to_install += read_file(requirements).split("\n")
+                to_install = [
+                    each.strip()
+                    for each in to_install
+                    if "#" not in each and each.strip()
+                ]
+        return to_install
 
     def __process_library(
-        self, action: str, libs: Optional[List[str]] = None, requirements=""
+        self,
+        action: str,
+        libs: Optional[List[str]] = None,
+        requirements="",
+        batch: bool = True,
     ) -> (List[str], List[str]):
         """
         Process library with action
@@ -167,61 +433,285 @@ class PyHandler:
             action: Option["install" , "upgrade"]
             libs: List of libraries
             requirements: Requirement.txt or text requirement file
+            batch: Resolve all libraries in a single pip run
         Returns:
             Tuple: List of passed and failed libraries
 
         """
         passed = []
         failed = []
-        to_install: List[str] = get_default(libs, [])
-        if requirements:
-            if not check_file_exists(requirements):
-                self.error.write(f"{requirements} does not exist")
-            else:
-                to_install += read_file(requirements).split("\n")
-                to_install = [each for each in to_install if "#" not in each]
-        for lib in to_install:
-            try:
-                if action == "upgrade":
-                    self.pip_upgrade(lib)
-                else:
-                    self.pip_install(lib)
-                if lib not in ["pip", "pip3"]:
-                    passed.append(lib)
-            except subprocess.CalledProcessError:
-                self.error.write(f"Unable to install {lib}")
-                failed.append(lib)
+        to_install = self.collect_libraries(libs, requirements)
+        if batch:
+            passed, failed = self.__bisect_library(action, to_install)
+        else:
+            for lib in to_install:
+                lib_passed, lib_failed = self.__bisect_library(action, [lib])
+                passed += lib_passed
+                failed += lib_failed
+        passed = [lib for lib in passed if lib not in ["pip", "pip3"]]
 
         if failed:
-            handle_failed_libs(failed)
+            handle_failed_libs(failed[:])
 
         return passed, failed
 
     def install_libraries(
-        self, libs: Optional[List[str]] = None, requirements=""
+        self,
+        libs: Optional[List[str]] = None,
+        requirements="",
+        batch: bool = True,
     ) -> (List[str], List[str]):
         """
         Installs multiple libraries
         Args:
             libs: List of libraries
             requirements : Requirement.txt or text requirement file
+            batch: Resolve all libraries in a single pip run, falls back
+                   to bisecting the set when the run fails
         Returns:
             tuple: List of passed and failed libraries
         """
-        return self.__process_library("install", libs, requirements)
+        return self.__process_library("install", libs, requirements, batch)
 
     def upgrade_libraries(
-        self, libs: Optional[List[str]] = None, requirements=""
+        self,
+        libs: Optional[List[str]] = None,
+        requirements="",
+        batch: bool = True,
     ) -> (List[str], List[str]):
         """
         Upgrades multiple libraries
         Args:
             libs: List of libraries
             requirements : Requirement.txt or text requirement file
+            batch: Resolve all libraries in a single pip run, falls back
+                   to bisecting the set when the run fails
         Returns:
             tuple: List of passed and failed libraries
         """
-        return self.__process_library("upgrade", libs, requirements)
+        return self.__process_library("upgrade", libs, requirements, batch)
+
+    def resolve_libraries(
+        self,
+        libs: List[str],
+        keep_installed: bool = False,
+        upgrade: bool = False,
+    ) -> (List[Dict], Dict):
+        """
+        Resolves the full dependency closure of the libraries using
+        pip's dry run installation report, nothing gets installed
+        Args:
+            libs: List of libraries
+            keep_installed: Resolves only the packages the venv is
+                            missing, installed versions that satisfy the
+                            libraries are kept like `pip install` does
+            upgrade: Upgrades installed libraries like `pip install -U`,
+                     only with keep_installed
+
+        Returns:
+            tuple: List of resolved packages and the environment
+        """
+        # pylint: disable=import-outside-toplevel
+        import tempfile
+
+        from pepsin.lock import parse_pip_report
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_file = os.path.join(temp_dir, "report.json")
+            try:
+                if not keep_installed:
+                    options = ["--ignore-installed"]
+                else:
+                    options = ["--upgrade"] if upgrade else []
+                self.pip_execute(
+                    "install",
+                    "--dry-run",
+                    *options,
+                    "--quiet",
+                    "--report",
+                    report_file,
+                    *libs,
+                )
+            except subprocess.CalledProcessError as error:
+                raise InvalidCommandError(
+                    "Unable to resolve libraries, pip>=22.2 is required"
+                ) from error
+            report = json.loads(read_file(report_file) or "{}")
+        environment = report.get("environment", {})
+        environment = {
+            key: environment.get(key)
+            for key in ["python_version", "sys_platform", "platform_machine"]
+            if key in environment
+        }
+        return parse_pip_report(report), environment
+
+    def install_requirements(
+        self,
+        requirements: List[str],
+        no_deps: bool = False,
+        require_hashes: bool = False,
+        find_links: str = "",
+    ):
+        """
+        Installs requirement lines in a single pip run
+        Args:
+            requirements: List of pip requirement lines
+            no_deps: Do not install dependencies of the requirements
+            require_hashes: Require a hash for every requirement
+            find_links: Install from this directory without the index
+
+        Returns: None
+        """
+        import tempfile  # pylint: disable=import-outside-toplevel
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            requirement_file = os.path.join(temp_dir, "requirements.txt")
+            write_file(requirement_file, "\n".join(requirements))
+            args = ["install", "-r", requirement_file]
+            if no_deps:
+                args.append("--no-deps")
+            if require_hashes:
+                args.append("--require-hashes")
+            if find_links:
+                args += ["--no-index", "--find-links", find_links]
+            self.pip_execute(*args)
+
+    def install_locked(self, lock: "LockFile"):
+        """
+        Installs pinned packages from the lock, as the lock already
+        contains the whole closure pip does not resolve dependencies
+        Args:
+            lock: LockFile instance
+
+        Returns: None
+        """
+        try:
+            self.install_requirements(
+                lock.to_requirements(),
+                no_deps=True,
+                require_hashes=lock.requires_hashes(),
+            )
+        except subprocess.CalledProcessError as error:
+            raise InvalidCommandError(
+                f"Unable to install from {lock.filename}"
+            ) from error
+
+    def install_from_wheelhouse(
+        self,
+        packages: List[Dict],
+        wheelhouse: "Wheelhouse",
+        store: Optional["PackageStore"] = None,
+        native: bool = False,
+    ):
+        """
+        Downloads artifacts of the resolved packages concurrently into
+        the wheelhouse and installs them without accessing the index,
+        with the native installer or a package store wheels are installed
+        without pip and only source distributions are installed by pip
+        Args:
+            packages: List of resolved packages
+            wheelhouse: Wheelhouse instance
+            store: PackageStore instance
+            native: Install wheels with the native wheel installer
+
+        Returns: None
+        """
+        artifacts = wheelhouse.fetch(packages)
+        if store or native:
+            installer = self.get_installer(store)
+            installer.jobs = wheelhouse.jobs
+            packages = self.__install_wheels(packages, artifacts, installer)
+        if not packages:
+            return
+        require_hashes = all(package.get("hashes") for package in packages)
+        # Every artifact is in the wheelhouse, direct references are
+        # pinned by version too so pip never downloads their url
+        requirements = [
+            f"{package['name']}=={package['version']}"
+            + "".join(
+                f" --hash={value}"
+                for value in (package["hashes"] if require_hashes else [])
+            )
+            for package in packages
+        ]
+        try:
+            self.install_requirements(
+                requirements,
+                no_deps=True,
+                require_hashes=require_hashes,
+                find_links=wheelhouse.path,
+            )
+        except subprocess.CalledProcessError as error:
+            raise InvalidCommandError(
+                f"Unable to install from {wheelhouse.path}"
+            ) from error
+
+    def __install_wheels(
+        self,
+        packages: List[Dict],
+        artifacts: List[str],
+        installer: "WheelInstaller",
+    ) -> List[Dict]:
+        """
+        Installs wheels with the native installer, installed
+        distributions with a different version are removed first
+        Args:
+            packages: List of resolved packages
+            artifacts: Downloaded artifact of every package
+            installer: WheelInstaller instance
+
+        Returns: List[Dict] | Packages that are not wheels
+        """
+        installed = self.installed_packages()
+        wheels = []
+        remaining = []
+        outdated = []
+        for package, artifact in zip(packages, artifacts):
+            if not artifact.endswith(".whl"):
+                remaining.append(package)
+                continue
+            name = canonicalize_name(package["name"])
+            if name in installed and is_same_version(
+                installed[name], str(package["version"])
+            ):
+                continue
+            if name in installed:
+                outdated.append(name)
+            wheels.append(artifact)
+        installer.uninstall(outdated)
+        installer.install(wheels)
+        return remaining
+
+    def installed_packages(self) -> Dict[str, str]:
+        """
+        Lists distributions installed in the environment, the venv's
+        site-packages is read directly, pip is only used without a venv
+        Returns:
+            Dict: Canonical distribution name and installed version
+        """
+        venv_dir = self.get_venv_dir()
+        if venv_dir and check_dir_exists(venv_dir):
+            from pepsin.site_packages import (  # pylint: disable=import-outside-toplevel
+                get_distributions,
+            )
+
+            return {
+                name: distribution.version
+                for name, distribution in get_distributions(venv_dir).items()
+            }
+        output = subprocess.check_output(
+            [
+                self.pip_exec,
+                "list",
+                "--format=json",
+                "--disable-pip-version-check",
+            ],
+            env=self.env,
+        )
+        return {
+            canonicalize_name(package["name"]): package["version"]
+            for package in json.loads(output or "[]")
+        }
 
     def uninstall_libraries(self, libs=None) -> tuple:
         """
@@ -232,13 +722,21 @@ class PyHandler:
                    libs that passed and failed to uninstall
         """
         passed = []
-        to_uninstall = list(get_default(libs, []))
-        for lib in to_uninstall:
+        to_uninstall = []
+        installed = None
+        venv_dir = self.get_venv_dir()
+        if venv_dir and check_dir_exists(venv_dir):
+            installed = self.installed_packages()
+        for lib in list(get_default(libs, [])):
             if lib in ["pip", "pip3"]:
                 self.error.write("Unable to uninstall pip")
-            else:
-                subprocess.check_call(
-                    [self.pip_exec, "uninstall", lib, "-y"], env=self.env
-                )
-                passed.append(lib)
+                continue
+            passed.append(lib)
+            name = parse_requirement(lib).key
+            if installed is not None and name not in installed:
+                self.error.write(f"{lib} is not installed")
+                continue
+            to_uninstall.append(lib)
+        if to_uninstall:
+            self.backend.uninstall(to_uninstall)
         return passed, []
@@ -0,0 +1,87 @@
+"""
+Relocation of virtual environments
+
+Virtualenv writes the absolute location of the environment into the
+console script shebangs, the activation scripts and `pyvenv.cfg`. When a
+venv directory is moved, copied or restored somewhere else these files
+are rewritten, everything else in the environment is location independent
+"""
+import os
+from typing import List, Optional
+
+from pepsin.utils import OSEnum, get_os
+
+
+def get_script_dir(venv_dir: str) -> str:
+    """
+    Returns: str | Directory of the executables of the venv
+    """
+    script_loc = "Scripts" if get_os() == OSEnum.WIN else "bin"
+    return os.path.join(venv_dir, script_loc)
+
+
+def get_path_dependent_files(venv_dir: str) -> List[str]:
+    """
+    Files of a venv that may contain the location of the venv
+    Args:
+        venv_dir: Virtual environment directory
+
+    Returns: List[str] | Paths of the files
+    """
+    files = [os.path.join(venv_dir, "pyvenv.cfg")]
+    script_dir = get_script_dir(venv_dir)
+    if os.path.isdir(script_dir):
+        for entry in os.scandir(script_dir):
+            # The python executables are symlinks or binaries
+            if entry.is_file(follow_symlinks=False):
+                files.append(entry.path)
+    return [file for file in files if os.path.isfile(file)]
+
+
+def rewrite_file(file: str, old: bytes, new: bytes) -> bool:
+    """
+    Replaces `old` with `new` in a text file, binary files are skipped
+    Args:
+        file: Path of the file
+        old: Bytes to replace
+        new: Replacement
+
+    Returns: bool | True if the file has been rewritten
+    """
+    with open(file, "rb") as stream:
+        content = stream.read()
+    if old not in content or b"\0" in content:
+        return False
+    stat = os.stat(file)
+    # Hardlinked files are shared, replace the link instead of the content
+    temp_file = f"{file}.pepsin-tmp"
+    with open(temp_file, "wb") as stream:
+        stream.write(content.replace(old, new))
+    os.chmod(temp_file, stat.st_mode)
+    os.replace(temp_file, file)
+    return True
+
+
+def relocate_venv(
+    venv_dir: str, old_dir: str, new_dir: Optional[str] = None
+) -> List[str]:
+    """
+    Rewrites the files that point to the old location of a venv
+    Args:
+        venv_dir: Current location of the venv
+        old_dir: Location the venv has been created at
+        new_dir: Location the venv will be moved to, defaults to `venv_dir`
+
+    Returns: List[str] | Rewritten files
+    """
+    venv_dir = os.path.abspath(venv_dir)
+    old_dir = os.path.abspath(old_dir)
+    new_dir = os.path.abspath(new_dir or venv_dir)
+    if new_dir == old_dir:
+        return []
+    old, new = os.fsencode(old_dir), os.fsencode(new_dir)
+    return [
+        file
+        for file in get_path_dependent_files(venv_dir)
+        if rewrite_file(file, old, new)
+    ]
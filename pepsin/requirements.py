@@ -0,0 +1,511 @@
+"""
+Parsed library specifiers
+
+A library specifier is parsed once into a slotted `Requirement`, the
+canonical name is interned and the versions of the specifiers are
+pre-parsed into comparable keys, parsed requirements are cached and
+shared, so they must be treated as immutable
+"""
+import functools
+import math
+import os
+import platform
+import re
+import sys
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pepsin.utils import canonicalize_name
+
+REQUIREMENT_PATTERN = re.compile(
+    r"""
+    ^\s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)
+    \s*(?:\[(?P<extras>[^\]]*)\])?
+    \s*(?P<version>[^;]*?)
+    \s*(?:;\s*(?P<marker>.*?))?\s*$
+    """,
+    re.VERBOSE,
+)
+# Specifiers pip installs from a url or a path instead of an index,
+# IE: `git+https://host/repo.git#egg=name` or `./dist/name-1.0.whl`
+DIRECT_PATTERN = re.compile(
+    r"^(?:[A-Za-z][A-Za-z0-9+.-]*://|[.~/\\]|[A-Za-z]:)|[/\\]"
+    r"|\.(?:whl|zip|tar\.gz|tar\.bz2|tgz)$"
+)
+EGG_PATTERN = re.compile(r"[#&]egg=([A-Za-z0-9][A-Za-z0-9._-]*)")
+# Wheel and source distribution file names, IE: `name-1.0-py3-none-any.whl`
+ARCHIVE_PATTERN = re.compile(
+    r"^(?P<name>[A-Za-z0-9].*?)-(?P<version>[0-9][^-]*?)(?:-.+)?"
+    r"\.(?:whl|zip|tar\.gz|tar\.bz2|tgz)$"
+)
+MARKER_TOKEN = re.compile(
+    r"""
+    \s*(?:
+    (?P<string>'[^']*'|"[^"]*")
+    |(?P<op>===|==|!=|<=|>=|~=|<|>|not\s+in\b|in\b)
+    |(?P<paren>[()])
+    |(?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )
+    """,
+    re.VERBOSE,
+)
+SPECIFIER_PATTERN = re.compile(r"(===|~=|==|!=|<=|>=|<|>)\s*([^\s,;()]+)")
+# PEP 440 version scheme, with the normalizations it allows
+VERSION_PATTERN = re.compile(
+    r"""
+    v?(?:(?P<epoch>[0-9]+)!)?
+    (?P<release>[0-9]+(?:\.[0-9]+)*)
+    (?:[-_.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)[-_.]?(?P<pre_n>[0-9]+)?)?
+    (?:-(?P<post_n1>[0-9]+)|[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>[0-9]+)?)?
+    (?:[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?
+    (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+PRE_RELEASES = {
+    "a": 0,
+    "alpha": 0,
+    "b": 1,
+    "beta": 1,
+    "c": 2,
+    "pre": 2,
+    "preview": 2,
+    "rc": 2,
+}
+
+VersionKey = Tuple[int, Tuple[int, ...], Tuple[int, int], int, float, tuple]
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_version(version: str) -> Optional[VersionKey]:
+    """
+    Converts a PEP 440 version into a key that sorts like the version,
+    IE: `1.0.dev1 < 1.0a1 < 1.0 < 1.0.post1` and `1.0 == 1.0.0`
+    Args:
+        version: str | Version
+
+    Returns: Tuple | Comparable key, None if the version is not valid
+    """
+    match = VERSION_PATTERN.fullmatch(version.strip())
+    if not match:
+        return None
+    release = tuple(int(part) for part in match.group("release").split("."))
+    while len(release) > 1 and not release[-1]:
+        release = release[:-1]
+    post = match.group("post_n1") or match.group("post_n2")
+    has_post = post is not None or match.group("post_l") is not None
+    has_dev = match.group("dev_l") is not None
+    if match.group("pre_l"):
+        pre = (
+            PRE_RELEASES[match.group("pre_l").lower()],
+            int(match.group("pre_n") or 0),
+        )
+    elif has_dev and not has_post:
+        # `1.0.dev1` comes before every pre-release of `1.0`
+        pre = (-1, 0)
+    else:
+        pre = (3, 0)
+    local = tuple(
+        (1, int(part)) if part.isdigit() else (0, part.lower())
+        for part in re.split(r"[-_.]", match.group("local") or "")
+        if part
+    )
+    return (
+        int(match.group("epoch") or 0),
+        release,
+        pre,
+        int(post or 0) if has_post else -1,
+        int(match.group("dev_n") or 0) if has_dev else math.inf,
+        local,
+    )
+
+
+def is_same_version(version: str, other: str) -> bool:
+    """
+    Returns: bool | True if both versions are equal, IE: `1.0` and
+    `1.0.0`, versions that can not be parsed are compared as written
+    """
+    key, other_key = parse_version(version), parse_version(other)
+    if key is None or other_key is None:
+        return version.strip() == other.strip()
+    return key == other_key
+
+
+def is_prerelease(key: VersionKey) -> bool:
+    """
+    Returns: bool | True for pre-releases and development releases
+    """
+    return key[2] != (3, 0) or key[4] != math.inf
+
+
+def is_postrelease(key: VersionKey) -> bool:
+    """
+    Returns: bool | True for post-releases
+    """
+    return key[3] != -1
+
+
+def get_release(version: str) -> Tuple[int, ...]:
+    """
+    Returns: Tuple | Release segment of the version as written,
+    IE: `1.4.0rc1` returns `(1, 4, 0)`
+    """
+    match = VERSION_PATTERN.fullmatch(version.strip())
+    if not match:
+        return ()
+    return tuple(int(part) for part in match.group("release").split("."))
+
+
+class Specifier(NamedTuple):
+    """
+    Version specifier of a requirement, IE: `>=4.0`
+    """
+
+    operator: str
+    version: str
+    key: Optional[VersionKey] = None
+
+    def contains(self, version: str) -> bool:
+        """
+        Checks if a version matches the specifier, versions that can
+        not be compared are accepted
+        Args:
+            version: str | Version to check
+
+        Returns: bool
+        """
+        if self.operator == "===":
+            return version.strip() == self.version
+        if self.version.endswith(".*"):
+            matched = self.match_prefix(version, self.version[:-2])
+            return matched if self.operator == "==" else not matched
+        key = parse_version(version)
+        if key is None or self.key is None:
+            return True
+        local = key[5]
+        if not self.key[5]:
+            # Local versions are ignored when the specifier has none
+            key = key[:5] + ((),)
+        if self.operator == "~=":
+            prefix = ".".join(str(part) for part in get_release(self.version))
+            return key >= self.key and self.match_prefix(
+                version, prefix.rsplit(".", 1)[0]
+            )
+        # `<1.0` excludes pre-releases of 1.0 and `>1.0` excludes its
+        # post-releases and local versions, unless the specifier is one
+        same_release = key[:2] == self.key[:2]
+        return {
+            "==": key == self.key,
+            "!=": key != self.key,
+            "<=": key <= self.key,
+            ">=": key >= self.key,
+            "<": key < self.key
+            and not (
+                same_release
+                and is_prerelease(key)
+                and not is_prerelease(self.key)
+            ),
+            ">": key > self.key
+            and not (
+                same_release
+                and (
+                    local
+                    or is_postrelease(key)
+                    and not is_postrelease(self.key)
+                )
+            ),
+        }[self.operator]
+
+    @staticmethod
+    def match_prefix(version: str, prefix: str) -> bool:
+        """
+        Returns: bool | True if the release of the version starts with
+        the prefix, IE: `4.0.1` matches `4.0`
+        """
+        key, prefix_key = parse_version(version), parse_version(prefix)
+        if key is None or prefix_key is None or key[0] != prefix_key[0]:
+            return False
+        size = len(get_release(prefix))
+        release = get_release(version) + (0,) * size
+        return release[:size] == get_release(prefix)
+
+
+class Requirement:
+    """
+    Library specifier parsed into its parts,
+    IE: `django[argon2]>=4.0,<5; python_version >= "3.8"`
+    1. `name` is the name as written, `key` the interned canonical name,
+       a url or path without a name is its own key
+    2. `specifiers` hold the pre-parsed version keys
+    3. `text` is the specifier as written to the config
+    """
+
+    __slots__ = [
+        "text",
+        "name",
+        "key",
+        "extras",
+        "specifiers",
+        "marker",
+        "url",
+    ]
+
+    def __init__(
+        self,
+        text: str,
+        name: str,
+        extras: Tuple[str, ...] = (),
+        specifiers: Tuple[Specifier, ...] = (),
+        marker: str = "",
+        url: str = "",
+        key: str = "",
+    ):
+        self.text = text
+        self.name = name
+        self.key = sys.intern(key or canonicalize_name(name))
+        self.extras = extras
+        self.specifiers = specifiers
+        self.marker = marker
+        self.url = url
+
+    @property
+    def pinned(self) -> Optional[str]:
+        """
+        Returns: str | Exact version pinned with `==`, IE: `django==4.0.1`
+        returns `4.0.1`, None if the version is not pinned
+        """
+        if len(self.specifiers) != 1:
+            return None
+        operator, version, _ = self.specifiers[0]
+        if operator != "==" or version.endswith(".*"):
+            return None
+        return version
+
+    def contains(self, version: str) -> bool:
+        """
+        Checks if a version matches every specifier of the requirement
+        Args:
+            version: str | Version to check
+
+        Returns: bool
+        """
+        return all(spec.contains(version) for spec in self.specifiers)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Requirement):
+            return self.text == other.text
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.text)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"Requirement({self.text!r})"
+
+
+def parse_direct_reference(text: str) -> Requirement:
+    """
+    Parses a url or a path without a `name @` prefix, the name is taken
+    from the `#egg=` fragment, without one the whole specifier is the key
+    so that different urls never replace each other
+    Args:
+        text: str | Stripped library specifier
+
+    Returns: Requirement
+    """
+    egg = EGG_PATTERN.search(text)
+    if egg:
+        return Requirement(text, sys.intern(egg.group(1)), url=text)
+    return Requirement(text, text, url=text, key=text)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_requirement(lib: str) -> Requirement:
+    """
+    Parses a library specifier with extras, version specifiers of every
+    operator, a direct url or path and an environment marker, the same
+    specifier returns the same cached Requirement
+    Args:
+        lib: str | Library specifier
+
+    Returns: Requirement
+    """
+    text = lib.strip()
+    match = REQUIREMENT_PATTERN.match(lib)
+    if not (match and match.group("version").startswith("@")) and (
+        DIRECT_PATTERN.search(text.split(";")[0].strip())
+    ):
+        return parse_direct_reference(text)
+    if not match:
+        return Requirement(text, text)
+    extras = tuple(
+        sys.intern(extra.strip())
+        for extra in (match.group("extras") or "").split(",")
+        if extra.strip()
+    )
+    version = match.group("version")
+    url = ""
+    specifiers = ()
+    if version.startswith("@"):
+        url = version[1:].strip()
+    else:
+        specifiers = tuple(
+            Specifier(
+                operator,
+                value,
+                None if value.endswith(".*") else parse_version(value),
+            )
+            for operator, value in SPECIFIER_PATTERN.findall(version)
+        )
+    return Requirement(
+        text,
+        sys.intern(match.group("name")),
+        extras,
+        specifiers,
+        (match.group("marker") or "").strip(),
+        url,
+    )
+
+
+def get_archive(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Returns: Tuple | Canonical name and version of the distribution of a
+    wheel or source archive url or path, None for other references
+    """
+    path = url.split("#", 1)[0].split("?", 1)[0].rstrip("/\\")
+    match = ARCHIVE_PATTERN.match(re.split(r"[/\\]", path)[-1])
+    if not match:
+        return None
+    return canonicalize_name(match.group("name")), match.group("version")
+
+
+def get_marker_environment(python_version: str = "") -> Dict[str, str]:
+    """
+    Environment markers of the running interpreter, PEP 508
+    Args:
+        python_version: str | Full python version of the venv if it
+                        differs from the running interpreter
+
+    Returns: Dict[str, str]
+    """
+    full_version = python_version or platform.python_version()
+    implementation_version = ".".join(
+        str(part) for part in sys.implementation.version[:3]
+    )
+    return {
+        "implementation_name": sys.implementation.name,
+        "implementation_version": implementation_version,
+        "os_name": os.name,
+        "platform_machine": platform.machine(),
+        "platform_python_implementation": platform.python_implementation(),
+        "platform_release": platform.release(),
+        "platform_system": platform.system(),
+        "platform_version": platform.version(),
+        "python_full_version": full_version,
+        "python_version": ".".join(full_version.split(".")[:2]),
+        "sys_platform": sys.platform,
+        "extra": "",
+    }
+
+
+def compare_marker(left: str, operator: str, right: str) -> bool:
+    """
+    Compares two marker values, as versions if both are versions,
+    otherwise as strings
+    """
+    operator = " ".join(operator.split())
+    if operator == "in":
+        return left in right
+    if operator == "not in":
+        return left not in right
+    if parse_version(left) is not None and parse_version(right) is not None:
+        return Specifier(operator, right, parse_version(right)).contains(left)
+    return {
+        "==": left == right,
+        "===": left == right,
+        "!=": left != right,
+        "<": left < right,
+        "<=": left <= right,
+        ">": left > right,
+        ">=": left >= right,
+    }.get(operator, False)
+
+
+def evaluate_marker(
+    marker: str, environment: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Evaluates an environment marker, IE: `sys_platform == "win32"`
+    Args:
+        marker: str | Marker of a requirement
+        environment: Dict | Marker values, the running interpreter
+                     by default
+
+    Returns: bool | True if the marker matches, markers that can not
+             be parsed match
+    """
+    if not marker.strip():
+        return True
+    environment = environment or get_marker_environment()
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    marker = marker.rstrip()
+    while position < len(marker):
+        match = MARKER_TOKEN.match(marker, position)
+        if not match or match.end() == position:
+            return True
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    tokens.append(("end", ""))
+    index = 0
+
+    def value() -> str:
+        nonlocal index
+        kind, text = tokens[index]
+        index += 1
+        if kind == "string":
+            return text[1:-1]
+        if kind == "word" and text in environment:
+            return environment[text]
+        raise ValueError(f"Unexpected {text!r} in marker")
+
+    def atom() -> bool:
+        nonlocal index
+        if tokens[index] == ("paren", "("):
+            index += 1
+            result = expression()
+            if tokens[index] != ("paren", ")"):
+                raise ValueError("Unbalanced parenthesis in marker")
+            index += 1
+            return result
+        left = value()
+        kind, operator = tokens[index]
+        if kind != "op":
+            raise ValueError(f"Unexpected {operator!r} in marker")
+        index += 1
+        return compare_marker(left, operator, value())
+
+    def conjunction() -> bool:
+        nonlocal index
+        result = atom()
+        while tokens[index] == ("word", "and"):
+            index += 1
+            result = atom() and result
+        return result
+
+    def expression() -> bool:
+        nonlocal index
+        result = conjunction()
+        while tokens[index] == ("word", "or"):
+            index += 1
+            result = conjunction() or result
+        return result
+
+    try:
+        result = expression()
+    except (ValueError, IndexError):
+        return True
+    return result if tokens[index][0] == "end" else True
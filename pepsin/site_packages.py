@@ -0,0 +1,144 @@
+"""
+Reads installed distributions straight from the `*.dist-info` and
+`*.egg-info` directories of a venv's site-packages, without running pip.
+
+Names and versions come from the directory names, `METADATA` and `RECORD`
+are only read when asked for. Results are cached per site-packages
+directory and invalidated when the directory mtime changes, installing
+or removing a distribution always adds or removes a metadata directory
+"""
+import csv
+import dataclasses
+import os
+from email.parser import HeaderParser
+from typing import Dict, List, Optional, Tuple
+
+from pepsin.utils import canonicalize_name, find_site_packages, read_file
+
+METADATA_SUFFIXES = (".dist-info", ".egg-info")
+
+_CACHE: Dict[str, Tuple[int, Dict[str, "Distribution"]]] = {}
+
+
+@dataclasses.dataclass
+class Distribution:
+    """
+    Installed distribution
+    params:
+        name: str | Distribution name as written in the metadata directory
+        version: str | Installed version
+        path: str | Path of the metadata directory
+    """
+
+    name: str
+    version: str
+    path: str
+    _metadata: Optional[dict] = dataclasses.field(default=None, repr=False)
+
+    @property
+    def canonical_name(self) -> str:
+        """
+        Returns: str | PEP 503 normalized name
+        """
+        return canonicalize_name(self.name)
+
+    @property
+    def metadata(self):
+        """
+        Returns: Message | Parsed `METADATA` / `PKG-INFO` headers
+        """
+        if self._metadata is None:
+            if os.path.isfile(self.path):
+                # Single file egg-info
+                file_name = self.path
+            elif self.path.endswith(".egg-info"):
+                file_name = os.path.join(self.path, "PKG-INFO")
+            else:
+                file_name = os.path.join(self.path, "METADATA")
+            self._metadata = HeaderParser().parsestr(read_file(file_name))
+        return self._metadata
+
+    @property
+    def requires(self) -> List[str]:
+        """
+        Returns: List[str] | `Requires-Dist` requirements
+        """
+        return list(self.metadata.get_all("Requires-Dist") or [])
+
+    @property
+    def files(self) -> List[str]:
+        """
+        Returns: List[str] | Installed files listed in `RECORD`,
+                 relative to site-packages
+        """
+        record = read_file(os.path.join(self.path, "RECORD"))
+        return [row[0] for row in csv.reader(record.splitlines()) if row]
+
+
+def parse_metadata_dir(entry: str) -> Optional[Tuple[str, str]]:
+    """
+    Splits a metadata directory name into name and version,
+    IE: `Django-4.0.1.dist-info` returns `("Django", "4.0.1")`
+    """
+    for suffix in METADATA_SUFFIXES:
+        if entry.endswith(suffix):
+            stem = entry[: -len(suffix)]
+            name, _, version = stem.partition("-")
+            # egg-info may contain the python version, `-py3.10`
+            version = version.split("-py")[0]
+            return name, version
+    return None
+
+
+def scan_site_packages(site_packages: str) -> Dict[str, Distribution]:
+    """
+    Scans one site-packages directory, cached by the directory mtime
+    Args:
+        site_packages: Path of the site-packages directory
+
+    Returns: Dict | Canonical name and Distribution
+    """
+    try:
+        mtime = os.stat(site_packages).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = _CACHE.get(site_packages)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    distributions = {}
+    with os.scandir(site_packages) as entries:
+        for entry in entries:
+            parsed = parse_metadata_dir(entry.name)
+            if not parsed:
+                continue
+            name, version = parsed
+            distribution = Distribution(name, version, entry.path)
+            if not version[:1].isdigit():
+                # Name contains a dash, read the real name from metadata
+                distribution.name = distribution.metadata.get("Name", name)
+                distribution.version = distribution.metadata.get("Version", "")
+            distributions[distribution.canonical_name] = distribution
+    _CACHE[site_packages] = (mtime, distributions)
+    return distributions
+
+
+def get_distributions(venv_dir: str) -> Dict[str, Distribution]:
+    """
+    Returns distributions installed in a venv
+    Args:
+        venv_dir: Virtual environment directory
+
+    Returns: Dict | Canonical name and Distribution
+    """
+    distributions = {}
+    for site_packages in find_site_packages(venv_dir):
+        for name, distribution in scan_site_packages(site_packages).items():
+            distributions.setdefault(name, distribution)
+    return distributions
+
+
+def clear_cache():
+    """
+    Clears cached scan results
+    """
+    _CACHE.clear()
@@ -0,0 +1,148 @@
+"""
+Snapshots of installed virtual environments
+
+A snapshot is a compressed tarball of a venv, named by the interpreter and
+the hash of the resolved library set, restoring one is much cheaper than
+installing the libraries again and needs no network
+"""
+import io
+import os
+import shutil
+import tarfile
+import time
+import uuid
+from typing import List
+
+from pepsin.fingerprint import FINGERPRINT_FILE
+from pepsin.lock import LockFile, hash_libraries
+from pepsin.relocate import relocate_venv
+from pepsin.utils import get_cache_dir
+from pepsin.venv_pool import get_interpreter_key
+
+ORIGIN_FILE = ".pepsin-origin"
+COMPRESS_LEVEL = 1
+
+
+def get_default_snapshot_dir() -> str:
+    """
+    Returns: str | Default snapshot directory in the user cache directory
+    """
+    return get_cache_dir("snapshots")
+
+
+def get_library_hash(libs: List[str], lock: LockFile) -> str:
+    """
+    Hash of the resolved library set, the content of the lock if it is
+    fresh, otherwise the libraries of the config
+    Args:
+        libs: List of libraries
+        lock: Lock file of the project
+
+    Returns: str
+    """
+    if lock.is_fresh(libs):
+        return lock.content_hash()
+    return hash_libraries(libs)
+
+
+def get_snapshot_key(executable: str, library_hash: str) -> str:
+    """
+    Args:
+        executable: Python executable that created the venv
+        library_hash: Hash of the resolved library set
+
+    Returns: str | Name of the snapshot
+    """
+    return f"{get_interpreter_key(executable)}-{library_hash[:16]}"
+
+
+def exclude_files(info: tarfile.TarInfo):
+    """
+    Tar filter that leaves out files regenerated after a restore
+    """
+    if os.path.basename(info.name) in [FINGERPRINT_FILE, ORIGIN_FILE]:
+        return None
+    return info
+
+
+class SnapshotStore:
+    """
+    Directory of venv snapshots
+    """
+
+    def __init__(self, path: str = ""):
+        self.path = os.path.abspath(path or get_default_snapshot_dir())
+
+    def get_path(self, key: str) -> str:
+        """
+        Returns: str | Path of the snapshot archive
+        """
+        return os.path.join(self.path, f"{key}.tar.gz")
+
+    def exists(self, key: str) -> bool:
+        """
+        Returns: bool
+        """
+        return os.path.isfile(self.get_path(key))
+
+    def save(self, venv_dir: str, key: str) -> str:
+        """
+        Archives a venv, the archive is written under a temporary name and
+        renamed once complete
+        Args:
+            venv_dir: Virtual environment directory
+            key: Name of the snapshot
+
+        Returns: str | Path of the snapshot archive
+        """
+        venv_dir = os.path.abspath(venv_dir)
+        archive = self.get_path(key)
+        temp_file = f"{archive}.{uuid.uuid4().hex}.part"
+        os.makedirs(self.path, exist_ok=True)
+        # The origin is added from memory, the venv is never changed
+        origin = venv_dir.encode("utf-8")
+        origin_info = tarfile.TarInfo(ORIGIN_FILE)
+        origin_info.size = len(origin)
+        origin_info.mtime = int(time.time())
+        try:
+            with tarfile.open(
+                temp_file, "w:gz", compresslevel=COMPRESS_LEVEL
+            ) as tar:
+                tar.add(venv_dir, arcname=".", filter=exclude_files)
+                tar.addfile(origin_info, io.BytesIO(origin))
+            os.replace(temp_file, archive)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        return archive
+
+    def restore(self, key: str, venv_dir: str) -> bool:
+        """
+        Extracts a snapshot to `venv_dir` and rewrites the files that
+        point to the location the snapshot was taken at
+        Args:
+            key: Name of the snapshot
+            venv_dir: Destination directory, must not exist
+
+        Returns: bool | False if there is no snapshot
+        """
+        if not self.exists(key):
+            return False
+        venv_dir = os.path.abspath(venv_dir)
+        temp_dir = f"{venv_dir}.{uuid.uuid4().hex}.part"
+        try:
+            with tarfile.open(self.get_path(key), "r:gz") as tar:
+                if hasattr(tarfile, "tar_filter"):
+                    # venvs contain absolute symlinks to the interpreter
+                    tar.extractall(temp_dir, filter="tar")
+                else:
+                    tar.extractall(temp_dir)
+            origin_file = os.path.join(temp_dir, ORIGIN_FILE)
+            with open(origin_file, encoding="utf-8") as file:
+                origin = file.read().strip()
+            os.remove(origin_file)
+            relocate_venv(temp_dir, origin, venv_dir)
+            os.rename(temp_dir, venv_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return True
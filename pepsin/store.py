@@ -0,0 +1,152 @@
+"""
+Content addressed global package store
+
+Wheels are unpacked once into a user level store, addressed by the
+sha256 of the wheel file, every venv gets the unpacked files through
+hardlinks (or reflinks), so the same package version exists only once
+on disk no matter how many projects use it.
+
+Linked files are shared between all venvs, editing an installed file
+in place changes it for every venv, pip replaces files instead of
+editing them so upgrades and uninstalls are safe
+"""
+import hashlib
+import os
+import shutil
+import uuid
+import zipfile
+from typing import List
+
+from pepsin.utils import get_cache_dir, link_file
+from pepsin.wheel import (
+    check_safe_path,
+    finalize_install,
+    get_destination,
+    get_dist_info,
+    get_scheme,
+    get_venv_python,
+    read_record,
+    write_script,
+)
+
+CHUNK_SIZE = 1024 * 64
+
+
+def get_default_store() -> str:
+    """
+    Returns: str | User level package store directory
+    """
+    return get_cache_dir("store")
+
+
+def hash_file(file_name: str) -> str:
+    """
+    Returns: str | sha256 hex digest of a file
+    """
+    file_hash = hashlib.sha256()
+    with open(file_name, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+class PackageStore:
+    """
+    Global store of unpacked wheels
+    1. Unpacks a wheel once into `<store>/<digest[:2]>/<digest>`
+    2. Links unpacked files into the install locations of a venv
+    3. Writes `INSTALLER` and `RECORD` for pip to manage the package
+    """
+
+    def __init__(self, path: str = "", link_mode: str = "hardlink"):
+        self.path = os.path.abspath(path or get_default_store())
+        self.link_mode = link_mode
+
+    def get_path(self, digest: str) -> str:
+        """
+        Returns: str | Directory of an unpacked wheel in the store
+        """
+        return os.path.join(self.path, digest[:2], digest)
+
+    def add_wheel(self, wheel: str) -> str:
+        """
+        Unpacks a wheel into the store if it has not been stored before,
+        it is unpacked into a temporary directory and renamed, so a half
+        unpacked wheel never becomes visible
+        Args:
+            wheel: Path of the wheel file
+
+        Returns: str | Directory of the unpacked wheel
+        """
+        destination = self.get_path(hash_file(wheel))
+        if os.path.isdir(destination):
+            return destination
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        temp_dir = f"{destination}.{uuid.uuid4().hex}.tmp"
+        try:
+            with zipfile.ZipFile(wheel) as archive:
+                for name in archive.namelist():
+                    check_safe_path(name)
+                archive.extractall(temp_dir)
+            try:
+                os.rename(temp_dir, destination)
+            except OSError:
+                # Stored concurrently by another process
+                if not os.path.isdir(destination):
+                    raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return destination
+
+    def link(self, stored_dir: str, venv_dir: str) -> List[str]:
+        """
+        Links an unpacked wheel into a venv
+        Args:
+            stored_dir: Directory of the unpacked wheel in the store
+            venv_dir: Virtual environment directory
+
+        Returns: List[str] | Absolute paths of the installed files
+        """
+        names = []
+        for root, _, files in os.walk(stored_dir):
+            for file_name in files:
+                source = os.path.join(root, file_name)
+                names.append(
+                    os.path.relpath(source, stored_dir).replace(os.sep, "/")
+                )
+        dist_info = get_dist_info(names)
+        scheme = get_scheme(venv_dir)
+        scheme["headers"] = os.path.join(
+            scheme["headers"], dist_info.split("-")[0]
+        )
+        python = get_venv_python(venv_dir)
+        record_file = os.path.join(stored_dir, dist_info, "RECORD")
+        record = (
+            read_record(record_file) if os.path.isfile(record_file) else {}
+        )
+        installed = {}
+        for name in sorted(names):
+            destination = get_destination(name, scheme)
+            if destination is None or name == f"{dist_info}/RECORD":
+                continue
+            source = os.path.join(stored_dir, *name.split("/"))
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            if os.path.dirname(destination) == scheme["scripts"]:
+                with open(source, "rb") as file:
+                    write_script(file.read(), destination, python)
+                installed[destination] = None
+            else:
+                link_file(source, destination, self.link_mode)
+                installed[destination] = record.get(name)
+        return finalize_install(dist_info, scheme, installed, python)
+
+    def install(self, wheel: str, venv_dir: str) -> List[str]:
+        """
+        Stores a wheel and links it into a venv
+        Args:
+            wheel: Path of the wheel file
+            venv_dir: Virtual environment directory
+
+        Returns: List[str] | Absolute paths of the installed files
+        """
+        return self.link(self.add_wheel(wheel), venv_dir)
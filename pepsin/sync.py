@@ -0,0 +1,145 @@
+"""
+Computes the difference between the installed distributions of a venv
+and the libraries in the config or the lock, so that only the delta
+has to be installed or removed
+"""
+import dataclasses
+import os
+from typing import Dict, List, Optional, Tuple
+
+from pepsin.lock import LockFile
+from pepsin.requirements import (
+    Requirement,
+    evaluate_marker,
+    get_archive,
+    get_marker_environment,
+    is_same_version,
+    parse_requirement,
+)
+from pepsin.utils import canonicalize_name, read_file
+
+# Packaging tools installed by virtualenv, never removed by sync
+PROTECTED_PACKAGES = ["pip", "setuptools", "wheel"]
+
+
+@dataclasses.dataclass
+class SyncPlan:
+    """
+    Changes required to bring the venv in sync
+    params:
+        add: List[str] | Requirements that are not installed
+        change: List[str] | Requirements installed with a different version
+        remove: List[str] | Installed distributions that are not required
+        no_deps: bool | Requirements contain the whole closure
+        require_hashes: bool | Every requirement has a hash
+    """
+
+    add: List[str] = dataclasses.field(default_factory=list)
+    change: List[str] = dataclasses.field(default_factory=list)
+    remove: List[str] = dataclasses.field(default_factory=list)
+    no_deps: bool = False
+    require_hashes: bool = False
+
+    def is_empty(self) -> bool:
+        """
+        Returns: bool | True if there is nothing to do
+        """
+        return not (self.add or self.change or self.remove)
+
+    def to_install(self) -> List[str]:
+        """
+        Returns: List[str] | Requirements that need to be installed
+        """
+        return self.add + self.change
+
+
+def plan_from_lock(lock: LockFile, installed: Dict[str, str]) -> SyncPlan:
+    """
+    Plans sync against the lock, as the lock contains the whole closure
+    installed distributions that are not locked are removed
+    Args:
+        lock: LockFile instance
+        installed: Dict | Canonical name and version of installed packages
+
+    Returns: SyncPlan
+    """
+    plan = SyncPlan(no_deps=True, require_hashes=lock.requires_hashes())
+    locked = set()
+    for package in lock.packages:
+        name = canonicalize_name(package["name"])
+        locked.add(name)
+        if name not in installed:
+            plan.add.append(lock.requirement(package, plan.require_hashes))
+        elif not is_same_version(installed[name], str(package["version"])):
+            plan.change.append(lock.requirement(package, plan.require_hashes))
+    plan.remove = [
+        name
+        for name in installed
+        if name not in locked and name not in PROTECTED_PACKAGES
+    ]
+    return plan
+
+
+def get_venv_environment(venv_dir: Optional[str]) -> Dict[str, str]:
+    """
+    Returns: Dict[str, str] | Environment markers with the python version
+    of the venv from its `pyvenv.cfg`, the running interpreter's otherwise
+    """
+    python_version = ""
+    if venv_dir:
+        config = read_file(os.path.join(venv_dir, "pyvenv.cfg")) or ""
+        for line in config.splitlines():
+            key, _, value = line.partition("=")
+            if key.strip() in ["version", "version_info"]:
+                python_version = ".".join(value.strip().split(".")[:3])
+                break
+    return get_marker_environment(python_version)
+
+
+def get_installed_name(requirement: Requirement) -> Tuple[str, str]:
+    """
+    Returns: Tuple | Canonical name of the distribution of a requirement
+    and the version a wheel or source archive url pins, urls without an
+    `#egg=` name or an archive file name return the key as written
+    """
+    if requirement.url and requirement.key == requirement.text:
+        archive = get_archive(requirement.url)
+        if archive:
+            return archive
+    return requirement.key, ""
+
+
+def plan_from_libraries(
+    libs: List[str],
+    installed: Dict[str, str],
+    environment: Optional[Dict[str, str]] = None,
+) -> SyncPlan:
+    """
+    Plans sync against the configured libraries, dependencies of the
+    libraries are unknown without a lock, so nothing is removed,
+    installed versions outside of the specifiers are changed and
+    libraries whose marker does not match the environment are skipped
+    Args:
+        libs: List[str] | List of libraries
+        installed: Dict | Canonical name and version of installed packages
+        environment: Dict | Environment markers, the running interpreter
+                     by default
+
+    Returns: SyncPlan
+    """
+    plan = SyncPlan()
+    environment = environment or get_marker_environment()
+    for lib in libs:
+        requirement = parse_requirement(lib)
+        if not evaluate_marker(requirement.marker, environment):
+            continue
+        name, version = get_installed_name(requirement)
+        if name not in installed:
+            plan.add.append(lib)
+        elif not (
+            is_same_version(installed[name], version)
+            if version
+            else requirement.contains(installed[name])
+        ):
+            plan.change.append(lib)
+    return plan
@@ -0,0 +1,260 @@
+"""
+Content addressed cache of script results
+
+A script with `inputs` is keyed by the content of its input files, its
+command, its outputs and the environment, IE: the interpreter and the
+locked libraries. After a successful run its output files and its log are
+stored, a later run with the same key restores the outputs and replays
+the log instead of running the script.
+
+Files are stored once by their sha256 in `<cache>/objects`, every result
+is a json manifest in `<cache>/entries`. Manifests are touched when they
+are used and the least recently used ones are evicted once the objects
+exceed `PEPSIN_TASK_CACHE_SIZE` megabytes
+"""
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from pepsin.store import hash_file
+from pepsin.tasks import Task, expand_paths
+from pepsin.utils import get_cache_dir
+
+DEFAULT_CACHE_SIZE = 1024
+# Files a concurrent run has just stored are not referenced yet
+GRACE_PERIOD = 60
+
+
+def get_default_task_cache() -> str:
+    """
+    Returns: str | Task cache directory in the user cache directory
+    """
+    return get_cache_dir("tasks")
+
+
+def get_max_size() -> int:
+    """
+    Returns: int | Size limit of the cache in bytes
+    """
+    size = os.environ.get("PEPSIN_TASK_CACHE_SIZE", "")
+    return int(float(size or DEFAULT_CACHE_SIZE) * 1024 * 1024)
+
+
+def get_task_key(task: Task, environment: str) -> str:
+    """
+    Key of a task run
+    Args:
+        task: Task with inputs
+        environment: str | Identifies the interpreter and the libraries
+
+    Returns: str | Hex digest
+    """
+    inputs = [
+        [os.path.relpath(file), hash_file(file)]
+        for file in expand_paths(task.inputs) or []
+    ]
+    text = json.dumps(
+        [task.command, task.outputs, environment, inputs], sort_keys=True
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def replace_file(source: str, destination: str):
+    """
+    Copies a file through a temporary file, the destination is either the
+    old or the new file, never a partial one
+    """
+    temp_file = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        shutil.copyfile(source, temp_file)
+        os.replace(temp_file, destination)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+class TaskCache:
+    """
+    Local cache of script results
+    1. Stores the outputs and the log of a successful run
+    2. Restores them for a run with the same key
+    3. Evicts the least recently used results beyond the size limit
+    """
+
+    def __init__(self, path: str = "", max_size: Optional[int] = None):
+        self.path = os.path.abspath(path or get_default_task_cache())
+        self.max_size = get_max_size() if max_size is None else max_size
+
+    def get_entry_file(self, key: str) -> str:
+        """
+        Returns: str | Manifest of a result
+        """
+        return os.path.join(self.path, "entries", f"{key}.json")
+
+    def get_object_file(self, digest: str) -> str:
+        """
+        Returns: str | Stored file of a sha256 digest
+        """
+        return os.path.join(self.path, "objects", digest[:2], digest)
+
+    def add_object(self, file: str) -> str:
+        """
+        Stores a file if its content has not been stored before
+        Returns: str | sha256 digest of the file
+        """
+        digest = hash_file(file)
+        object_file = self.get_object_file(digest)
+        if not os.path.exists(object_file):
+            os.makedirs(os.path.dirname(object_file), exist_ok=True)
+            replace_file(file, object_file)
+        return digest
+
+    def save(self, key: str, outputs: List[str], log: List[str]) -> bool:
+        """
+        Stores the result of a successful run
+        Args:
+            key: str | Key of the run
+            outputs: List[str] | Output patterns of the task
+            log: List[str] | Output lines of the run
+
+        Returns: bool | False if a declared output is missing
+        """
+        files = expand_paths(outputs) if outputs else []
+        if files is None:
+            return False
+        log_file = os.path.join(self.path, f"log.{uuid.uuid4().hex}.tmp")
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            with open(log_file, "w", encoding="utf-8") as file:
+                file.write("\n".join(log))
+            entry = {
+                "log": self.add_object(log_file),
+                "outputs": [
+                    {
+                        "path": os.path.relpath(file),
+                        "digest": self.add_object(file),
+                        "mode": os.stat(file).st_mode & 0o777,
+                    }
+                    for file in files
+                ],
+            }
+        finally:
+            os.remove(log_file)
+        entry_file = self.get_entry_file(key)
+        os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+        temp_file = f"{entry_file}.{uuid.uuid4().hex}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(temp_file, entry_file)
+        self.evict()
+        return True
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Returns: Dict | Manifest of a result, None if it is missing or
+        one of its files has been evicted
+        """
+        try:
+            with open(self.get_entry_file(key), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        digests = [entry["log"]] + [out["digest"] for out in entry["outputs"]]
+        if not all(os.path.exists(self.get_object_file(d)) for d in digests):
+            return None
+        return entry
+
+    def restore(self, key: str) -> Optional[List[str]]:
+        """
+        Restores the outputs of a stored result into the working directory
+        Args:
+            key: str | Key of the run
+
+        Returns: List[str] | Output lines of the stored run, None if there
+                 is no stored result
+        """
+        entry = self.load(key)
+        if entry is None:
+            return None
+        paths = [
+            os.path.normpath(output["path"]) for output in entry["outputs"]
+        ]
+        # Outputs are only restored inside the working directory
+        if any(
+            os.path.isabs(path) or path.split(os.sep)[0] == ".."
+            for path in paths
+        ):
+            return None
+        for path, output in zip(paths, entry["outputs"]):
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            replace_file(self.get_object_file(output["digest"]), path)
+            os.chmod(path, output["mode"])
+        # Recently used results are evicted last
+        os.utime(self.get_entry_file(key))
+        with open(
+            self.get_object_file(entry["log"]), "r", encoding="utf-8"
+        ) as file:
+            log = file.read()
+        return log.split("\n") if log else []
+
+    def evict(self):
+        """
+        Removes the least recently used results until the stored files fit
+        into the size limit, then removes files no result refers to
+        """
+        entries_dir = os.path.join(self.path, "entries")
+        try:
+            names = [
+                name
+                for name in os.listdir(entries_dir)
+                if name.endswith(".json")
+            ]
+        except OSError:
+            return
+        entries = []
+        for name in names:
+            entry_file = os.path.join(entries_dir, name)
+            try:
+                entries.append((os.stat(entry_file).st_mtime, entry_file))
+            except OSError:
+                pass
+        kept = set()
+        size = 0
+        for _, entry_file in sorted(entries, reverse=True):
+            entry = self.load(os.path.basename(entry_file)[: -len(".json")])
+            digests = set()
+            if entry is not None:
+                digests = {entry["log"]} | {
+                    output["digest"] for output in entry["outputs"]
+                }
+            new = digests - kept
+            new_size = 0
+            try:
+                new_size = sum(
+                    os.path.getsize(self.get_object_file(digest))
+                    for digest in new
+                )
+            except OSError:
+                # An object is missing, the entry cannot be restored
+                entry = None
+            if entry is None or size + new_size > self.max_size:
+                with contextlib.suppress(OSError):
+                    os.remove(entry_file)
+                continue
+            kept |= new
+            size += new_size
+        deadline = time.time() - GRACE_PERIOD
+        for root, _, files in os.walk(os.path.join(self.path, "objects")):
+            for name in files:
+                object_file = os.path.join(root, name)
+                with contextlib.suppress(OSError):
+                    if name not in kept and (
+                        os.stat(object_file).st_mtime < deadline
+                    ):
+                        os.remove(object_file)
@@ -0,0 +1,273 @@
+"""
+Scripts of the config as a graph of tasks
+
+A script is a command or a mapping with the command, the scripts it
+depends on and the files it reads and writes
+    ```
+    scripts:
+      lint: flake8
+      codegen:
+        command: codegen.py
+        inputs: ["schema/*.json", "codegen.py"]
+        outputs: ["gen"]
+      build:
+        command: setup.py build
+        depends_on: [codegen, lint]
+    ```
+`pepsin run build` runs the dependencies first, independent scripts run
+concurrently. A script with inputs and outputs is up to date and does not
+run while every output is newer than every input, like a make target,
+results of scripts with inputs are cached by `pepsin.task_cache`
+"""
+import dataclasses
+import glob
+import os
+import shlex
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, TextIO
+
+from pepsin.error import InvalidCommandError
+from pepsin.parallel import ParallelRunner, ScriptResult
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pepsin.task_cache import TaskCache
+
+TASK_KEYS = ["command", "depends_on", "inputs", "outputs"]
+
+
+def get_script_args(command: str) -> List[str]:
+    """
+    Converts a script of the config into python arguments, scripts
+    without a `.py` file are run as modules
+    Args:
+        command: str | Script command, IE: `pytest -x`
+
+    Returns: List[str] | Arguments of the python interpreter
+    """
+    posix = os.name != "nt"
+    # Backslashes are path separators on windows, not escapes
+    script_args: List[str] = shlex.split(command, posix=posix)
+    if not posix:
+        # Non posix mode keeps the quotes of quoted arguments
+        script_args = [
+            arg[1:-1]
+            if len(arg) > 1 and arg[0] in "\"'" and arg[0] == arg[-1]
+            else arg
+            for arg in script_args
+        ]
+    if not any(".py" in value for value in script_args):
+        script_args.insert(0, "-m")
+    return script_args
+
+
+@dataclasses.dataclass
+class Task:
+    """
+    Script of the config
+    params:
+        name: str | Name of the script
+        command: str | Command, empty for a script that only groups others
+        depends_on: List[str] | Scripts that run before this one
+        inputs: List[str] | Glob patterns of the files the script reads
+        outputs: List[str] | Files and directories the script writes
+    """
+
+    name: str
+    command: str = ""
+    depends_on: List[str] = dataclasses.field(default_factory=list)
+    inputs: List[str] = dataclasses.field(default_factory=list)
+    outputs: List[str] = dataclasses.field(default_factory=list)
+
+
+def get_list(name: str, key: str, value: Any) -> List[str]:
+    """
+    Returns: List[str] | A string or a list of strings of a script as list
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)) and all(
+        isinstance(item, str) for item in value
+    ):
+        return list(value)
+    raise InvalidCommandError(f"`{key}` of script {name} must be a list")
+
+
+def parse_task(name: str, script: Any) -> Task:
+    """
+    Parses a script of the config
+    Args:
+        name: str | Name of the script
+        script: str | Mapping | Command or mapping of the script
+
+    Returns: Task
+    """
+    if isinstance(script, str):
+        return Task(name, script)
+    if not isinstance(script, Mapping):
+        raise InvalidCommandError(f"Script {name} must be a command or a map")
+    unknown = [key for key in script if key not in TASK_KEYS]
+    if unknown:
+        raise InvalidCommandError(
+            f"Unknown keys in script {name}: {', '.join(unknown)}"
+        )
+    return Task(
+        name,
+        script.get("command") or "",
+        *(get_list(name, key, script.get(key)) for key in TASK_KEYS[1:]),
+    )
+
+
+def parse_tasks(scripts: Optional[Mapping]) -> Dict[str, Task]:
+    """
+    Returns: Dict[str, Task] | Tasks of the scripts of the config
+    """
+    return {
+        name: parse_task(name, script)
+        for name, script in (scripts or {}).items()
+    }
+
+
+def get_task_order(tasks: Dict[str, Task], targets: List[str]) -> List[str]:
+    """
+    Orders the targets and every script they depend on, dependencies come
+    before the scripts that depend on them
+    Args:
+        tasks: Dict[str, Task] | Tasks of the config
+        targets: List[str] | Scripts to run
+
+    Returns: List[str] | Names of the scripts in a topological order
+    Raises: InvalidCommandError for unknown scripts and dependency cycles
+    """
+    order: List[str] = []
+    path: List[str] = []
+
+    def visit(name: str):
+        if name in order:
+            return
+        if name in path:
+            cycle = path[path.index(name) :] + [name]
+            raise InvalidCommandError(
+                f"Dependency cycle: {' -> '.join(cycle)}"
+            )
+        path.append(name)
+        for dependency in tasks[name].depends_on:
+            if dependency not in tasks:
+                raise InvalidCommandError(
+                    f"Script {name} depends on unknown script {dependency}"
+                )
+            visit(dependency)
+        path.pop()
+        order.append(name)
+
+    missing = [name for name in targets if name not in tasks]
+    if missing:
+        raise InvalidCommandError(f"No script named {', '.join(missing)}")
+    for target in targets:
+        visit(target)
+    return order
+
+
+def expand_paths(patterns: List[str]) -> Optional[List[str]]:
+    """
+    Expands glob patterns into files, directories into the files they
+    contain
+    Returns: List[str] | Files, None if a pattern matches nothing
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches:
+            return None
+        for match in matches:
+            if os.path.isdir(match):
+                for root, _, names in os.walk(match):
+                    files.update(os.path.join(root, name) for name in names)
+            else:
+                files.add(match)
+    return sorted(files)
+
+
+def is_up_to_date(task: Task) -> bool:
+    """
+    Checks if the outputs of a task are newer than its inputs
+    Returns: bool | False if the task declares no inputs or outputs, or an
+    output is missing
+    """
+    if not task.inputs or not task.outputs:
+        return False
+    inputs = expand_paths(task.inputs)
+    outputs = expand_paths(task.outputs)
+    if inputs is None or not outputs:
+        return False
+    newest_input = max((os.stat(file).st_mtime for file in inputs), default=0)
+    return newest_input <= min(os.stat(file).st_mtime for file in outputs)
+
+
+class TaskRunner(ParallelRunner):
+    """
+    Runs tasks and their dependencies on a pool of `jobs` processes
+    1. A task starts once every task it depends on succeeded
+    2. Up to date tasks and tasks without command do not run
+    3. With a cache, tasks with inputs restore the outputs and the log of
+       a run with the same key instead of running
+    """
+
+    def __init__(
+        self,
+        tasks: Dict[str, Task],
+        order: List[str],
+        executable: str,
+        out: TextIO,
+        cache: Optional["TaskCache"] = None,
+        environment: str = "",
+        **options,
+    ):
+        self.tasks = tasks
+        self.cache = cache
+        self.environment = environment
+        # Keys and output lines of the cacheable tasks that run
+        self.keys: Dict[str, str] = {}
+        self.logs: Dict[str, List[str]] = {}
+        super().__init__(
+            {
+                name: [executable, *get_script_args(tasks[name].command)]
+                for name in order
+            },
+            out,
+            dependencies={name: tasks[name].depends_on for name in order},
+            **options,
+        )
+
+    def write(self, name: str, line: str):
+        if name in self.logs:
+            self.logs[name].append(line)
+        super().write(name, line)
+
+    def reuse(self, name: str) -> str:
+        task = self.tasks[name]
+        if not task.command:
+            return "ok"
+        if is_up_to_date(task):
+            return "up to date"
+        if self.cache is None or not task.inputs:
+            return ""
+        from pepsin.task_cache import (  # pylint: disable=import-outside-toplevel
+            get_task_key,
+        )
+
+        key = get_task_key(task, self.environment)
+        log = self.cache.restore(key)
+        if log is not None:
+            for line in log:
+                self.write(name, line)
+            return "cached"
+        self.keys[name] = key
+        self.logs[name] = []
+        return ""
+
+    def finish(self, name: str, result: ScriptResult):
+        if self.cache is not None and name in self.keys and result.succeeded:
+            self.cache.save(
+                self.keys[name], self.tasks[name].outputs, self.logs[name]
+            )
@@ -1 +1,2 @@
 from .base import *
+from .fs import *
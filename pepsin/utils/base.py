@@ -2,7 +2,9 @@
 Contains Base utility that is required to run the pepsin CLI Class
 """
 import enum
+import glob
 import os
+import re
 from sys import platform
 
 
@@ -59,6 +61,60 @@ def check_dir_exists(*paths):
     return os.path.isdir(os.path.join(*paths))
 
 
+def canonicalize_name(name):
+    """
+    Normalizes a distribution name as described in PEP 503
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def find_site_packages(venv_dir):
+    """
+    Finds site-packages directories of a virtual environment
+    Args:
+        venv_dir: Virtual environment directory
+
+    Returns: List of site-packages directories
+
+    """
+    patterns = [
+        os.path.join(venv_dir, "lib", "python*", "site-packages"),
+        os.path.join(venv_dir, "lib64", "python*", "site-packages"),
+        os.path.join(venv_dir, "Lib", "site-packages"),
+    ]
+    site_packages = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            real_path = os.path.realpath(path)
+            if real_path not in site_packages:
+                site_packages.append(real_path)
+    return site_packages
+
+
+def get_cache_dir(*paths):
+    """
+    Returns user level pepsin cache directory, `PEPSIN_CACHE_DIR`
+    environment variable overrides the default location
+    Args:
+        *paths: Paths to join with the cache directory
+
+    Returns: str
+    """
+    cache_dir = os.environ.get("PEPSIN_CACHE_DIR")
+    if not cache_dir and get_os() == OSEnum.WIN:
+        cache_dir = os.path.join(
+            os.environ.get("LOCALAPPDATA", os.path.expanduser("~")),
+            "pepsin",
+            "Cache",
+        )
+    elif not cache_dir:
+        cache_dir = os.path.join(
+            os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+            "pepsin",
+        )
+    return os.path.join(cache_dir, *paths)
+
+
 class OSEnum(enum.Enum):
     """
     OS Enum
@@ -82,3 +138,10 @@ def get_os(plt=platform) -> OSEnum:
         __os = OSEnum.WIN
 
     return __os
+
+
+def get_python_executable() -> str:
+    """
+    Returns name of the python executable of the system
+    """
+    return "python" if get_os() == OSEnum.WIN else "python3"
@@ -0,0 +1,61 @@
+"""
+File system helpers to share files between directories without copying
+"""
+import errno
+import os
+import shutil
+import sys
+
+# ioctl request to clone a file on btrfs / xfs, Linux only
+FICLONE = 0x40049409
+
+
+def reflink_file(src, dst):
+    """
+    Creates a copy-on-write clone of a file, raises OSError if
+    the file system does not support it
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflink is not supported")
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+        try:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        except OSError:
+            dst_file.close()
+            os.remove(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def link_file(src, dst, mode="hardlink"):
+    """
+    Shares a file at a new path, falls back to the next cheaper
+    option if one is not possible, hardlink -> reflink -> copy
+    Args:
+        src: Source file
+        dst: Destination file, replaced if it exists
+        mode: Option["hardlink", "reflink", "copy"]
+
+    Returns: str | Mode that has been used
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if os.path.islink(src):
+        os.symlink(os.readlink(src), dst)
+        return "symlink"
+    if mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+    if mode in ["hardlink", "reflink"]:
+        try:
+            reflink_file(src, dst)
+            return "reflink"
+        except OSError:
+            pass
+    shutil.copy2(src, dst)
+    return "copy"
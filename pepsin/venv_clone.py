@@ -0,0 +1,91 @@
+"""
+Cloning of virtual environments
+
+A venv is cloned by sharing its files with hardlinks or reflinks instead
+of installing the libraries again, directories are walked in parallel and
+only the files that contain the venv location are rewritten
+"""
+import os
+import shutil
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Tuple
+
+from pepsin.fingerprint import FINGERPRINT_FILE
+from pepsin.relocate import relocate_venv
+from pepsin.utils import link_file
+from pepsin.wheelhouse import DEFAULT_JOBS
+
+
+def clone_dir(
+    src_dir: str, dst_dir: str, src_root: str, dst_root: str, mode: str
+) -> Tuple[List[Tuple[str, str]], Counter]:
+    """
+    Clones the files of one directory
+    Args:
+        src_dir: Source directory
+        dst_dir: Destination directory
+        src_root: Root of the source venv
+        dst_root: Final root of the clone, absolute symlinks into the
+                  source venv are pointed here
+        mode: Option["hardlink", "reflink", "copy"]
+
+    Returns: Tuple | Sub directories to clone, link modes used
+    """
+    os.mkdir(dst_dir)
+    sub_dirs = []
+    modes = Counter()
+    for entry in os.scandir(src_dir):
+        target = os.path.join(dst_dir, entry.name)
+        if entry.is_symlink():
+            link = os.readlink(entry.path)
+            if link == src_root or link.startswith(src_root + os.sep):
+                link = dst_root + link[len(src_root) :]
+            os.symlink(link, target)
+            modes["symlink"] += 1
+        elif entry.is_dir():
+            sub_dirs.append((entry.path, target))
+        elif entry.name != FINGERPRINT_FILE:
+            modes[link_file(entry.path, target, mode)] += 1
+    return sub_dirs, modes
+
+
+def clone_venv(
+    src: str, dst: str, mode: str = "hardlink", jobs: int = DEFAULT_JOBS
+) -> Dict[str, int]:
+    """
+    Clones a venv, the clone is built under a temporary name and renamed
+    once complete
+    Args:
+        src: Source venv directory
+        dst: Destination directory, must not exist
+        mode: Option["hardlink", "reflink", "copy"]
+        jobs: Number of directories cloned in parallel
+
+    Returns: Dict | Number of files per link mode
+    """
+    src, dst = os.path.abspath(src), os.path.abspath(dst)
+    if not os.path.isfile(os.path.join(src, "pyvenv.cfg")):
+        raise FileNotFoundError(f"{src} is not a virtual environment")
+    if os.path.lexists(dst):
+        raise FileExistsError(f"{dst} already exists")
+    temp_dir = f"{dst}.{uuid.uuid4().hex}.part"
+    modes = Counter()
+    try:
+        with ThreadPoolExecutor(max_workers=jobs or DEFAULT_JOBS) as pool:
+            pending = {pool.submit(clone_dir, src, temp_dir, src, dst, mode)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    sub_dirs, dir_modes = future.result()
+                    modes.update(dir_modes)
+                    pending.update(
+                        pool.submit(clone_dir, *paths, src, dst, mode)
+                        for paths in sub_dirs
+                    )
+        relocate_venv(temp_dir, src, dst)
+        os.rename(temp_dir, dst)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return dict(modes)
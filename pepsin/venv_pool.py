@@ -0,0 +1,221 @@
+"""
+Pool of pre-created empty virtual environments
+
+Creating a venv with virtualenv takes seconds, a pool keeps a few empty
+venvs per interpreter in the user cache directory, `PyHandler.init_venv`
+claims one with a rename and refills the pool in the background.
+The pool is opt-in, it is used only after it has been created with
+`pepsin venv pool --size <n>`
+"""
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Optional
+
+from pepsin.relocate import relocate_venv
+from pepsin.utils import get_cache_dir
+
+DEFAULT_POOL_SIZE = 2
+SIZE_FILE = "size"
+ORIGIN_FILE = ".pepsin-origin"
+# Seconds after which an unfinished venv is considered abandoned
+PENDING_TIMEOUT = 600
+
+
+def get_interpreter_key(executable: str) -> str:
+    """
+    Pool key of an interpreter, venvs are only valid for the interpreter
+    they have been created with
+    Args:
+        executable: Name or path of the python executable
+
+    Returns: str
+    """
+    path = os.path.realpath(shutil.which(executable) or executable)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = 0
+    digest = hashlib.sha256(f"{path}:{mtime}".encode()).hexdigest()
+    return f"{os.path.basename(path)}-{digest[:12]}"
+
+
+class VenvPool:
+    """
+    Pool of empty venvs for one interpreter
+    """
+
+    def __init__(self, executable: str, path: str = ""):
+        self.executable = executable
+        self.path = path or get_cache_dir(
+            "venv-pool", get_interpreter_key(executable)
+        )
+
+    @property
+    def size(self) -> int:
+        """
+        Returns: int | Number of venvs the pool is refilled to,
+        0 when the pool is not enabled
+        """
+        try:
+            with open(
+                os.path.join(self.path, SIZE_FILE), encoding="utf-8"
+            ) as file:
+                return int(file.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def is_enabled(self) -> bool:
+        """
+        Returns: bool
+        """
+        return self.size > 0
+
+    def entries(self) -> List[str]:
+        """
+        Returns: List[str] | Ready venvs in the pool
+        """
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            entry.path
+            for entry in os.scandir(self.path)
+            if entry.is_dir() and not entry.name.endswith(".part")
+        )
+
+    def pending(self) -> List[str]:
+        """
+        Venvs being created by another process, unfinished venvs older
+        than `PENDING_TIMEOUT` have been abandoned and are removed
+        Returns: List[str] | Unfinished venvs in the pool
+        """
+        if not os.path.isdir(self.path):
+            return []
+        pending = []
+        for entry in os.scandir(self.path):
+            if not entry.is_dir() or not entry.name.endswith(".part"):
+                continue
+            try:
+                age = time.time() - entry.stat().st_mtime
+            except OSError:
+                continue
+            if age > PENDING_TIMEOUT:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                pending.append(entry.path)
+        return sorted(pending)
+
+    def create(self) -> str:
+        """
+        Creates one venv in the pool, it is built under a temporary name
+        and renamed once complete so a half built venv is never claimed
+        Returns: str | Path of the venv
+        """
+        name = uuid.uuid4().hex
+        temp_dir = os.path.join(self.path, f"{name}.part")
+        venv_dir = os.path.join(self.path, name)
+        os.makedirs(self.path, exist_ok=True)
+        try:
+            subprocess.check_call(
+                [self.executable, "-m", "virtualenv", "-q", temp_dir]
+            )
+            with open(
+                os.path.join(temp_dir, ORIGIN_FILE), "w", encoding="utf-8"
+            ) as file:
+                file.write(temp_dir)
+            os.rename(temp_dir, venv_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return venv_dir
+
+    def fill(self, size: Optional[int] = None) -> int:
+        """
+        Creates venvs until the pool has `size` venvs, venvs being
+        created by a concurrent refill count toward the size
+        Args:
+            size: Size of the pool, saved for later refills if given
+
+        Returns: int | Number of created venvs
+        """
+        if size is not None:
+            os.makedirs(self.path, exist_ok=True)
+            with open(
+                os.path.join(self.path, SIZE_FILE), "w", encoding="utf-8"
+            ) as file:
+                file.write(str(size))
+        created = 0
+        while len(self.entries()) + len(self.pending()) < self.size:
+            self.create()
+            created += 1
+        return created
+
+    def clear(self):
+        """
+        Removes every venv of the pool and disables it
+        """
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def claim(self, venv_dir: str) -> bool:
+        """
+        Moves a venv from the pool to `venv_dir`
+        Args:
+            venv_dir: Destination directory, must not exist
+
+        Returns: bool | False if the pool is empty
+        """
+        venv_dir = os.path.abspath(venv_dir)
+        for entry in self.entries():
+            try:
+                # Atomic, a venv can only be claimed once
+                os.rename(entry, venv_dir)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                # The cache is on another file system
+                claimed = f"{entry}.part"
+                try:
+                    os.rename(entry, claimed)
+                except OSError:
+                    continue
+                shutil.move(claimed, venv_dir)
+            origin_file = os.path.join(venv_dir, ORIGIN_FILE)
+            with open(origin_file, encoding="utf-8") as file:
+                origin = file.read().strip()
+            os.remove(origin_file)
+            relocate_venv(venv_dir, origin)
+            return True
+        return False
+
+    def refill_in_background(self):
+        """
+        Refills the pool in a detached process
+        """
+        kwargs = {}
+        if os.name == "nt":
+            kwargs["creationflags"] = getattr(
+                subprocess, "DETACHED_PROCESS", 0
+            )
+        else:
+            kwargs["start_new_session"] = True
+        subprocess.Popen(
+            [sys.executable, "-m", "pepsin.venv_pool", self.executable],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            **kwargs,
+        )
+
+
+def main():
+    """
+    Entry point of the background refill
+    """
+    VenvPool(sys.argv[1]).fill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Wheel layout helpers shared by the package store and the native
+wheel installer, maps wheel files to the install scheme of a venv and
+writes the files pip needs to manage an installed distribution
+"""
+import base64
+import configparser
+import csv
+import hashlib
+import io
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+from pepsin.utils import find_site_packages
+
+INSTALLER = "pepsin"
+
+ENTRY_POINT_SCRIPT = """#!{python}
+# -*- coding: utf-8 -*-
+import re
+import sys
+from {module} import {import_name}
+if __name__ == "__main__":
+    sys.argv[0] = re.sub(r"(-script\\.pyw|\\.exe)?$", "", sys.argv[0])
+    sys.exit({function}())
+"""
+
+
+def record_hash(data: bytes) -> str:
+    """
+    Returns: str | Hash of a file in the `RECORD` format
+    """
+    digest = hashlib.sha256(data).digest()
+    return "sha256=" + base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def get_venv_python(venv_dir: str) -> str:
+    """
+    Returns: str | Python executable of a venv
+    """
+    if sys.platform.startswith("win"):
+        return os.path.join(venv_dir, "Scripts", "python.exe")
+    return os.path.join(venv_dir, "bin", "python")
+
+
+def get_scheme(venv_dir: str) -> Dict[str, str]:
+    """
+    Install locations of a venv for the wheel `.data` directories
+    Args:
+        venv_dir: Virtual environment directory
+
+    Returns: Dict | Scheme name and directory
+    """
+    site_packages = find_site_packages(venv_dir)
+    if not site_packages:
+        raise FileNotFoundError(f"No site-packages in {venv_dir}")
+    scripts = "Scripts" if sys.platform.startswith("win") else "bin"
+    # `lib/python3.10/site-packages` holds the python version of the venv
+    python = os.path.basename(os.path.dirname(site_packages[0]))
+    if not python.startswith("python"):
+        python = f"python{sys.version_info[0]}.{sys.version_info[1]}"
+    return {
+        "purelib": site_packages[0],
+        "platlib": site_packages[0],
+        "scripts": os.path.join(venv_dir, scripts),
+        "data": venv_dir,
+        "headers": os.path.join(venv_dir, "include", "site", python),
+    }
+
+
+def get_dist_info(names: List[str]) -> str:
+    """
+    Returns: str | `.dist-info` directory of the wheel file list
+    """
+    for name in names:
+        top_level = name.split("/")[0]
+        if top_level.endswith(".dist-info"):
+            return top_level
+    raise ValueError("Wheel does not contain a .dist-info directory")
+
+
+def get_destination(name: str, scheme: Dict[str, str]) -> Optional[str]:
+    """
+    Maps a path inside a wheel to its install location, files in
+    `<name>.data/<scheme>/` go to the scheme directory, everything
+    else goes to site-packages
+    Args:
+        name: Path inside the wheel
+        scheme: Scheme name and directory
+
+    Returns: str | Absolute destination or None if it can not be installed
+    """
+    parts = name.split("/")
+    if parts[0].endswith(".data") and len(parts) > 2:
+        if parts[1] not in scheme:
+            return None
+        return os.path.join(scheme[parts[1]], *parts[2:])
+    return os.path.join(scheme["purelib"], *parts)
+
+
+def check_safe_path(name: str):
+    """
+    Raises ValueError for wheel paths that escape the install location
+    """
+    parts = name.split("/")
+    if name.startswith("/") or ".." in parts or re.match(r"^[A-Za-z]:", name):
+        raise ValueError(f"Unsafe path {name}")
+
+
+def read_record(record_file: str) -> Dict[str, List[str]]:
+    """
+    Reads a `RECORD` file
+    Returns: Dict | Path and [hash, size] of every recorded file
+    """
+    with open(record_file, "r", encoding="utf-8") as file:
+        return {row[0]: row[1:3] for row in csv.reader(file) if row}
+
+
+def unlink_existing(path: str):
+    """
+    Removes an existing file before it is written, installed files may
+    be hardlinks into the package store or into the venv it was cloned
+    from, writing through the link would change those files too
+    """
+    if os.path.lexists(path):
+        os.remove(path)
+
+
+def write_script(data: bytes, destination: str, python: str):
+    """
+    Installs a script of the wheel `.data/scripts` directory, the
+    `#!python` placeholder shebang is replaced with the venv python
+    Args:
+        data: Content of the script
+        destination: Install location
+        python: Python executable of the venv
+
+    Returns: None
+    """
+    if data.startswith(b"#!python"):
+        data = f"#!{python}".encode() + data[len(b"#!python") :]
+    unlink_existing(destination)
+    with open(destination, "wb") as file:
+        file.write(data)
+    os.chmod(destination, 0o755)
+
+
+def write_entry_points(
+    dist_info_dir: str, scripts_dir: str, python: str
+) -> List[str]:
+    """
+    Generates console and gui scripts declared in `entry_points.txt`
+    Args:
+        dist_info_dir: Installed `.dist-info` directory
+        scripts_dir: Scripts directory of the venv
+        python: Python executable of the venv
+
+    Returns: List[str] | Absolute paths of the generated scripts
+    """
+    entry_points_file = os.path.join(dist_info_dir, "entry_points.txt")
+    if not os.path.isfile(entry_points_file):
+        return []
+    parser = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+    parser.optionxform = str
+    parser.read(entry_points_file, encoding="utf-8")
+    scripts = []
+    for section in ["console_scripts", "gui_scripts"]:
+        if not parser.has_section(section):
+            continue
+        for name, value in parser.items(section):
+            # `module:attr.sub [extra]`
+            reference = value.split("[")[0].strip()
+            module, _, attribute = reference.partition(":")
+            import_name = attribute.split(".")[0] or module.split(".")[-1]
+            if not attribute:
+                module, _, import_name = module.rpartition(".")
+                attribute = import_name
+            destination = os.path.join(scripts_dir, name)
+            os.makedirs(scripts_dir, exist_ok=True)
+            write_script(
+                ENTRY_POINT_SCRIPT.format(
+                    python=python,
+                    module=module.strip(),
+                    import_name=import_name,
+                    function=attribute,
+                ).encode("utf-8"),
+                destination,
+                python,
+            )
+            scripts.append(destination)
+    return scripts
+
+
+def write_record(dist_info_dir: str, site_packages: str, installed: Dict):
+    """
+    Writes `INSTALLER` and a `RECORD` of the installed files,
+    paths are relative to site-packages as pip expects them
+    Args:
+        dist_info_dir: Installed `.dist-info` directory
+        site_packages: site-packages directory
+        installed: Dict | Absolute path of installed files and their
+                   [hash, size] or None to compute it
+
+    Returns: None
+    """
+    installer_file = os.path.join(dist_info_dir, "INSTALLER")
+    unlink_existing(installer_file)
+    with open(installer_file, "w", encoding="utf-8") as file:
+        file.write(f"{INSTALLER}\n")
+    record_file = os.path.join(dist_info_dir, "RECORD")
+    rows = []
+    for path, recorded in list(installed.items()) + [(installer_file, None)]:
+        if not recorded or not recorded[0]:
+            with open(path, "rb") as file:
+                data = file.read()
+            recorded = [record_hash(data), str(len(data))]
+        relative = os.path.relpath(path, site_packages).replace(os.sep, "/")
+        rows.append([relative, *recorded])
+    relative = os.path.relpath(record_file, site_packages)
+    rows.append([relative.replace(os.sep, "/"), "", ""])
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerows(rows)
+    unlink_existing(record_file)
+    with open(record_file, "w", encoding="utf-8") as file:
+        file.write(output.getvalue())
+
+
+def finalize_install(
+    dist_info: str, scheme: Dict[str, str], installed: Dict, python: str
+):
+    """
+    Generates entry point scripts and writes `INSTALLER` and `RECORD`
+    once all files of a wheel are in place
+    Args:
+        dist_info: Name of the `.dist-info` directory
+        scheme: Scheme name and directory
+        installed: Dict | Absolute path of installed files and their
+                   [hash, size] or None to compute it
+        python: Python executable of the venv
+
+    Returns: List[str] | Absolute paths of the installed files
+    """
+    dist_info_dir = os.path.join(scheme["purelib"], dist_info)
+    for script in write_entry_points(dist_info_dir, scheme["scripts"], python):
+        installed[script] = None
+    write_record(dist_info_dir, scheme["purelib"], installed)
+    return list(installed)
@@ -0,0 +1,150 @@
+"""
+Local wheelhouse, a directory of downloaded artifacts
+
+Artifacts of a resolved library set are downloaded concurrently, so the
+download latency of the packages overlaps instead of adding up, pip
+installs from the wheelhouse afterwards without accessing the index
+"""
+import hashlib
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib import request
+from urllib.error import URLError
+from urllib.parse import unquote, urlparse
+
+from pepsin.error import InvalidCommandError
+from pepsin.utils import get_cache_dir
+
+DEFAULT_JOBS = 8
+CHUNK_SIZE = 1024 * 64
+ARCHIVE_EXTENSIONS = (".whl", ".tar.gz", ".tar.bz2", ".tgz", ".zip")
+
+
+def get_default_wheelhouse() -> str:
+    """
+    Returns: str | User level wheelhouse shared between projects
+    """
+    return get_cache_dir("wheelhouse")
+
+
+def get_artifact_name(url: str) -> str:
+    """
+    Returns: str | File name of the artifact in the url
+    """
+    return unquote(posixpath.basename(urlparse(url).path))
+
+
+def is_archive_url(url: str) -> bool:
+    """
+    Returns: bool | True if the url points to a wheel or source archive
+    that can be downloaded, VCS urls and directories can not be served
+    from a wheelhouse
+    """
+    scheme = urlparse(url).scheme
+    return scheme in ["http", "https", "file"] and get_artifact_name(
+        url
+    ).endswith(ARCHIVE_EXTENSIONS)
+
+
+def check_hashes(file_name: str, hashes: List[str]) -> bool:
+    """
+    Checks if a file matches any of the given `algorithm:digest` hashes,
+    a file without expected hashes always matches
+    """
+    if not hashes:
+        return True
+    expected = {}
+    for value in hashes:
+        algorithm, _, digest = value.partition(":")
+        expected.setdefault(algorithm, set()).add(digest)
+    for algorithm, digests in expected.items():
+        file_hash = hashlib.new(algorithm)
+        with open(file_name, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+        if file_hash.hexdigest() in digests:
+            return True
+    return False
+
+
+class Wheelhouse:
+    """
+    Downloads artifacts of locked packages into a directory
+    1. Skips artifacts that already exist with a matching hash
+    2. Downloads the remaining artifacts concurrently
+    3. Verifies downloaded artifacts against the locked hashes
+    """
+
+    def __init__(self, path: str = "", jobs: int = DEFAULT_JOBS):
+        self.path = os.path.abspath(path or get_default_wheelhouse())
+        self.jobs = max(1, int(jobs or DEFAULT_JOBS))
+
+    def get_artifact_path(self, package: Dict) -> str:
+        """
+        Returns: str | Path of the package artifact in the wheelhouse
+        """
+        return os.path.join(self.path, get_artifact_name(package["url"]))
+
+    def download(self, package: Dict) -> str:
+        """
+        Downloads one package artifact, a temporary file is renamed once
+        the download is complete and verified
+        Args:
+            package: Dict | Locked package
+
+        Returns: str | Path of the artifact
+        """
+        if not package.get("url"):
+            raise InvalidCommandError(f"{package['name']} has no artifact url")
+        artifact = self.get_artifact_path(package)
+        hashes = package.get("hashes") or []
+        if os.path.isfile(artifact) and check_hashes(artifact, hashes):
+            return artifact
+        temp_file = f"{artifact}.{os.getpid()}.part"
+        try:
+            with request.urlopen(package["url"]) as response, open(
+                temp_file, "wb"
+            ) as file:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    file.write(chunk)
+            if not check_hashes(temp_file, hashes):
+                raise InvalidCommandError(
+                    f"Hash mismatch for {get_artifact_name(package['url'])}"
+                )
+            os.replace(temp_file, artifact)
+        except URLError as error:
+            raise InvalidCommandError(
+                f"Unable to download {package['url']}"
+            ) from error
+        finally:
+            if os.path.isfile(temp_file):
+                os.remove(temp_file)
+        return artifact
+
+    def fetch(self, packages: List[Dict]) -> List[str]:
+        """
+        Downloads artifacts of all packages concurrently
+        Args:
+            packages: List[Dict] | Locked packages
+
+        Returns: List[str] | Paths of the artifacts
+        Raises: InvalidCommandError for VCS, directory and other packages
+                that have no downloadable archive
+        """
+        unavailable = [
+            f"{package['name']} ({package.get('url') or 'no url'})"
+            for package in packages
+            if not is_archive_url(package.get("url") or "")
+        ]
+        if unavailable:
+            raise InvalidCommandError(
+                "Unable to install from a wheelhouse, these packages are not"
+                f" wheel or source archives: {', '.join(unavailable)}"
+            )
+        os.makedirs(self.path, exist_ok=True)
+        if not packages:
+            return []
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(self.download, packages))
@@ -1,25 +1,189 @@
 """
 Handles Yaml Config and converts from yaml to dictionary or
 dictionary to yaml
+
+Parsed files are cached for the whole process and validated with the
+mtime, size and inode of the file, setting `PEPSIN_CONFIG_CACHE=1` also
+keeps the parsed data in the user cache directory between runs.
+Cached data is shared, so it is handed out as read only views
 """
-import copy
+import hashlib
+import marshal
 import os
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 
+from pepsin.utils import get_cache_dir
+
+try:
+    # libyaml bindings are several times faster than the pure python ones
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeDumper, SafeLoader
+
+_CACHE: Dict[str, Tuple[Tuple[int, int, int], Any]] = {}
+
+
+def freeze(value: Any) -> Any:
+    """
+    Converts dictionaries and lists into read only views and tuples,
+    read only views and tuples are already frozen and returned as is
+    Args:
+        value: Parsed yaml data
+
+    Returns: Any | Immutable data
+    """
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {key: freeze(val) for key, val in value.items()}
+        )
+    if isinstance(value, list):
+        return tuple(freeze(val) for val in value)
+    return value
+
 
-def dict_to_yaml(_dict: dict, filename: str):
+def thaw(value: Any) -> Any:
     """
-    Converts dictionary to yaml
+    Converts frozen data back into dictionaries and lists
+    Args:
+        value: Frozen data
+
+    Returns: Any | Mutable copy of the data
+    """
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(val) for val in value]
+    return value
+
+
+def get_file_key(filename: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns: Tuple | mtime, size and inode of the file, None if it
+    does not exist
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def get_disk_cache_file(filename: str) -> Optional[str]:
+    """
+    Returns: str | On disk cache file of a yaml file, None if the on
+    disk cache is disabled
+    """
+    if os.environ.get("PEPSIN_CONFIG_CACHE", "") in ["", "0"]:
+        return None
+    digest = hashlib.sha256(filename.encode("utf-8")).hexdigest()
+    return get_cache_dir("config", f"{digest[:32]}.marshal")
+
+
+def read_disk_cache(filename: str, key: Tuple[int, int, int]) -> Any:
+    """
+    Returns: Any | Cached data of the yaml file, None if it is missing
+    or outdated
+    """
+    cache_file = get_disk_cache_file(filename)
+    if not cache_file:
+        return None
+    try:
+        with open(cache_file, "rb") as file:
+            cached_key, data = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if tuple(cached_key) == key else None
+
+
+def write_disk_cache(filename: str, key: Tuple[int, int, int], data: Any):
+    """
+    Stores parsed data of the yaml file in the on disk cache
+    """
+    cache_file = get_disk_cache_file(filename)
+    if not cache_file:
+        return
+    try:
+        content = marshal.dumps((key, data))
+    except ValueError:
+        # Timestamps and other yaml types can not be marshalled
+        return
+    temp_file = f"{cache_file}.{os.getpid()}"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, "wb") as file:
+            file.write(content)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        pass
+
+
+def load_yaml(filename: str) -> Any:
+    """
+    Reads a yaml file through the cache
+    Args:
+        filename: Name of yaml file
+
+    Returns: Any | Frozen data of the yaml file
+    """
+    path = os.path.abspath(filename)
+    key = get_file_key(path)
+    cached = _CACHE.get(path)
+    if cached and key and cached[0] == key:
+        return cached[1]
+    data = read_disk_cache(path, key) if key else None
+    if data is None:
+        with open(path, "r", encoding="utf-8") as file:
+            data = yaml.load(file, Loader=SafeLoader)
+        if key:
+            write_disk_cache(path, key, data)
+    data = freeze(data)
+    if key:
+        _CACHE[path] = (key, data)
+    return data
+
+
+def clear_cache():
+    """
+    Clears parsed yaml files cached by the process
+    """
+    _CACHE.clear()
+
+
+def dict_to_yaml(_dict: dict, filename: str) -> bool:
+    """
+    Converts dictionary to yaml, the file is replaced atomically and
+    left untouched if its content would not change
     Args:
         _dict: Python dictionary or hash map
         filename: Name of yaml file
-    Returns:
+    Returns: bool | True if the file has been written
 
     """
-    with open(filename, "w", encoding="utf-8") as file:
-        yaml.dump(_dict, file, sort_keys=False)
+    content = yaml.dump(thaw(_dict), Dumper=SafeDumper, sort_keys=False)
+    path = os.path.abspath(filename)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            written = file.read() != content
+    except OSError:
+        written = True
+    if written:
+        temp_file = f"{path}.{os.urandom(4).hex()}.tmp"
+        try:
+            with open(temp_file, "w", encoding="utf-8") as file:
+                file.write(content)
+            os.replace(temp_file, path)
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    # The written data is known, it does not need to be parsed again
+    key = get_file_key(path)
+    if key:
+        _CACHE[path] = (key, freeze(_dict))
+    return written
 
 
 def yaml_to_dict(filename: str) -> dict:
@@ -29,8 +193,7 @@ def yaml_to_dict(filename: str) -> dict:
         filename: Name of yaml file
 
     """
-    with open(filename, "r", encoding="utf-8") as file:
-        return yaml.load(file, yaml.Loader)
+    return thaw(load_yaml(filename))
 
 
 class YAMLConfig:
@@ -41,6 +204,8 @@ class YAMLConfig:
     3. Reads and stores yaml as dictionary
     4. Appends data to the yaml
     5. Removes data from the yaml
+
+    Values are stored frozen, `get` and `get_config` return read only views
     """
 
     def __init__(self, filename: str = "temp.yaml", **kwargs):
@@ -57,24 +222,25 @@ class YAMLConfig:
         Returns: None
         """
         if os.path.isfile(self.__filename):
-            yaml_data = yaml_to_dict(self.__filename)
-            self.append(**yaml_data)
+            yaml_data = load_yaml(self.__filename)
+            self.append(**(yaml_data or {}))
 
     def read_from_yaml(self) -> dict:
         """
         Reads directly from the yaml
-        Returns: Yaml Config dictionary
+        Returns: Yaml Config read only view
         """
         if os.path.isfile(self.__filename):
-            return yaml_to_dict(self.__filename)
-        return self.__config
+            return load_yaml(self.__filename)
+        return self.get_config()
 
     def append(self, *args, **kwargs):
         """
         Inserts data in the config dictionary
         Returns: None
         """
-        self.__config.update(*args, **kwargs)
+        data = dict(*args, **kwargs)
+        self.__config.update({key: freeze(val) for key, val in data.items()})
         for key, val in self.__config.items():
             setattr(self, key, val)
 
@@ -91,11 +257,11 @@ class YAMLConfig:
         """
         return self.__config.setdefault(key, None)
 
-    def get_config(self) -> dict:
+    def get_config(self) -> MappingProxyType:
         """
-        Returns: Dict | returns the copy of the config
+        Returns: MappingProxyType | read only view of the config
         """
-        return copy.deepcopy(self.__config)
+        return MappingProxyType(self.__config)
 
     def get_filename(self) -> str:
         """
@@ -1,10 +1,16 @@
+import subprocess
+import sys
+from pathlib import Path
 from typing import Union
 
 import pytest
 
-from pepsin.base import BaseCommand
+from pepsin.base import BaseCommand, build_manifest
+from pepsin.commands import COMMANDS
 from pepsin.error import InvalidCommandError
 
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
 
 class CommandTest(BaseCommand):
     def execute(self, *args, **kwargs) -> Union[None, str]:
@@ -31,3 +37,24 @@ def test_error(test_base, monkeypatch):
         test_base.run(argv=["pepsin", "command"])
     except InvalidCommandError as e:
         assert e.return_code == 1
+
+
+def test_command_manifest():
+    assert build_manifest() == COMMANDS
+
+
+def test_get_command_imports_one_module():
+    code = (
+        "import sys; from pepsin.base import get_command; get_command('i');"
+        "print(sorted(m for m in sys.modules if m.startswith('pepsin.commands')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+    ).stdout
+    assert output.strip() == str(
+        ["pepsin.commands", "pepsin.commands.install"]
+    )
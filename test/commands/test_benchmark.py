@@ -0,0 +1,15 @@
+from test.utils import command_path, set_subprocess
+
+from pepsin.commands.benchmark import Benchmark
+from pepsin.config import PepsinConfig
+
+
+def test_benchmark_command(capsys):
+    conf = PepsinConfig()
+    conf.update(libraries=["django", "flask"], venv="project_venv")
+    Benchmark().run(
+        ["pepsin", "benchmark", "--installers", "simulated", "--repeat", "2"]
+    )
+    output = capsys.readouterr().out
+    assert "simulated" in output
+    assert PepsinConfig().venv == "project_venv"
@@ -1,11 +1,14 @@
+import io
 import os
 import subprocess
+import sys
 from pathlib import Path
 
 import pytest
 
 from pepsin.const import COMMAND_NOT_FOUND_ERROR
 from pepsin.main import CLI, main
+from pepsin.output import OutputWrapper
 from pepsin.utils import OSEnum, get_os
 from pepsin.utils.spinner import Spinner
 from pepsin.version import get_version
@@ -81,3 +84,44 @@ def test_sys_platform():
     # Test windows system
     platform_os = get_os("win32")
     assert platform_os == OSEnum.WIN
+
+
+# Import time budget of `python -m pepsin --version` in microseconds
+IMPORT_TIME_BUDGET = 50000
+FORBIDDEN_MODULES = [
+    "colorama",
+    "pepsin.base",
+    "pepsin.config",
+    "pepsin.pyhandler",
+    "subprocess",
+    "urllib.request",
+    "yaml",
+]
+
+
+def test_version_startup():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "pepsin", "--version"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parents[2],
+        check=True,
+    )
+    assert result.stdout.strip() == get_version()
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(self_time)
+    assert "pepsin.main" in modules
+    assert [name for name in FORBIDDEN_MODULES if name in modules] == []
+    assert sum(modules.values()) < IMPORT_TIME_BUDGET
+
+
+def test_colors_stripped_from_pipes():
+    out = io.StringIO()
+    wrapper = OutputWrapper(out)
+    wrapper.write("green", msg_type="success")
+    wrapper.write("plain")
+    assert out.getvalue() == "green\nplain\n"
@@ -1,3 +1,4 @@
+import os
 import subprocess
 import time
 from test.utils import command_path, set_subprocess
@@ -35,3 +36,18 @@ def test_install_without_req(install_command):
     conf.update(libraries=["django", "flask"])
     install_command.run(["pepsin", "install"])
     assert conf.libraries == ["django", "flask"]
+
+
+def test_install_up_to_date(install_command, monkeypatch, capsys):
+    conf = PepsinConfig()
+    conf.update(libraries=["django"])
+    os.mkdir("venv")
+    install_command.run(["pepsin", "install"])
+    assert check_file_exists("venv/.pepsin-fingerprint")
+
+    def check_call(*args, **kwargs):
+        raise AssertionError("pip must not run")
+
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    Install().run(["pepsin", "install"])
+    assert "up to date" in capsys.readouterr().out
@@ -0,0 +1,54 @@
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.commands.install import Install
+from pepsin.commands.lock import Lock
+from pepsin.config import PepsinConfig
+from pepsin.lock import LockFile
+from pepsin.pyhandler import PyHandler
+
+PACKAGES = [
+    {
+        "name": "flask",
+        "version": "2.2.2",
+        "url": "https://files/flask-2.2.2-py3-none-any.whl",
+        "hashes": ["sha256:abc"],
+    }
+]
+
+
+@pytest.fixture
+def lock_command():
+    return Lock()
+
+
+def test_lock_command(lock_command, monkeypatch):
+    monkeypatch.setattr(
+        PyHandler,
+        "resolve_libraries",
+        lambda self, libs: (PACKAGES, {"python_version": "3.10"}),
+    )
+    conf = PepsinConfig()
+    conf.update(libraries=["flask"])
+    lock_command.run(["pepsin", "lock"])
+    lock = LockFile()
+    assert lock.is_fresh(["flask"])
+    assert lock.packages == PACKAGES
+
+
+def test_install_from_lock(monkeypatch):
+    conf = PepsinConfig()
+    conf.update(libraries=["flask"])
+    LockFile().update(["flask"], PACKAGES)
+    installed = []
+    monkeypatch.setattr(
+        PyHandler, "install_locked", lambda self, lock: installed.append(lock)
+    )
+    monkeypatch.setattr(
+        PyHandler,
+        "install_libraries",
+        lambda *args, **kwargs: pytest.fail("Must install from lock"),
+    )
+    Install().run(["pepsin", "install"])
+    assert len(installed) == 1
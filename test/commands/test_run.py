@@ -0,0 +1,125 @@
+import os
+import subprocess
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.commands.run import Run, get_script_args
+from pepsin.config import PepsinConfig
+from pepsin.parallel import ScriptResult
+
+
+def test_get_script_args():
+    assert get_script_args("pytest -x") == ["-m", "pytest", "-x"]
+    assert get_script_args("manage.py runserver") == [
+        "manage.py",
+        "runserver",
+    ]
+
+
+def test_run(monkeypatch):
+    PepsinConfig().update(scripts={"test": "pytest -x"})
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    Run().run(["pepsin", "run", "test"])
+    assert calls[-1][1:] == ["-m", "pytest", "-x"]
+
+
+def test_run_exec(monkeypatch):
+    PepsinConfig().update(scripts={"start": "manage.py runserver"})
+    calls = []
+
+    def execve(path, args, env):
+        calls.append((path, args, env))
+
+    monkeypatch.setattr("os.execve", execve)
+    monkeypatch.setattr("pepsin.pyhandler.get_os", lambda: None)
+    Run().run(["pepsin", "run", "--exec", "start"])
+    path, args, env = calls[0]
+    assert path == args[0] and path.endswith("python")
+    assert args[1:] == ["manage.py", "runserver"]
+    assert env["VIRTUAL_ENV"]
+
+
+def test_run_missing_script(capsys):
+    PepsinConfig().update(scripts={})
+    Run().run(["pepsin", "run", "start"])
+    assert "No script named start" in capsys.readouterr().err
+
+
+def test_run_fork(monkeypatch):
+    PepsinConfig().update(scripts={"test": "pytest"}, preload=["django"])
+    forked = []
+    calls = []
+    monkeypatch.setattr(
+        "pepsin.fork_client.ForkClient.run",
+        lambda self, args: forked.append((self.modules, args)) or 0,
+    )
+    os.mkdir("venv")
+    Run().run(["pepsin", "run", "test"])
+    assert forked == [(["django"], ["-m", "pytest"])]
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    Run().run(["pepsin", "run", "--no-fork", "test"])
+    assert len(forked) == 1 and calls[-1][1:] == ["-m", "pytest"]
+
+
+def test_run_parallel(monkeypatch, capsys):
+    PepsinConfig().update(scripts={"lint": "flake8", "test": "pytest"})
+    runs = []
+
+    def run(self):
+        runs.append((self.commands, self.jobs, self.fail_fast))
+        return [ScriptResult(name, 0, 0.5) for name in self.commands]
+
+    monkeypatch.setattr("pepsin.parallel.ParallelRunner.run", run)
+    Run().run(["pepsin", "run", "-p", "lint", "test", "-j", "3"])
+    commands, jobs, fail_fast = runs[0]
+    assert [args[1:] for args in commands.values()] == [
+        ["-m", "flake8"],
+        ["-m", "pytest"],
+    ]
+    assert jobs == 3 and not fail_fast
+    assert "test  ok (exit 0, 0.50s)" in capsys.readouterr().out
+
+
+def test_run_parallel_failure(monkeypatch, capsys):
+    PepsinConfig().update(scripts={"lint": "flake8", "test": "pytest"})
+    monkeypatch.setattr(
+        "pepsin.parallel.ParallelRunner.run",
+        lambda self: [ScriptResult("lint", 0), ScriptResult("test", 1)],
+    )
+    with pytest.raises(SystemExit):
+        Run().run(["pepsin", "run", "-p", "lint", "test", "--fail-fast"])
+    assert "1 of 2 scripts did not succeed" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        Run().run(["pepsin", "run", "-p", "lint", "typecheck"])
+    assert "No script named typecheck" in capsys.readouterr().err
+
+
+def test_run_graph(monkeypatch, capsys):
+    PepsinConfig().update(
+        scripts={
+            "lint": "flake8",
+            "test": "pytest",
+            "ci": {"depends_on": ["lint", "test"]},
+        }
+    )
+    runs = []
+
+    def run(self):
+        runs.append((list(self.commands), self.dependencies))
+        return [ScriptResult(name, 0) for name in self.commands]
+
+    monkeypatch.setattr("pepsin.parallel.ParallelRunner.run", run)
+    Run().run(["pepsin", "run", "ci"])
+    assert runs == [
+        (
+            ["lint", "test", "ci"],
+            {"lint": [], "test": [], "ci": ["lint", "test"]},
+        )
+    ]
+    assert "ci    ok" in capsys.readouterr().out
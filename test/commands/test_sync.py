@@ -0,0 +1,45 @@
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.commands.sync import Sync
+from pepsin.config import PepsinConfig
+from pepsin.pyhandler import PyHandler
+
+
+@pytest.fixture
+def sync_command():
+    return Sync()
+
+
+def test_sync_command(sync_command, monkeypatch):
+    conf = PepsinConfig()
+    conf.update(libraries=["flask", "django==4.0.1"])
+    monkeypatch.setattr(
+        PyHandler,
+        "installed_packages",
+        lambda self: {"django": "4.0.0", "pip": "22.3"},
+    )
+    calls = []
+    monkeypatch.setattr(
+        PyHandler,
+        "install_requirements",
+        lambda self, requirements, **kwargs: calls.append(requirements),
+    )
+    sync_command.run(["pepsin", "sync"])
+    assert calls == [["flask", "django==4.0.1"]]
+
+
+def test_sync_command_in_sync(monkeypatch, capsys):
+    conf = PepsinConfig()
+    conf.update(libraries=["flask"])
+    monkeypatch.setattr(
+        PyHandler, "installed_packages", lambda self: {"flask": "2.2.2"}
+    )
+    monkeypatch.setattr(
+        PyHandler,
+        "install_requirements",
+        lambda *args, **kwargs: pytest.fail("Nothing to install"),
+    )
+    Sync().run(["pepsin", "sync"])
+    assert "in sync" in capsys.readouterr().out
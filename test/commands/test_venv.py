@@ -0,0 +1,44 @@
+import os
+from test.test_venv_pool import make_venv
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.commands.venv import Venv
+from pepsin.config import PepsinConfig
+from pepsin.venv_pool import VenvPool
+
+
+def test_venv_pool_command(tmp_path, monkeypatch):
+    monkeypatch.setattr("subprocess.check_call", make_venv)
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", str(tmp_path))
+    Venv().run(["pepsin", "venv", "pool", "--size", "2"])
+    pool = VenvPool("python3")
+    assert pool.size == 2 and len(pool.entries()) == 2
+    Venv().run(["pepsin", "venv", "pool", "--size", "0"])
+    assert not pool.is_enabled() and pool.entries() == []
+
+
+def test_venv_snapshot_and_restore(tmp_path, monkeypatch):
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", str(tmp_path))
+    conf = PepsinConfig()
+    conf.update(venv="project_venv", libraries=["flask"])
+    make_venv([os.path.abspath("project_venv")])
+    Venv().run(["pepsin", "venv", "snapshot"])
+    with pytest.raises(SystemExit):
+        Venv().run(["pepsin", "venv", "restore"])
+    Venv().run(["pepsin", "venv", "restore", "--force"])
+    assert os.path.isfile(os.path.join("project_venv", "bin", "pip"))
+    conf.update(libraries=["django"])
+    with pytest.raises(SystemExit):
+        Venv().run(["pepsin", "venv", "restore", "--force"])
+
+
+def test_venv_clone(tmp_path):
+    make_venv([str(tmp_path / "src")])
+    Venv().run(["pepsin", "venv", "clone", str(tmp_path / "src"), "test_venv"])
+    assert os.path.isfile(os.path.join("test_venv", "pyvenv.cfg"))
+    with pytest.raises(SystemExit):
+        Venv().run(["pepsin", "venv", "clone", "missing", "other_venv"])
+    with pytest.raises(SystemExit):
+        Venv().run(["pepsin", "venv", "clone", "test_venv"])
@@ -0,0 +1,122 @@
+import subprocess
+import sys
+import types
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin import pip_worker
+from pepsin.backends import (
+    BACKENDS,
+    PipBackend,
+    PipWorkerBackend,
+    SimulatedBackend,
+    WheelBackend,
+    get_backend,
+)
+from pepsin.config import PepsinConfig
+from pepsin.error import InvalidCommandError
+from pepsin.pyhandler import PyHandler
+
+
+def test_get_backend():
+    assert get_backend() is PipBackend
+    assert get_backend("wheel") is WheelBackend
+    assert sorted(BACKENDS) == ["pip", "pip-worker", "simulated", "wheel"]
+    with pytest.raises(InvalidCommandError):
+        get_backend("unknown")
+
+
+def test_backend_from_config():
+    conf = PepsinConfig()
+    conf.update(installer="simulated")
+    py_handler = PyHandler(PepsinConfig())
+    assert isinstance(py_handler.backend, SimulatedBackend)
+
+
+def test_simulated_backend():
+    py_handler = PyHandler(installer="simulated")
+    passed, failed = py_handler.install_libraries(["django", "flask"])
+    py_handler.upgrade_libraries(["flask"])
+    py_handler.uninstall_libraries(["flask"])
+    assert passed == ["django", "flask"] and failed == []
+    assert py_handler.backend.operations == [
+        ("install", ["django", "flask"]),
+        ("upgrade", ["flask"]),
+        ("uninstall", ["flask"]),
+    ]
+
+
+def test_pip_backend(monkeypatch):
+    py_handler = PyHandler()
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    py_handler.backend.install(["django", "flask"], upgrade=True)
+    py_handler.backend.uninstall(["flask"])
+    assert calls[0][1:] == ["install", "--upgrade", "django", "flask"]
+    assert calls[1][1:] == ["uninstall", "flask", "-y"]
+
+
+def test_wheel_backend(monkeypatch):
+    py_handler = PyHandler(installer="wheel")
+    packages = [{"name": "flask", "version": "2.2.2", "url": "", "hashes": []}]
+    installed = []
+    resolved = []
+    monkeypatch.setattr(
+        PyHandler,
+        "resolve_libraries",
+        lambda self, libs, **kwargs: resolved.append(kwargs) or (packages, {}),
+    )
+    monkeypatch.setattr(
+        PyHandler,
+        "install_from_wheelhouse",
+        lambda self, resolved, wheelhouse, native: installed.append(
+            (resolved, native)
+        ),
+    )
+    py_handler.install_libraries(["flask"])
+    py_handler.upgrade_libraries(["flask"])
+    assert installed == [(packages, True)] * 2
+    # Install keeps installed versions that satisfy the libraries
+    assert resolved == [
+        {"keep_installed": True, "upgrade": False},
+        {"keep_installed": True, "upgrade": True},
+    ]
+
+
+def test_pip_worker_backend():
+    py_handler = PyHandler(installer="pip-worker")
+    py_handler.executable = sys.executable
+    backend = py_handler.backend
+    assert isinstance(backend, PipWorkerBackend)
+    backend.execute("--version")
+    process = backend.process
+    # The same worker serves every request
+    assert "pip" in backend.inspect()
+    backend.execute("show", "pip")
+    assert backend.process is process
+    with pytest.raises(subprocess.CalledProcessError):
+        backend.execute("show", "pepsin-package-that-does-not-exist")
+    backend.close()
+    assert process.poll() == 0 and backend.process is None
+
+
+def test_pip_worker_resets_working_set(monkeypatch):
+    class WorkingSet:
+        @staticmethod
+        def _build_master():
+            return ["rebuilt"]
+
+    pkg_resources = types.SimpleNamespace(
+        WorkingSet=WorkingSet, working_set=["stale"]
+    )
+    monkeypatch.setitem(
+        sys.modules, "pip._vendor.pkg_resources", pkg_resources
+    )
+    monkeypatch.setattr(
+        "pip._internal.cli.main.main", lambda args: 0, raising=False
+    )
+    assert pip_worker.run_pip(["install", "demo"]) == 0
+    assert pkg_resources.working_set == ["rebuilt"]
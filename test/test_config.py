@@ -7,6 +7,7 @@ import pytest
 from pepsin.config import PepsinConfig
 from pepsin.pyhandler import PyHandler
 from pepsin.utils import OSEnum
+from pepsin.yml import YAMLConfig, dict_to_yaml, yaml_to_dict
 
 
 @pytest.fixture
@@ -47,3 +48,48 @@ def test_init_config():
     conf = PepsinConfig()
     conf.initialize_config()
     assert conf.config_exists()
+
+
+def test_optional_settings():
+    conf = PepsinConfig()
+    assert "wheelhouse" not in conf.format_config()
+    conf.update(wheelhouse=".wheelhouse", jobs=4)
+    conf = PepsinConfig()
+    assert conf.format_config().get("wheelhouse") == ".wheelhouse"
+    assert conf.jobs == 4
+
+
+def test_config_transaction(monkeypatch):
+    writes = []
+    save = YAMLConfig.save
+    monkeypatch.setattr(
+        YAMLConfig, "save", lambda self: writes.append(1) or save(self)
+    )
+    conf = PepsinConfig()
+    with conf.transaction():
+        conf.update(name="Project")
+        with conf.transaction():
+            conf.update(libraries=["flask"])
+        conf.remove_libraries(["flask"])
+        conf.update(libraries=["django"])
+        assert writes == [] and not os.path.exists("pepsin.yaml")
+    assert writes == [1]
+    assert yaml_to_dict("pepsin.yaml")["libraries"] == ["django"]
+    with pytest.raises(ValueError):
+        with conf.transaction():
+            conf.update(venv="project_venv")
+            raise ValueError
+    assert PepsinConfig().venv == "project_venv"
+
+
+def test_config_write_is_skipped_when_unchanged():
+    conf = PepsinConfig()
+    conf.update(name="Project", libraries=["flask"])
+    inode = os.stat("pepsin.yaml").st_ino
+    assert not dict_to_yaml(yaml_to_dict("pepsin.yaml"), "pepsin.yaml")
+    conf.update(libraries=["flask"])
+    assert os.stat("pepsin.yaml").st_ino == inode
+    # Changes replace the file atomically
+    conf.update(libraries=["django"])
+    assert os.stat("pepsin.yaml").st_ino != inode
+    assert [file for file in os.listdir() if file.endswith(".tmp")] == []
@@ -0,0 +1,36 @@
+import os
+from test.utils import command_path
+
+from pepsin.fingerprint import (
+    check_fingerprint,
+    compute_fingerprint,
+    read_fingerprint,
+    write_fingerprint,
+)
+
+
+def make_venv(venv="venv"):
+    site_packages = os.path.join(venv, "lib", "python3.10", "site-packages")
+    os.makedirs(site_packages)
+    with open(os.path.join(venv, "pyvenv.cfg"), "w") as file:
+        file.write("home = /usr/bin\nversion = 3.10.4\n")
+    return site_packages
+
+
+def test_fingerprint_match():
+    make_venv()
+    assert read_fingerprint("venv") is None
+    assert not check_fingerprint("venv", ["django"])
+    write_fingerprint("venv", ["django", "flask"])
+    assert check_fingerprint("venv", ["flask", "django"])
+    assert not check_fingerprint("venv", ["django"])
+
+
+def test_fingerprint_venv_change():
+    site_packages = make_venv()
+    write_fingerprint("venv", ["django"])
+    before = compute_fingerprint("venv", ["django"])
+    os.mkdir(os.path.join(site_packages, "django-4.0.dist-info"))
+    os.utime(site_packages, ns=(0, 0))
+    assert before != compute_fingerprint("venv", ["django"])
+    assert not check_fingerprint("venv", ["django"])
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+from pepsin.fork_client import ForkClient, get_socket_path, is_supported
+
+pytestmark = pytest.mark.skipif(
+    not is_supported(), reason="The platform can not fork"
+)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "warm.py").write_text("LOADED = []\n")
+    (tmp_path / "script.py").write_text(
+        "import os, sys, warm\n"
+        "warm.LOADED.append(os.getpid())\n"
+        "print('script', sys.argv[1:], len(warm.LOADED))\n"
+        "sys.exit(int(sys.argv[1]))\n"
+    )
+    clients = []
+
+    def get_client():
+        client = ForkClient(
+            sys.executable, str(tmp_path), ["warm"], project_dir=str(tmp_path)
+        )
+        clients.append(client)
+        return client
+
+    yield get_client
+    for client in clients:
+        client.stop()
+
+
+def get_server_pid(client):
+    channel = client.connect()
+    with channel.sock:
+        channel.send({"action": "ping"})
+        return channel.receive()[0]["pid"]
+
+
+def test_socket_path(tmp_path):
+    path = get_socket_path(str(tmp_path))
+    assert path == get_socket_path(str(tmp_path))
+    assert oct(os.stat(os.path.dirname(path)).st_mode & 0o777) == "0o700"
+
+
+def test_fork_server_run(project, capfd):
+    client = project()
+    assert client.run(["script.py", "0"]) == 0
+    assert client.run(["script.py", "3"]) == 3
+    out = capfd.readouterr().out
+    # Every child starts from the preloaded state of the server
+    assert "script ['0'] 1" in out and "script ['3'] 1" in out
+
+
+def test_fork_server_invalidation(project, tmp_path):
+    client = project()
+    assert client.run(["script.py", "0"]) == 0
+    pid = get_server_pid(client)
+    assert client.run(["script.py", "0"]) == 0
+    assert get_server_pid(client) == pid
+    # Modified preloaded sources replace the server
+    os.utime(tmp_path / "warm.py", (1, 1))
+    assert client.run(["script.py", "0"]) == 0
+    new_pid = get_server_pid(client)
+    assert new_pid != pid
+    # A different key, IE: a changed venv, replaces the server
+    client.key = "changed"
+    assert client.run(["script.py", "0"]) == 0
+    assert get_server_pid(client) != new_pid
@@ -0,0 +1,76 @@
+import os
+import zipfile
+from test.utils import command_path
+
+from pepsin.installer import WheelInstaller
+from pepsin.site_packages import get_distributions
+from pepsin.wheel import read_record
+
+
+def make_wheel(name, version="1.0"):
+    path = f"{name}-{version}-py3-none-any.whl"
+    dist_info = f"{name}-{version}.dist-info"
+    with zipfile.ZipFile(path, "w") as wheel:
+        wheel.writestr(f"{name}/__init__.py", "def main():\n    return 0\n")
+        wheel.writestr(
+            f"{dist_info}/METADATA",
+            f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n",
+        )
+        wheel.writestr(
+            f"{dist_info}/entry_points.txt",
+            f"[console_scripts]\n{name}-cli = {name}:main\n",
+        )
+        wheel.writestr(f"{dist_info}/RECORD", "")
+    return path
+
+
+def make_venv(venv="venv"):
+    site_packages = os.path.join(venv, "lib", "python3.10", "site-packages")
+    os.makedirs(site_packages)
+    return site_packages
+
+
+def test_install_wheels():
+    site_packages = make_venv()
+    wheels = [make_wheel(f"pkg{index}") for index in range(5)]
+    installer = WheelInstaller("venv", jobs=3)
+    installer.install(wheels)
+    distributions = get_distributions("venv")
+    assert sorted(distributions) == [f"pkg{index}" for index in range(5)]
+    script = os.path.join("venv", "bin", "pkg0-cli")
+    with open(script) as file:
+        content = file.read()
+    assert content.startswith(f"#!{os.path.abspath('venv')}/bin/python")
+    assert "from pkg0 import main" in content
+    assert os.access(script, os.X_OK)
+    record = read_record(
+        os.path.join(site_packages, "pkg0-1.0.dist-info", "RECORD")
+    )
+    assert record["pkg0/__init__.py"][0].startswith("sha256=")
+    assert "../../../bin/pkg0-cli" in record
+
+
+def test_uninstall_wheel():
+    site_packages = make_venv()
+    installer = WheelInstaller("venv")
+    installer.install([make_wheel("demo")])
+    assert installer.uninstall(["demo", "missing"]) == ["demo"]
+    assert not os.path.exists(os.path.join(site_packages, "demo"))
+    assert not os.path.exists(os.path.join("venv", "bin", "demo-cli"))
+    assert "demo" not in get_distributions("venv")
+
+
+def test_unpack_does_not_write_through_links():
+    site_packages = make_venv()
+    installer = WheelInstaller("venv")
+    installer.install([make_wheel("demo")])
+    # Files of a venv cloned with hardlinks share their inode
+    linked = {}
+    for name in ["demo/__init__.py", "demo-1.0.dist-info/RECORD"]:
+        path = os.path.join(site_packages, name)
+        os.link(path, f"{path}.source")
+        linked[path] = os.stat(path).st_size
+    installer.install([make_wheel("demo", "1.0")])
+    for path, size in linked.items():
+        assert os.stat(f"{path}.source").st_size == size
+        assert not os.path.samefile(path, f"{path}.source")
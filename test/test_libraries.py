@@ -0,0 +1,51 @@
+from test.utils import command_path
+
+from pepsin.config import PepsinConfig
+from pepsin.libraries import LibrarySet
+
+
+def test_library_set():
+    libs = LibrarySet(["django-filter==2.0", "Flask", "django==3.2"])
+    libs.add("django>=4.0")
+    libs.add("flask[async]==2.2")
+    assert libs == ["django-filter==2.0", "flask[async]==2.2", "django>=4.0"]
+    assert "Django" in libs and "django_filter" in libs and "six" not in libs
+    assert libs.get("DJANGO") == "django>=4.0"
+    assert libs.remove("flask") == "flask[async]==2.2"
+    assert libs.remove("flask") is None
+    assert len(libs) == 2 and list(libs) == libs.to_list()
+
+
+def test_config_libraries_round_trip():
+    libs = [f"library-{index}>={index}.0" for index in range(2000)]
+    conf = PepsinConfig()
+    conf.update(libraries=libs + ["django-filter"])
+    conf.update(libraries=["django", "Library_5==1.0"])
+    libs[5] = "Library_5==1.0"
+    assert PepsinConfig().libraries == libs + ["django-filter", "django"]
+    conf.remove_libraries(["django", "library-5"])
+    assert "django-filter" in PepsinConfig().libraries
+    assert len(PepsinConfig().libraries) == 2000
+
+
+def test_library_set_direct_references():
+    libs = [
+        "git+https://github.com/a/foo.git",
+        "git+https://github.com/b/bar.git",
+        "https://files/a-1.0-py3-none-any.whl",
+        "https://files/b-1.0-py3-none-any.whl",
+        "./packages/local",
+        "dist/c-1.0.tar.gz",
+        "git+https://github.com/d/baz.git#egg=baz",
+        "demo @ https://files/demo-1.0.tar.gz",
+    ]
+    library_set = LibrarySet(libs)
+    assert library_set == libs
+    library_set.add("baz==2.0")
+    library_set.add("demo @ https://files/demo-2.0.tar.gz")
+    assert library_set.to_list()[-2:] == [
+        "baz==2.0",
+        "demo @ https://files/demo-2.0.tar.gz",
+    ]
+    assert library_set.remove("git+https://github.com/a/foo.git") == libs[0]
+    assert len(library_set) == 7
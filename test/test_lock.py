@@ -0,0 +1,152 @@
+import json
+import subprocess
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.error import InvalidCommandError
+from pepsin.lock import LockFile, hash_libraries, parse_pip_report
+from pepsin.pyhandler import PyHandler
+
+REPORT = {
+    "environment": {"python_version": "3.10", "sys_platform": "linux"},
+    "install": [
+        {
+            "metadata": {"name": "Flask", "version": "2.2.2"},
+            "download_info": {
+                "url": "https://files/flask-2.2.2-py3-none-any.whl",
+                "archive_info": {"hashes": {"sha256": "abc"}},
+            },
+        },
+        {
+            "metadata": {"name": "click", "version": "8.1.3"},
+            "download_info": {
+                "url": "https://files/click-8.1.3-py3-none-any.whl",
+                "archive_info": {"hash": "sha256=def"},
+            },
+        },
+    ],
+}
+
+
+def test_hash_libraries():
+    assert hash_libraries(["flask", "django"]) == hash_libraries(
+        ["django", "flask", ""]
+    )
+    assert hash_libraries(["flask"]) != hash_libraries(["flask==2.2.2"])
+
+
+def test_parse_pip_report():
+    packages = parse_pip_report(REPORT)
+    assert [package["name"] for package in packages] == ["click", "Flask"]
+    assert packages[0]["hashes"] == ["sha256:def"]
+    assert packages[1]["hashes"] == ["sha256:abc"]
+
+
+def test_direct_reference_requirement():
+    report = {
+        "install": [
+            {
+                "metadata": {"name": "demo", "version": "1.0"},
+                "is_direct": True,
+                "download_info": {
+                    "url": "https://example.com/demo-1.0-py3-none-any.whl",
+                    "archive_info": {"hashes": {"sha256": "abc"}},
+                },
+            },
+            *REPORT["install"],
+        ]
+    }
+    packages = parse_pip_report(report)
+    assert packages[1]["direct"] and "direct" not in packages[0]
+    assert [LockFile.requirement(package) for package in packages] == [
+        "click==8.1.3 --hash=sha256:def",
+        "demo @ https://example.com/demo-1.0-py3-none-any.whl"
+        " --hash=sha256:abc",
+        "Flask==2.2.2 --hash=sha256:abc",
+    ]
+
+
+def test_lock_file():
+    lock = LockFile()
+    assert not lock.exists()
+    assert not lock.is_fresh(["flask"])
+    lock.update(["flask"], parse_pip_report(REPORT), {"python_version": "3"})
+    lock = LockFile()
+    assert lock.is_fresh(["flask"])
+    assert not lock.is_fresh(["flask", "django"])
+    assert lock.requires_hashes()
+    assert lock.to_requirements() == [
+        "click==8.1.3 --hash=sha256:def",
+        "Flask==2.2.2 --hash=sha256:abc",
+    ]
+
+
+def test_resolve_libraries(monkeypatch):
+    calls = []
+
+    def check_call(args, **kwargs):
+        calls.append(args)
+        report_file = args[args.index("--report") + 1]
+        with open(report_file, "w") as file:
+            json.dump(REPORT, file)
+
+    py_handler = PyHandler()
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    packages, environment = py_handler.resolve_libraries(["flask"])
+    assert len(packages) == 2
+    assert environment == {"python_version": "3.10", "sys_platform": "linux"}
+    assert "--ignore-installed" in calls[-1]
+    py_handler.resolve_libraries(["flask"], keep_installed=True)
+    assert "--ignore-installed" not in calls[-1]
+    assert "--upgrade" not in calls[-1]
+    py_handler.resolve_libraries(["flask"], keep_installed=True, upgrade=True)
+    assert "--upgrade" in calls[-1]
+
+
+def test_install_locked(monkeypatch):
+    calls = []
+
+    def check_call(args, **kwargs):
+        with open(args[args.index("-r") + 1]) as file:
+            calls.append((args, file.read()))
+
+    py_handler = PyHandler()
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    lock = LockFile()
+    lock.update(["flask"], parse_pip_report(REPORT))
+    py_handler.install_locked(lock)
+    args, requirements = calls[-1]
+    assert "--no-deps" in args and "--require-hashes" in args
+    assert "Flask==2.2.2 --hash=sha256:abc" in requirements
+
+
+def test_resolve_libraries_fail(monkeypatch):
+    def check_call(args, **kwargs):
+        raise subprocess.CalledProcessError(1, args)
+
+    py_handler = PyHandler()
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    with pytest.raises(InvalidCommandError):
+        py_handler.resolve_libraries(["flask"])
+
+
+def test_mixed_lock_has_no_hashes():
+    lock = LockFile()
+    packages = parse_pip_report(REPORT) + [
+        {
+            "name": "local",
+            "version": "0.1",
+            "url": "file:///src/local",
+            "hashes": [],
+            "direct": True,
+        }
+    ]
+    lock.update(["flask", "./src/local"], packages)
+    assert not lock.requires_hashes()
+    # A single hash would turn on hash checking for the unhashed lines
+    assert lock.to_requirements() == [
+        "click==8.1.3",
+        "Flask==2.2.2",
+        "local @ file:///src/local",
+    ]
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import time
+
+import pytest
+
+from pepsin.parallel import ParallelRunner, ScriptResult, format_summary
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_parallel_runner():
+    out = io.StringIO()
+    results = ParallelRunner(
+        {
+            "lint": python("print('a'); print('b')"),
+            "test": python("import sys; print('c'); sys.exit(2)"),
+        },
+        out,
+        jobs=2,
+    ).run()
+    assert [(result.name, result.code) for result in results] == [
+        ("lint", 0),
+        ("test", 2),
+    ]
+    lines = out.getvalue().splitlines()
+    assert sorted(lines) == ["lint | a", "lint | b", "test | c"]
+    assert lines.index("lint | a") < lines.index("lint | b")
+
+
+def test_parallel_runner_fail_fast():
+    out = io.StringIO()
+    results = ParallelRunner(
+        {
+            "fail": python("import sys; sys.exit(1)"),
+            "slow": python("import time; time.sleep(30)"),
+            "next": python("print('never')"),
+        },
+        out,
+        jobs=2,
+        fail_fast=True,
+    ).run()
+    fail, slow, pending = results
+    assert fail.status == "failed"
+    assert slow.status == "failed" and slow.duration < 30
+    assert pending.status == "skipped"
+    assert "never" not in out.getvalue()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Process groups are posix only")
+def test_parallel_runner_fail_fast_stops_process_group():
+    child = "import time; time.sleep(30)"
+    started = time.monotonic()
+    results = ParallelRunner(
+        {
+            "fail": python("import time, sys; time.sleep(0.5); sys.exit(1)"),
+            # The child keeps the output pipe open until it is stopped
+            "tree": python(
+                "import subprocess, sys, time; "
+                f"subprocess.Popen([sys.executable, '-c', {child!r}]); "
+                "time.sleep(30)"
+            ),
+        },
+        io.StringIO(),
+        jobs=2,
+        fail_fast=True,
+    ).run()
+    assert [result.status for result in results] == ["failed", "failed"]
+    assert time.monotonic() - started < 30
+
+
+def test_format_summary():
+    results = [ScriptResult("lint", 0, 1.0), ScriptResult("typecheck")]
+    assert format_summary(results) == [
+        "lint       ok (exit 0, 1.00s)",
+        "typecheck  skipped",
+    ]
@@ -1,4 +1,5 @@
 import os
+import subprocess
 from test.utils import command_path
 
 import pytest
@@ -25,3 +26,39 @@ def test_py_handler_skip_venv():
     py_handler = PyHandler(skip_venv=True)
     py_handler.pip_execute("--h")
     assert not os.path.isdir("venv")
+
+
+def test_py_handler_batch_install(py_handler, monkeypatch):
+    calls = []
+
+    def check_call(args, **kwargs):
+        calls.append(args)
+        if "broken" in args:
+            raise subprocess.CalledProcessError(1, args)
+
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    passed, failed = py_handler.install_libraries(
+        ["django", "flask", "broken", "requests"]
+    )
+    assert passed == ["django", "flask", "requests"]
+    assert failed == ["broken"]
+    # First call hands the whole set to a single pip run
+    assert calls[0][-4:] == ["django", "flask", "broken", "requests"]
+
+
+def test_py_handler_no_batch_install(py_handler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    passed, failed = py_handler.install_libraries(
+        ["django", "flask"], batch=False
+    )
+    assert passed == ["django", "flask"]
+    assert len(calls) == 2
+
+
+def test_py_handler_installed_packages(py_handler):
+    site_packages = os.path.join("venv", "lib", "python3.10", "site-packages")
+    os.makedirs(os.path.join(site_packages, "Django-4.0.1.dist-info"))
+    assert py_handler.installed_packages()["django"] == "4.0.1"
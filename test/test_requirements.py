@@ -0,0 +1,160 @@
+import pytest
+
+from pepsin.requirements import (
+    evaluate_marker,
+    get_archive,
+    is_same_version,
+    parse_requirement,
+    parse_version,
+)
+
+
+@pytest.mark.parametrize(
+    "lib,parts",
+    [
+        ("django", ("django", (), (), "", "")),
+        ("Django==4.1.2", ("Django", (), (("==", "4.1.2"),), "", "")),
+        (
+            "django[argon2, bcrypt]>=4.0,<5 ; python_version >= '3.8'",
+            (
+                "django",
+                ("argon2", "bcrypt"),
+                ((">=", "4.0"), ("<", "5")),
+                "python_version >= '3.8'",
+                "",
+            ),
+        ),
+        (
+            "zope.interface~=5.0",
+            ("zope.interface", (), (("~=", "5.0"),), "", ""),
+        ),
+        (
+            "pkg!=1.0,===2.0",
+            ("pkg", (), (("!=", "1.0"), ("===", "2.0")), "", ""),
+        ),
+        ("six (>1.0)", ("six", (), ((">", "1.0"),), "", "")),
+        (
+            "demo @ https://files/demo-1.0.tar.gz",
+            ("demo", (), (), "", "https://files/demo-1.0.tar.gz"),
+        ),
+    ],
+)
+def test_parse_requirement(lib, parts):
+    requirement = parse_requirement(lib)
+    name, extras, specifiers, marker, url = parts
+    assert requirement.name == name
+    assert requirement.extras == extras
+    assert [spec[:2] for spec in requirement.specifiers] == list(specifiers)
+    assert requirement.marker == marker
+    assert requirement.url == url
+    assert str(requirement) == lib
+
+
+def test_requirement_is_shared():
+    requirement = parse_requirement("Zope.Interface>=5.0")
+    assert parse_requirement("Zope.Interface>=5.0") is requirement
+    assert requirement.key == "zope-interface"
+    assert requirement.key is parse_requirement("zope_interface").key
+    assert not hasattr(requirement, "__dict__")
+
+
+def test_parse_version():
+    versions = [
+        "1.0.dev1",
+        "1.0a1.dev1",
+        "1.0a1",
+        "1.0b2",
+        "1.0rc1",
+        "1.0",
+        "1.0+local.1",
+        "1.0.post1.dev1",
+        "1.0.post1",
+        "1.1",
+        "1!0.1",
+    ]
+    keys = [parse_version(version) for version in versions]
+    assert keys == sorted(keys)
+    assert parse_version("1.0") == parse_version("v1.0.0")
+    assert parse_version("1.0alpha1") == parse_version("1.0a1")
+    assert parse_version("1.0-1") == parse_version("1.0.post1")
+    assert parse_version("not a version") is None
+    assert is_same_version("2.0", "2.0.0") and is_same_version("x", "x")
+    assert not is_same_version("2.0", "2.0.1")
+
+
+@pytest.mark.parametrize(
+    "lib,version,contained",
+    [
+        ("django", "4.0", True),
+        ("django==4.0", "4.0.0", True),
+        ("django==4.0", "4.0.1", False),
+        ("django==4.0.*", "4.0.5", True),
+        ("django==4.0.*", "4.1", False),
+        ("django!=4.0.*", "4.1", True),
+        ("django>=4.0,<5", "4.2", True),
+        ("django>=4.0,<5", "5.0", False),
+        ("django>4.0", "4.0", False),
+        ("django<=4.0", "4.0+local", True),
+        ("django~=4.1", "4.9", True),
+        ("django~=4.1", "5.0", False),
+        ("django~=4.1.2", "4.1.9", True),
+        ("django~=4.1.2", "4.2", False),
+        ("django===4.0", "4.0.0", False),
+        ("django<1.0", "0.9", True),
+        ("django<1.0", "1.0a1", False),
+        ("django<1.0", "1.0rc1", False),
+        ("django<1.0", "1.0.dev1", False),
+        ("django<1.0rc1", "1.0a1", True),
+        ("django<1.1", "1.0.post1", True),
+        ("django>1.0", "1.0.post1", False),
+        ("django>1.0", "1.0-1", False),
+        ("django>1.0", "1.0.1", True),
+        ("django>1.0.post1", "1.0.post2", True),
+        ("django>1.0a1", "1.0+local", False),
+        ("django>1.0a1", "1.0", True),
+    ],
+)
+def test_requirement_contains(lib, version, contained):
+    assert parse_requirement(lib).contains(version) is contained
+
+
+@pytest.mark.parametrize(
+    "marker,matched",
+    [
+        ("", True),
+        ('sys_platform == "linux"', True),
+        ('sys_platform == "win32"', False),
+        ("python_version >= '3.8' and os_name == 'posix'", True),
+        ('python_version < "3.8" or os_name == "nt"', False),
+        (
+            '(python_version > "3.10" or extra == "x") and os_name == "posix"',
+            True,
+        ),
+        ("'x86' in platform_machine", True),
+        ("'arm' not in platform_machine", True),
+        ("python_version >= '3.10'", True),
+        ("invalid marker ==", True),
+    ],
+)
+def test_evaluate_marker(marker, matched):
+    environment = {
+        "sys_platform": "linux",
+        "os_name": "posix",
+        "python_version": "3.11",
+        "platform_machine": "x86_64",
+        "extra": "",
+    }
+    assert evaluate_marker(marker, environment) is matched
+
+
+def test_get_archive():
+    assert get_archive("./dist/Foo_Bar-1.0-py3-none-any.whl") == (
+        "foo-bar",
+        "1.0",
+    )
+    assert get_archive("https://files/django-filter-2.0.tar.gz#sha256=x") == (
+        "django-filter",
+        "2.0",
+    )
+    assert get_archive("./packages/local") is None
+    assert get_archive("git+https://github.com/a/bar.git") is None
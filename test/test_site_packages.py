@@ -0,0 +1,62 @@
+import os
+import time
+from test.utils import command_path
+
+from pepsin.site_packages import (
+    clear_cache,
+    get_distributions,
+    parse_metadata_dir,
+    scan_site_packages,
+)
+from pepsin.utils import write_file
+
+METADATA = """Metadata-Version: 2.1
+Name: Flask
+Version: 2.2.2
+Requires-Dist: Werkzeug (>=2.2.2)
+Requires-Dist: click (>=8.0)
+"""
+
+
+def make_site_packages(venv="venv"):
+    site_packages = os.path.join(venv, "lib", "python3.10", "site-packages")
+    dist_info = os.path.join(site_packages, "Flask-2.2.2.dist-info")
+    os.makedirs(dist_info)
+    write_file(os.path.join(dist_info, "METADATA"), METADATA)
+    write_file(
+        os.path.join(dist_info, "RECORD"),
+        "flask/__init__.py,sha256=abc,10\nFlask-2.2.2.dist-info/RECORD,,\n",
+    )
+    os.makedirs(os.path.join(site_packages, "six-1.16.0-py3.10.egg-info"))
+    os.makedirs(os.path.join(site_packages, "flask"))
+    return site_packages
+
+
+def test_parse_metadata_dir():
+    assert parse_metadata_dir("Django-4.0.1.dist-info") == ("Django", "4.0.1")
+    assert parse_metadata_dir("six-1.16.0-py3.10.egg-info") == (
+        "six",
+        "1.16.0",
+    )
+    assert parse_metadata_dir("django") is None
+
+
+def test_get_distributions():
+    clear_cache()
+    make_site_packages()
+    distributions = get_distributions("venv")
+    assert sorted(distributions) == ["flask", "six"]
+    flask = distributions["flask"]
+    assert flask.version == "2.2.2"
+    assert flask.requires == ["Werkzeug (>=2.2.2)", "click (>=8.0)"]
+    assert "flask/__init__.py" in flask.files
+
+
+def test_scan_cache():
+    clear_cache()
+    site_packages = make_site_packages()
+    first = scan_site_packages(site_packages)
+    assert scan_site_packages(site_packages) is first
+    os.makedirs(os.path.join(site_packages, "click-8.1.3.dist-info"))
+    os.utime(site_packages, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert "click" in scan_site_packages(site_packages)
@@ -0,0 +1,73 @@
+import os
+from test.test_venv_pool import make_venv
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.config import PepsinConfig
+from pepsin.fingerprint import read_fingerprint
+from pepsin.lock import LockFile, hash_libraries
+from pepsin.pyhandler import PyHandler
+from pepsin.snapshot import SnapshotStore, get_library_hash
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", str(tmp_path / "cache"))
+    return SnapshotStore()
+
+
+def test_get_library_hash():
+    lock = LockFile()
+    assert get_library_hash(["flask"], lock) == hash_libraries(["flask"])
+    lock.update(["flask"], [])
+    assert get_library_hash(["flask"], lock) == lock.content_hash()
+
+
+def test_save_and_restore(store, tmp_path):
+    make_venv([str(tmp_path / "venv")])
+    mtime = os.stat(tmp_path / "venv").st_mtime_ns
+    archive = store.save(str(tmp_path / "venv"), "key")
+    # Saving never writes into the venv
+    assert os.stat(tmp_path / "venv").st_mtime_ns == mtime
+    assert os.path.isfile(archive) and store.exists("key")
+    assert not os.path.exists(tmp_path / "venv" / ".pepsin-origin")
+    assert not store.restore("other", str(tmp_path / "copy"))
+    assert store.restore("key", str(tmp_path / "copy"))
+    assert sorted(os.listdir(tmp_path / "copy")) == ["bin", "pyvenv.cfg"]
+    with open(tmp_path / "copy" / "bin" / "pip") as file:
+        assert file.read() == f"#!{tmp_path / 'copy'}/bin/python\n"
+
+
+def test_py_handler_restores_snapshot(store, monkeypatch):
+    conf = PepsinConfig()
+    conf.update(venv="venv", libraries=["flask"])
+    LockFile().update(["flask"], [])
+    make_venv([os.path.abspath("venv")])
+    py_handler = PyHandler()
+    py_handler.save_snapshot()
+    os.rename("venv", "old_venv")
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    py_handler = PyHandler()
+    assert calls == []
+    assert os.path.isfile(os.path.join("venv", "bin", "pip"))
+    assert read_fingerprint(py_handler.get_venv_dir())
+    assert py_handler.is_up_to_date(["flask"], LockFile().content_hash())
+
+
+def test_py_handler_skips_snapshot_without_lock(store, monkeypatch):
+    conf = PepsinConfig()
+    conf.update(venv="venv", libraries=[])
+    make_venv([os.path.abspath("venv")])
+    PyHandler().save_snapshot()
+    os.rename("venv", "old_venv")
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    PyHandler()
+    assert calls and "virtualenv" in calls[0]
+    assert not os.path.exists("venv")
@@ -0,0 +1,68 @@
+import os
+import zipfile
+from test.utils import command_path
+
+from pepsin.site_packages import get_distributions
+from pepsin.store import PackageStore
+from pepsin.wheel import read_record
+
+
+def make_wheel(path="demo-1.0-py3-none-any.whl"):
+    with zipfile.ZipFile(path, "w") as wheel:
+        wheel.writestr("demo/__init__.py", "VALUE = 1\n")
+        wheel.writestr(
+            "demo-1.0.dist-info/METADATA",
+            "Metadata-Version: 2.1\nName: demo\nVersion: 1.0\n",
+        )
+        wheel.writestr("demo-1.0.dist-info/WHEEL", "Wheel-Version: 1.0\n")
+        wheel.writestr(
+            "demo-1.0.dist-info/RECORD",
+            "demo/__init__.py,sha256=abc,10\ndemo-1.0.dist-info/RECORD,,\n",
+        )
+        wheel.writestr(
+            "demo-1.0.data/scripts/demo-tool", "#!python\nprint()\n"
+        )
+    return path
+
+
+def make_venv(venv):
+    os.makedirs(os.path.join(venv, "lib", "python3.10", "site-packages"))
+    os.makedirs(os.path.join(venv, "bin"))
+    return os.path.abspath(venv)
+
+
+def test_store_install():
+    wheel = make_wheel()
+    store = PackageStore("store")
+    first = make_venv("first")
+    second = make_venv("second")
+    store.install(wheel, first)
+    store.install(wheel, second)
+    # Wheel is unpacked only once
+    assert len(os.listdir("store")) == 1
+    site_packages = os.path.join("lib", "python3.10", "site-packages")
+    first_file = os.path.join(first, site_packages, "demo", "__init__.py")
+    second_file = os.path.join(second, site_packages, "demo", "__init__.py")
+    assert os.stat(first_file).st_ino == os.stat(second_file).st_ino
+    # Distribution is visible and RECORD belongs to the venv
+    assert get_distributions(first)["demo"].version == "1.0"
+    record = read_record(
+        os.path.join(first, site_packages, "demo-1.0.dist-info", "RECORD")
+    )
+    assert record["demo/__init__.py"] == ["sha256=abc", "10"]
+    assert "demo-1.0.dist-info/INSTALLER" in record
+    assert "../../../bin/demo-tool" in record
+    # Script shebang points to the venv python
+    with open(os.path.join(first, "bin", "demo-tool")) as file:
+        assert file.readline() == f"#!{first}/bin/python\n"
+
+
+def test_store_copy_mode():
+    wheel = make_wheel()
+    venv = make_venv("venv")
+    stored = PackageStore("store", link_mode="copy").add_wheel(wheel)
+    PackageStore("store", link_mode="copy").link(stored, venv)
+    installed = os.path.join(
+        venv, "lib", "python3.10", "site-packages", "demo", "__init__.py"
+    )
+    assert os.stat(installed).st_nlink == 1
@@ -0,0 +1,106 @@
+from test.utils import command_path
+
+from pepsin.lock import LockFile
+from pepsin.requirements import parse_requirement
+from pepsin.sync import (
+    get_venv_environment,
+    plan_from_libraries,
+    plan_from_lock,
+)
+
+PACKAGES = [
+    {"name": "Flask", "version": "2.2.2", "url": "", "hashes": ["sha256:a"]},
+    {"name": "click", "version": "8.1.3", "url": "", "hashes": ["sha256:b"]},
+    {"name": "Jinja2", "version": "3.1.2", "url": "", "hashes": ["sha256:c"]},
+]
+
+
+def test_pinned_version():
+    assert parse_requirement("django==4.0.1").pinned == "4.0.1"
+    assert parse_requirement("django == 4.0.1; python_version>'3'").pinned == (
+        "4.0.1"
+    )
+    assert parse_requirement("django>=4.0").pinned is None
+    assert parse_requirement("django==4.*").pinned is None
+    assert parse_requirement("django").pinned is None
+
+
+def test_plan_from_lock():
+    lock = LockFile()
+    lock.update(["flask"], PACKAGES)
+    installed = {
+        "flask": "2.2.2",
+        "click": "8.0.0",
+        "requests": "2.28.0",
+        "pip": "22.3",
+    }
+    plan = plan_from_lock(lock, installed)
+    assert plan.add == ["Jinja2==3.1.2 --hash=sha256:c"]
+    assert plan.change == ["click==8.1.3 --hash=sha256:b"]
+    assert plan.remove == ["requests"]
+    assert plan.no_deps and plan.require_hashes
+
+
+def test_plan_from_libraries():
+    installed = {"django": "4.0.0", "django-filter": "22.1"}
+    plan = plan_from_libraries(
+        ["Django==4.0.1", "django_filter", "flask"], installed
+    )
+    assert plan.add == ["flask"]
+    assert plan.change == ["Django==4.0.1"]
+    assert plan.remove == []
+    assert not plan_from_libraries(["django"], installed).to_install()
+
+
+def test_plan_from_libraries_specifiers():
+    installed = {"django": "3.2", "flask": "2.2.0"}
+    plan = plan_from_libraries(["django>=4.0,<5", "flask==2.2"], installed)
+    assert plan.change == ["django>=4.0,<5"]
+
+
+def test_plan_from_libraries_markers(tmp_path):
+    environment = get_venv_environment(None)
+    environment["sys_platform"] = "linux"
+    plan = plan_from_libraries(
+        ['pywin32>=300; sys_platform == "win32"', 'uvloop; os_name == "nt"'],
+        {},
+        environment,
+    )
+    assert plan.is_empty()
+    (tmp_path / "pyvenv.cfg").write_text("home = /usr\nversion = 3.7.9\n")
+    environment = get_venv_environment(str(tmp_path))
+    assert environment["python_version"] == "3.7"
+    plan = plan_from_libraries(
+        [
+            'dataclasses; python_version < "3.7"',
+            'typing-extensions; python_version < "3.8"',
+        ],
+        {},
+        environment,
+    )
+    assert plan.add == ['typing-extensions; python_version < "3.8"']
+
+
+def test_plan_from_libraries_direct_references():
+    libs = [
+        "./dist/foo-1.0-py3-none-any.whl",
+        "https://files/django_filter-22.1.tar.gz",
+        "git+https://github.com/a/bar.git#egg=bar",
+        "./packages/local",
+    ]
+    installed = {"foo": "1.0.0", "django-filter": "21.1", "bar": "0.1"}
+    plan = plan_from_libraries(libs, installed)
+    assert plan.add == ["./packages/local"]
+    assert plan.change == ["https://files/django_filter-22.1.tar.gz"]
+
+
+def test_plan_from_mixed_lock():
+    lock = LockFile()
+    lock.update(
+        ["flask"],
+        PACKAGES
+        + [{"name": "local", "version": "0.1", "url": "", "hashes": []}],
+    )
+    plan = plan_from_lock(lock, {})
+    assert not plan.require_hashes
+    assert not any("--hash" in line for line in plan.to_install())
@@ -0,0 +1,121 @@
+import io
+import os
+import sys
+
+from pepsin.task_cache import TaskCache, get_task_key
+from pepsin.tasks import Task, TaskRunner
+
+
+def write(path, text):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return file.read()
+
+
+def test_get_task_key(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("src/a.txt", "a")
+    task = Task("gen", "gen.py", inputs=["src/*.txt"], outputs=["out"])
+    key = get_task_key(task, "env")
+    assert key == get_task_key(task, "env")
+    assert key != get_task_key(task, "other env")
+    assert key != get_task_key(
+        Task("gen", "gen.py -v", [], ["src/*.txt"]), "env"
+    )
+    write("src/a.txt", "b")
+    assert key != get_task_key(task, "env")
+
+
+def test_task_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = TaskCache(str(tmp_path / "cache"))
+    write("out/a.txt", "a")
+    write("out/sub/b.sh", "b")
+    os.chmod("out/sub/b.sh", 0o755)
+    assert cache.restore("key") is None
+    assert not cache.save("key", ["missing"], [])
+    assert cache.save("key", ["out"], ["line 1", "line 2"])
+    os.remove("out/a.txt")
+    write("out/sub/b.sh", "changed")
+    assert cache.restore("key") == ["line 1", "line 2"]
+    assert read("out/a.txt") == "a" and read("out/sub/b.sh") == "b"
+    assert os.stat("out/sub/b.sh").st_mode & 0o777 == 0o755
+
+
+def test_task_cache_eviction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("pepsin.task_cache.GRACE_PERIOD", -1)
+    cache = TaskCache(str(tmp_path / "cache"), max_size=350)
+    for mtime, name in enumerate(["a", "b", "c"]):
+        write(f"{name}.txt", name * 100)
+        assert cache.save(name, [f"{name}.txt"], [])
+        os.utime(cache.get_entry_file(name), (mtime, mtime))
+    # `a` has been used last, `b` is the least recently used
+    assert cache.restore("a") == []
+    write("d.txt", "d" * 100)
+    cache.save("d", ["d.txt"], [])
+    assert cache.restore("b") is None
+    assert cache.restore("a") == cache.restore("c") == cache.restore("d") == []
+    objects = [
+        name for _, _, names in os.walk("cache/objects") for name in names
+    ]
+    # The outputs of `a`, `c` and `d` and the shared empty log
+    assert len(objects) == 4
+
+
+def test_task_cache_eviction_missing_object(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = TaskCache(str(tmp_path / "cache"))
+    for name in ["a", "b"]:
+        write(f"{name}.txt", name * 100)
+        assert cache.save(name, [f"{name}.txt"], [])
+    missing = cache.get_object_file(cache.load("a")["outputs"][0]["digest"])
+    getsize = os.path.getsize
+
+    def removed_getsize(path):
+        # A concurrent eviction removes the object after it has been loaded
+        if path == missing:
+            raise FileNotFoundError(path)
+        return getsize(path)
+
+    monkeypatch.setattr("os.path.getsize", removed_getsize)
+    cache.evict()
+    assert not os.path.exists(cache.get_entry_file("a"))
+    assert cache.restore("b") == []
+
+
+def test_task_runner_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("src/a.txt", "a")
+    write(
+        "gen.py",
+        "import os\n"
+        "os.makedirs('out', exist_ok=True)\n"
+        "open('out/a.txt', 'w').write(open('src/a.txt').read().upper())\n"
+        "open('runs', 'a').write('x')\n"
+        "print('generated')\n",
+    )
+    tasks = {
+        "gen": Task("gen", "gen.py", inputs=["src/*.txt"], outputs=["out"])
+    }
+    cache = TaskCache(str(tmp_path / "cache"))
+
+    def run():
+        out = io.StringIO()
+        runner = TaskRunner(
+            tasks, ["gen"], sys.executable, out, cache=cache, environment="env"
+        )
+        return runner.run()[0].status, out.getvalue()
+
+    assert run() == ("ok", "gen | generated\n")
+    os.remove("out/a.txt")
+    assert run() == ("cached", "gen | generated\n")
+    assert read("out/a.txt") == "A" and read("runs") == "x"
+    write("src/a.txt", "b")
+    assert run()[0] == "ok"
+    assert read("out/a.txt") == "B" and read("runs") == "xx"
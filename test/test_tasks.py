@@ -0,0 +1,128 @@
+import io
+import os
+import sys
+
+import pytest
+
+from pepsin.error import InvalidCommandError
+from pepsin.tasks import (
+    Task,
+    TaskRunner,
+    get_script_args,
+    get_task_order,
+    is_up_to_date,
+    parse_tasks,
+)
+
+SCRIPTS = {
+    "lint": "flake8",
+    "codegen": {
+        "command": "codegen.py",
+        "inputs": ["schema/*.json"],
+        "outputs": "gen",
+    },
+    "build": {"command": "setup.py build", "depends_on": ["codegen", "lint"]},
+    "all": {"depends_on": ["build", "lint"]},
+}
+
+
+def test_get_script_args():
+    assert get_script_args("pytest -k 'a and b'") == [
+        "-m",
+        "pytest",
+        "-k",
+        "a and b",
+    ]
+
+
+def test_get_script_args_windows_paths(monkeypatch):
+    monkeypatch.setattr(os, "name", "nt")
+    assert get_script_args(r'scripts\main.py --x "a b"') == [
+        r"scripts\main.py",
+        "--x",
+        "a b",
+    ]
+
+
+def test_parse_tasks():
+    tasks = parse_tasks(SCRIPTS)
+    assert tasks["lint"] == Task("lint", "flake8")
+    assert tasks["codegen"].outputs == ["gen"]
+    assert tasks["all"] == Task("all", "", ["build", "lint"])
+    with pytest.raises(InvalidCommandError, match="Unknown keys"):
+        parse_tasks({"lint": {"cmd": "flake8"}})
+    with pytest.raises(InvalidCommandError, match="must be a list"):
+        parse_tasks({"lint": {"command": "flake8", "inputs": {"a": 1}}})
+
+
+def test_get_task_order():
+    tasks = parse_tasks(SCRIPTS)
+    assert get_task_order(tasks, ["all"]) == [
+        "codegen",
+        "lint",
+        "build",
+        "all",
+    ]
+    assert get_task_order(tasks, ["lint", "codegen"]) == ["lint", "codegen"]
+    with pytest.raises(InvalidCommandError, match="No script named test"):
+        get_task_order(tasks, ["test"])
+    with pytest.raises(InvalidCommandError, match="unknown script test"):
+        get_task_order(parse_tasks({"a": {"depends_on": "test"}}), ["a"])
+
+
+def test_get_task_order_cycle():
+    tasks = parse_tasks(
+        {
+            "a": {"depends_on": ["b"]},
+            "b": {"depends_on": ["c"]},
+            "c": {"depends_on": ["a"]},
+        }
+    )
+    with pytest.raises(InvalidCommandError, match="a -> b -> c -> a"):
+        get_task_order(tasks, ["a"])
+
+
+def test_is_up_to_date(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    task = parse_tasks(SCRIPTS)["codegen"]
+    os.makedirs("schema")
+    (tmp_path / "schema" / "a.json").write_text("{}")
+    assert not is_up_to_date(task)
+    os.makedirs("gen")
+    (tmp_path / "gen" / "a.py").write_text("")
+    os.utime(tmp_path / "schema" / "a.json", (1, 1))
+    assert is_up_to_date(task)
+    os.utime(tmp_path / "schema" / "a.json", None)
+    os.utime(tmp_path / "gen" / "a.py", (1, 1))
+    assert not is_up_to_date(task)
+
+
+def test_task_runner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ["a", "b", "c"]:
+        (tmp_path / f"{name}.py").write_text(
+            f"open('log', 'a').write('{name}')\n"
+            f"raise SystemExit({int(name == 'b')})\n"
+        )
+    tasks = parse_tasks(
+        {
+            "a": "a.py",
+            "b": "b.py",
+            "c": {"command": "c.py", "depends_on": ["a"]},
+            "d": {"command": "c.py", "depends_on": ["b"]},
+            "all": {"depends_on": ["c", "d"]},
+        }
+    )
+    order = get_task_order(tasks, ["all"])
+    results = TaskRunner(
+        tasks, order, sys.executable, io.StringIO(), jobs=2
+    ).run()
+    assert {result.name: result.status for result in results} == {
+        "a": "ok",
+        "c": "ok",
+        "b": "failed",
+        "d": "skipped",
+        "all": "skipped",
+    }
+    log = (tmp_path / "log").read_text()
+    assert sorted(log) == ["a", "b", "c"] and log.index("a") < log.index("c")
@@ -3,6 +3,7 @@ from test.utils import safe_remove_file, temp_path
 from pepsin.utils import (
     check_file_exists,
     get_default,
+    link_file,
     read_file,
     update_file,
     write_file,
@@ -31,3 +32,13 @@ def test_update_file(temp_path):
 
 def test_check_file_exists():
     assert not check_file_exists("dummy.txt")
+
+
+def test_link_file(temp_path):
+    write_file("link_source.txt", "source")
+    assert link_file("link_source.txt", "link_target.txt") == "hardlink"
+    assert read_file("link_target.txt") == "source"
+    assert link_file("link_source.txt", "link_target.txt", "copy") == "copy"
+    assert read_file("link_target.txt") == "source"
+    safe_remove_file("link_source.txt")
+    safe_remove_file("link_target.txt")
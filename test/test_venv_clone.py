@@ -0,0 +1,60 @@
+import os
+from test.test_venv_pool import make_venv
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.config import PepsinConfig
+from pepsin.pyhandler import PyHandler
+from pepsin.venv_clone import clone_venv
+
+
+@pytest.fixture
+def venv(tmp_path):
+    venv_dir = str(tmp_path / "src")
+    make_venv([venv_dir])
+    site_packages = os.path.join(venv_dir, "lib", "site-packages")
+    os.makedirs(os.path.join(site_packages, "flask"))
+    with open(os.path.join(site_packages, "flask", "__init__.py"), "w"):
+        pass
+    os.symlink(
+        os.path.join(venv_dir, "bin", "pip"),
+        os.path.join(venv_dir, "bin", "pip3"),
+    )
+    with open(os.path.join(venv_dir, ".pepsin-fingerprint"), "w"):
+        pass
+    return venv_dir
+
+
+def test_clone_venv(venv, tmp_path):
+    dst = str(tmp_path / "dst")
+    modes = clone_venv(venv, dst, jobs=2)
+    assert modes == {"hardlink": 3, "symlink": 1}
+    module = os.path.join("lib", "site-packages", "flask", "__init__.py")
+    assert os.path.samefile(
+        os.path.join(venv, module), os.path.join(dst, module)
+    )
+    assert os.readlink(os.path.join(dst, "bin", "pip3")) == os.path.join(
+        dst, "bin", "pip"
+    )
+    assert not os.path.exists(os.path.join(dst, ".pepsin-fingerprint"))
+    # Rewritten files no longer share the source file
+    for path, venv_dir in [(venv, venv), (dst, dst)]:
+        with open(os.path.join(path, "bin", "pip")) as file:
+            assert file.read() == f"#!{venv_dir}/bin/python\n"
+
+
+def test_clone_venv_errors(venv, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        clone_venv(str(tmp_path / "missing"), str(tmp_path / "dst"))
+    with pytest.raises(FileExistsError):
+        clone_venv(venv, venv)
+
+
+def test_py_handler_clone_from(venv):
+    conf = PepsinConfig()
+    conf.update(venv="venv", clone_from=venv)
+    PyHandler()
+    assert os.path.isfile(
+        os.path.join("venv", "lib", "site-packages", "flask", "__init__.py")
+    )
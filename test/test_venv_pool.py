@@ -0,0 +1,70 @@
+import os
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.pyhandler import PyHandler
+from pepsin.relocate import relocate_venv
+from pepsin.venv_pool import VenvPool
+
+
+def make_venv(args, **kwargs):
+    venv_dir = args[-1]
+    os.makedirs(os.path.join(venv_dir, "bin"))
+    with open(os.path.join(venv_dir, "bin", "pip"), "w") as file:
+        file.write(f"#!{venv_dir}/bin/python\n")
+    with open(os.path.join(venv_dir, "pyvenv.cfg"), "w") as file:
+        file.write(f"command = python -m virtualenv {venv_dir}\n")
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr("subprocess.check_call", make_venv)
+    monkeypatch.setattr(VenvPool, "refill_in_background", lambda self: None)
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", str(tmp_path / "cache"))
+    return VenvPool("python3")
+
+
+def test_relocate_venv(tmp_path):
+    make_venv([str(tmp_path / "old")])
+    os.rename(tmp_path / "old", tmp_path / "new")
+    rewritten = relocate_venv(str(tmp_path / "new"), str(tmp_path / "old"))
+    assert len(rewritten) == 2
+    with open(tmp_path / "new" / "bin" / "pip") as file:
+        assert file.read() == f"#!{tmp_path / 'new'}/bin/python\n"
+
+
+def test_pool_fill_and_claim(pool, tmp_path):
+    assert not pool.is_enabled()
+    assert not pool.claim(str(tmp_path / "venv"))
+    assert pool.fill(2) == 2
+    assert pool.size == 2 and len(pool.entries()) == 2
+    assert pool.fill() == 0
+    assert pool.claim(str(tmp_path / "venv"))
+    assert len(pool.entries()) == 1
+    assert sorted(os.listdir(tmp_path / "venv")) == ["bin", "pyvenv.cfg"]
+    with open(tmp_path / "venv" / "bin" / "pip") as file:
+        assert file.read() == f"#!{tmp_path / 'venv'}/bin/python\n"
+    pool.clear()
+    assert not pool.is_enabled()
+
+
+def test_pool_fill_counts_pending(pool):
+    os.makedirs(os.path.join(pool.path, "a.part"))
+    assert pool.fill(2) == 1
+    assert len(pool.entries()) == 1 and len(pool.pending()) == 1
+    # Abandoned venvs do not count and are removed
+    os.utime(os.path.join(pool.path, "a.part"), (0, 0))
+    assert pool.fill() == 1
+    assert len(pool.entries()) == 2 and pool.pending() == []
+
+
+def test_init_venv_claims_from_pool(pool, monkeypatch):
+    pool.fill(1)
+    refills = []
+    monkeypatch.setattr(
+        VenvPool, "refill_in_background", lambda self: refills.append(self)
+    )
+    PyHandler()
+    assert os.path.isfile(os.path.join("venv", "bin", "pip"))
+    assert refills[0].path == pool.path and pool.entries() == []
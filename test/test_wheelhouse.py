@@ -0,0 +1,119 @@
+import functools
+import hashlib
+import os
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from test.utils import command_path, set_subprocess
+
+import pytest
+
+from pepsin.error import InvalidCommandError
+from pepsin.pyhandler import PyHandler
+from pepsin.wheelhouse import Wheelhouse, check_hashes, get_default_wheelhouse
+
+
+def make_artifacts(count=3):
+    os.mkdir("index")
+    packages = []
+    for index in range(count):
+        name = f"pkg{index}-1.0-py3-none-any.whl"
+        content = f"wheel {index}".encode()
+        Path("index", name).write_bytes(content)
+        packages.append(
+            {
+                "name": f"pkg{index}",
+                "version": "1.0",
+                "url": Path("index", name).resolve().as_uri(),
+                "hashes": [f"sha256:{hashlib.sha256(content).hexdigest()}"],
+            }
+        )
+    return packages
+
+
+@pytest.fixture
+def http_index():
+    handler = functools.partial(
+        SimpleHTTPRequestHandler, directory=os.path.abspath("index")
+    )
+    handler.log_message = lambda *args: None
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_default_wheelhouse(monkeypatch):
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", "/tmp/pepsin-cache")
+    assert get_default_wheelhouse() == "/tmp/pepsin-cache/wheelhouse"
+
+
+def test_fetch_local_directory():
+    packages = make_artifacts()
+    wheelhouse = Wheelhouse("wheelhouse", jobs=2)
+    artifacts = wheelhouse.fetch(packages)
+    assert [os.path.basename(artifact) for artifact in artifacts] == [
+        f"pkg{index}-1.0-py3-none-any.whl" for index in range(3)
+    ]
+    for artifact, package in zip(artifacts, packages):
+        assert check_hashes(artifact, package["hashes"])
+
+
+def test_fetch_http_index(http_index):
+    packages = make_artifacts()
+    for package in packages:
+        package["url"] = f"{http_index}/{os.path.basename(package['url'])}"
+    artifacts = Wheelhouse("wheelhouse", jobs=3).fetch(packages)
+    assert all(os.path.isfile(artifact) for artifact in artifacts)
+
+
+def test_fetch_hash_mismatch():
+    packages = make_artifacts(1)
+    packages[0]["hashes"] = ["sha256:invalid"]
+    with pytest.raises(InvalidCommandError):
+        Wheelhouse("wheelhouse").fetch(packages)
+    assert os.listdir("wheelhouse") == []
+
+
+def test_install_from_wheelhouse(monkeypatch):
+    packages = make_artifacts(2)
+    py_handler = PyHandler()
+    calls = []
+    monkeypatch.setattr(
+        "subprocess.check_call", lambda args, **kwargs: calls.append(args)
+    )
+    wheelhouse = Wheelhouse("wheelhouse")
+    py_handler.install_from_wheelhouse(packages, wheelhouse)
+    args = calls[-1]
+    assert "--no-index" in args and "--require-hashes" in args
+    assert args[args.index("--find-links") + 1] == wheelhouse.path
+
+
+def test_install_direct_reference_from_wheelhouse(monkeypatch):
+    packages = make_artifacts(2)
+    packages[1]["direct"] = True
+    py_handler = PyHandler()
+    requirements = []
+
+    def check_call(args, **kwargs):
+        with open(args[args.index("-r") + 1]) as file:
+            requirements.extend(file.read().splitlines())
+
+    monkeypatch.setattr("subprocess.check_call", check_call)
+    py_handler.install_from_wheelhouse(packages, Wheelhouse("wheelhouse"))
+    # The direct reference is served by the wheelhouse, not by its url
+    assert [line.split(" --hash")[0] for line in requirements] == [
+        "pkg0==1.0",
+        "pkg1==1.0",
+    ]
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["https://github.com/a/demo.git", "file:///src/demo", ""],
+)
+def test_fetch_rejects_unavailable_packages(url):
+    package = {"name": "demo", "version": "1.0", "url": url, "hashes": []}
+    with pytest.raises(InvalidCommandError, match="demo"):
+        Wheelhouse("wheelhouse").fetch(make_artifacts(1) + [package])
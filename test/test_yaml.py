@@ -1,10 +1,19 @@
+import importlib
 import os
 from pathlib import Path
 
 import pytest
 import yaml
 
-from pepsin.yml import YAMLConfig, dict_to_yaml, yaml_to_dict
+import pepsin.yml
+from pepsin.yml import (
+    YAMLConfig,
+    dict_to_yaml,
+    freeze,
+    load_yaml,
+    thaw,
+    yaml_to_dict,
+)
 
 
 @pytest.fixture
@@ -69,3 +78,100 @@ def test_empty_yaml(path):
     __conf.read_from_yaml()
     assert len(__conf.get_config()) == 0
     assert __conf.get_filename() == "temp_test.yaml"
+
+
+def test_libyaml_loader():
+    assert pepsin.yml.SafeLoader is getattr(
+        yaml, "CSafeLoader", yaml.SafeLoader
+    )
+    assert pepsin.yml.SafeDumper is getattr(
+        yaml, "CSafeDumper", yaml.SafeDumper
+    )
+
+
+def test_pure_python_fallback(path, monkeypatch):
+    monkeypatch.delattr(yaml, "CSafeLoader", raising=False)
+    monkeypatch.delattr(yaml, "CSafeDumper", raising=False)
+    try:
+        module = importlib.reload(pepsin.yml)
+        assert module.SafeLoader is yaml.SafeLoader
+        data = {"name": "pepsin", "libraries": ["flask==2.2.2"], "scripts": {}}
+        module.dict_to_yaml(data, "pytest.yaml")
+        assert module.yaml_to_dict("pytest.yaml") == data
+    finally:
+        monkeypatch.undo()
+        importlib.reload(pepsin.yml)
+        os.remove("pytest.yaml")
+
+
+def test_yaml_is_loaded_safely(path):
+    with open("pytest.yaml", "w") as file:
+        file.write("name: !!python/object/apply:os.getcwd []\n")
+    try:
+        with pytest.raises(yaml.constructor.ConstructorError):
+            yaml_to_dict("pytest.yaml")
+    finally:
+        os.remove("pytest.yaml")
+
+
+def test_parsed_yaml_cache(path, monkeypatch):
+    dict_to_yaml({"name": "pepsin", "libraries": ["flask"]}, "pytest.yaml")
+    pepsin.yml.clear_cache()
+    try:
+        data = load_yaml("pytest.yaml")
+        assert data["libraries"] == ("flask",)
+        with pytest.raises(TypeError):
+            data["name"] = "other"
+
+        def fail(*args, **kwargs):
+            raise AssertionError("parsed again")
+
+        monkeypatch.setattr(yaml, "load", fail)
+        assert load_yaml("pytest.yaml") is data
+        monkeypatch.undo()
+        # Rewriting the file invalidates the cache
+        with open("pytest.yaml", "w") as file:
+            file.write("name: changed-pepsin\n")
+        assert load_yaml("pytest.yaml")["name"] == "changed-pepsin"
+    finally:
+        os.remove("pytest.yaml")
+
+
+def test_disk_yaml_cache(path, tmp_path, monkeypatch):
+    monkeypatch.setenv("PEPSIN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PEPSIN_CONFIG_CACHE", "1")
+    with open("pytest.yaml", "w") as file:
+        file.write("name: pepsin\nscripts:\n  start: main.py\n")
+    try:
+        pepsin.yml.clear_cache()
+        load_yaml("pytest.yaml")
+        assert os.listdir(tmp_path / "config")
+        pepsin.yml.clear_cache()
+        monkeypatch.setattr(yaml, "load", None)
+        assert yaml_to_dict("pytest.yaml") == {
+            "name": "pepsin",
+            "scripts": {"start": "main.py"},
+        }
+    finally:
+        os.remove("pytest.yaml")
+
+
+def test_yaml_config_views(path):
+    conf = YAMLConfig("pytest.yaml", libraries=["flask"])
+    libraries = conf.get("libraries")
+    assert libraries == ("flask",) and thaw(libraries) == ["flask"]
+    with pytest.raises(TypeError):
+        conf.get_config()["name"] = "pepsin"
+    conf.save()
+    assert yaml_to_dict("pytest.yaml") == {"libraries": ["flask"]}
+    os.remove("pytest.yaml")
+
+
+def test_frozen_data_is_not_copied(path):
+    data = freeze({"scripts": {"start": "main.py"}, "libraries": ["flask"]})
+    assert freeze(data) is data
+    conf = YAMLConfig("pytest.yaml", **data)
+    assert conf.get("scripts") is data["scripts"]
+    assert YAMLConfig("pytest.yaml", **conf.get_config()).get(
+        "libraries"
+    ) is conf.get("libraries")